@@ -1 +1 @@
-__all__ = ['asg_demo', 'eps', 'multirotor', 'pump', 'rover', 'tank']
\ No newline at end of file
+__all__ = ['asg_demo', 'benchmarks', 'eps', 'multirotor', 'pump', 'rover', 'tank']
\ No newline at end of file
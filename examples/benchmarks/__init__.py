@@ -0,0 +1,6 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmarks comparing the performance of simulation options on the example models.
+
+@author: dhulse
+"""
@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark comparing the execution time of updating auto-updating random states
+when each value is drawn from the generator in turn and when values are drawn
+in bulk into a buffer (buffer_size>0).
+
+@author: dhulse
+"""
+from examples.pump.pump_stochastic import MoveWatRand
+
+import time
+
+def compare_buffered(num_updates=100000, buffer_sizes=[0, 16, 256, 4096], verbose=True):
+    """
+    Compares the time to update the random states of a MoveWatRand num_updates 
+    times for different buffer sizes.
+
+    Parameters
+    ----------
+    num_updates : int, optional
+        Number of updates to run. The default is 100000.
+    buffer_sizes : list, optional
+        Buffer sizes to compare (0 is unbuffered). The default is [0, 16, 256, 4096].
+    verbose : bool, optional
+        Whether to output the times. The default is True.
+
+    Returns
+    -------
+    times : dict
+        Execution time (s) for each buffer size {buffer_size: time}
+    """
+    times = {}
+    for buffer_size in buffer_sizes:
+        r = MoveWatRand(seed=1, run_stochastic=True, buffer_size=buffer_size)
+        starttime = time.time()
+        for i in range(num_updates):
+            r.update_stochastic_states()
+        times[buffer_size] = time.time()-starttime
+    if verbose:
+        print(str(num_updates)+" updates: "
+              +", ".join(["buffer_size "+str(size)+": "+str(round(t, 3))+" s ("
+                          +str(round(times[buffer_sizes[0]]/t, 1))+"x)" for size, t in times.items()]))
+    return times
+
+if __name__=='__main__':
+    compare_buffered()
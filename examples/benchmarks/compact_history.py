@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark comparing the memory used by the histories of a fault sweep when
+stored with the full data types, with the compact data type policy
+(compact_hist=True: float32 floats, categorical modes, and bit-packed faults),
+and with the compact policy combined with sparse (change-only) arrays.
+
+@author: dhulse
+"""
+from examples.pump.ex_pump import Pump
+import fmdtools.sim.propagate as propagate
+
+import time
+import numpy as np
+
+def compare_memory(end_time=1000, verbose=True, **kwargs):
+    """
+    Compares the memory used by the histories of single_faults with and without
+    compact_hist (and sparse_hist).
+
+    Parameters
+    ----------
+    end_time : float, optional
+        Final time of the simulation. The default is 1000.
+    verbose : bool, optional
+        Whether to output the memory/times. The default is True.
+    **kwargs : kwargs
+        Keyword arguments to propagate.single_faults
+
+    Returns
+    -------
+    stats : dict
+        Memory (bytes) and execution times {'full': (mem, time), 'compact': (mem, time),
+                                            'compact+sparse': (mem, time)}
+    """
+    mdl = Pump(sp={**Pump.default_sp, 'times':(0, 20, end_time),
+                   'phases':(('start',0,4),('on',5,49),('end',50,end_time))})
+    stats = {}
+    hists = {}
+    for name, compact, sparse in [('full', False, False), ('compact', True, False),
+                                  ('compact+sparse', True, True)]:
+        starttime = time.time()
+        endclasses, hist = propagate.single_faults(mdl, showprogress=False, compact_hist=compact,
+                                                   sparse_hist=sparse, **kwargs)
+        runtime = time.time()-starttime
+        hists[name] = hist.flatten()
+        stats[name] = (hists[name].get_memory()[0], runtime)
+    same = all([np.allclose(hists['full'][k], hists['compact+sparse'][k], rtol=1e-6)
+                if hists['full'][k].dtype.kind=='f' else np.array_equal(hists['full'][k], hists['compact+sparse'][k])
+                for k in hists['full']])
+    if verbose:
+        print("Pump (end time "+str(end_time)+"): "
+              +", ".join([name+": "+str(round(mem/1e6, 3))+" MB, "+str(round(runtime, 2))+" s"
+                          for name, (mem, runtime) in stats.items()])
+              +", reduction (compact): "+str(round(stats['full'][0]/stats['compact'][0], 1))
+              +"x, same history: "+str(same))
+    return stats
+
+if __name__=='__main__':
+    for end_time in [100, 1000, 10000]:
+        compare_memory(end_time=end_time, staged=True, track='all')
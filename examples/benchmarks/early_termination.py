@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark comparing the time-steps simulated and the execution time of fault
+scenarios in a long-horizon model when simulating every scenario to the final
+time and when stopping converged scenarios early (converge_steps).
+
+@author: dhulse
+"""
+from examples.pump.ex_pump import Pump
+from examples.pump.test_pump import CountingPump
+from fmdtools.sim.approach import SampleApproach
+import fmdtools.sim.propagate as propagate
+
+import time
+import numpy as np
+
+def compare_convergence(end_time=1000, converge_steps=5, verbose=True, **kwargs):
+    """
+    Compares the time-steps simulated and execution time of a SampleApproach with
+    and without converge_steps.
+
+    Parameters
+    ----------
+    end_time : float, optional
+        Final time of the simulation. The default is 1000.
+    converge_steps : int, optional
+        converge_steps option for propagate.approach. The default is 5.
+    verbose : bool, optional
+        Whether to output the steps/times. The default is True.
+    **kwargs : kwargs
+        Keyword arguments to propagate.approach
+
+    Returns
+    -------
+    stats : dict
+        Steps and execution times {'full': (steps, time), 'converge': (steps, time)}
+    """
+    mdl = CountingPump(sp={**Pump.default_sp, 'times':(0, 20, end_time),
+                           'phases':(('start',0,4),('on',5,49),('end',50,end_time))})
+    app = SampleApproach(mdl, defaultsamp={'samp':'evenspacing','numpts':5})
+    stats = {}
+    hists = {}
+    for name, steps in [('full', 0), ('converge', converge_steps)]:
+        CountingPump.steps = 0
+        starttime = time.time()
+        endclasses, hists[name] = propagate.approach(mdl, app, showprogress=False, converge_steps=steps, **kwargs)
+        stats[name] = (CountingPump.steps, time.time()-starttime)
+    full_hist = hists['full'].flatten()
+    conv_hist = hists['converge'].flatten()
+    same = all([np.array_equal(full_hist[k], conv_hist[k]) for k in full_hist])
+    if verbose:
+        print("Pump (end time "+str(end_time)+", "+str(len(app.scenlist))+" scenarios): full: "
+              +str(stats['full'][0])+" steps, "+str(round(stats['full'][1],2))+" s, converge_steps="
+              +str(converge_steps)+": "+str(stats['converge'][0])+" steps, "+str(round(stats['converge'][1],2))
+              +" s, same history: "+str(same))
+    return stats
+
+if __name__=='__main__':
+    compare_convergence(end_time=200, staged=True, track='all')
+    compare_convergence(end_time=1000, staged=True, track='all')
@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark comparing the execution time of simulating a NominalApproach scenario
+by scenario (propagate.nominal_approach) and as a lockstep ensemble
+(propagate.nominal_ensemble), where vectorized functions are simulated for all
+members at once.
+
+@author: dhulse
+"""
+from examples.pump.pump_stochastic import Pump
+from examples.tank.tank_model import Tank
+from fmdtools.sim.approach import NominalApproach
+import fmdtools.sim.propagate as propagate
+
+import time
+
+def reset_rand_states(mdl):
+    """Resets the random states of the functions (which are shared between models) to their defaults"""
+    for fxn in mdl.fxns.values():
+        if hasattr(fxn.r, 's'):
+            fxn.r.s.assign(type(fxn.r.s)())
+
+def compare_ensemble(mdl, app, verbose=True, **kwargs):
+    """
+    Compares the execution time of nominal_approach and nominal_ensemble.
+
+    Parameters
+    ----------
+    mdl : Model
+        Model to simulate
+    app : NominalApproach
+        Scenarios to simulate
+    verbose : bool, optional
+        Whether to output the times. The default is True.
+    **kwargs : kwargs
+        Keyword arguments to propagate.nominal_approach/nominal_ensemble
+
+    Returns
+    -------
+    times : dict
+        Execution times {'approach': time, 'ensemble': time}
+    """
+    times = {}
+    for name, method, method_kwargs in [('approach', propagate.nominal_approach, {'showprogress': False}),
+                                        ('ensemble', propagate.nominal_ensemble, {})]:
+        reset_rand_states(mdl)
+        starttime = time.time()
+        method(mdl, app, **method_kwargs, **kwargs)
+        times[name] = time.time() - starttime
+    if verbose:
+        print(mdl.__class__.__name__+" ("+str(len(app.scenarios))+" scenarios): approach: "
+              +str(round(times['approach'], 2))+" s, ensemble: "+str(round(times['ensemble'], 2))
+              +" s, speedup: "+str(round(times['approach']/times['ensemble'], 1)))
+    return times
+
+if __name__=='__main__':
+    app = NominalApproach()
+    app.add_seed_replicates('rep', 100)
+    compare_ensemble(Pump(), app, run_stochastic=True, track='all')
+
+    app = NominalApproach()
+    app.add_param_ranges(lambda x: {'reacttime':x}, 'rt', x=(1, 6, 1), replicates=20)
+    compare_ensemble(Tank(), app, track='all')
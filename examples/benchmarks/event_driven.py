@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark comparing the time-steps simulated and the execution time of fault
+scenarios in a long-horizon model when simulating every time-step and when
+skipping quiescent time-steps (event_driven=True).
+
+@author: dhulse
+"""
+from examples.pump.ex_pump import Pump
+from examples.pump.test_pump import CountingPump
+from fmdtools.sim.approach import SampleApproach
+import fmdtools.sim.propagate as propagate
+
+import time
+import numpy as np
+
+def compare_event_driven(end_time=1000, verbose=True, **kwargs):
+    """
+    Compares the time-steps simulated and execution time of a SampleApproach with
+    and without event_driven.
+
+    Parameters
+    ----------
+    end_time : float, optional
+        Final time of the simulation. The default is 1000.
+    verbose : bool, optional
+        Whether to output the steps/times. The default is True.
+    **kwargs : kwargs
+        Keyword arguments to propagate.approach
+
+    Returns
+    -------
+    stats : dict
+        Steps and execution times {'full': (steps, time), 'event_driven': (steps, time)}
+    """
+    mdl = CountingPump(sp={**Pump.default_sp, 'times':(0, 20, end_time),
+                           'phases':(('start',0,4),('on',5,49),('end',50,end_time))})
+    app = SampleApproach(mdl, defaultsamp={'samp':'evenspacing','numpts':5})
+    stats = {}
+    hists = {}
+    for name, event_driven in [('full', False), ('event_driven', True)]:
+        CountingPump.steps = 0
+        starttime = time.time()
+        endclasses, hists[name] = propagate.approach(mdl, app, showprogress=False, event_driven=event_driven, **kwargs)
+        stats[name] = (CountingPump.steps, time.time()-starttime)
+    full_hist = hists['full'].flatten()
+    ev_hist = hists['event_driven'].flatten()
+    same = all([np.array_equal(full_hist[k], ev_hist[k]) for k in full_hist])
+    if verbose:
+        print("Pump (end time "+str(end_time)+", "+str(len(app.scenlist))+" scenarios): full: "
+              +str(stats['full'][0])+" steps, "+str(round(stats['full'][1],2))+" s, event_driven: "
+              +str(stats['event_driven'][0])+" steps, "+str(round(stats['event_driven'][1],2))
+              +" s, same history: "+str(same))
+    return stats
+
+if __name__=='__main__':
+    compare_event_driven(end_time=1000, staged=True, track='all')
+    compare_event_driven(end_time=10000, staged=True, track='all')
@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark comparing the time to query the degradation/faults/metrics of every
+scenario in a multi-scenario History by looping over the scenarios (with the
+History methods) and in one call with a HistoryArray.
+
+@author: dhulse
+"""
+from examples.pump.ex_pump import Pump
+from examples.eps.eps import EPS
+from fmdtools.sim.approach import SampleApproach
+from fmdtools.analyze.result import History, HistoryArray
+import fmdtools.sim.propagate as propagate
+
+import time
+import numpy as np
+
+def time_queries(mdlclass, verbose=True, **kwargs):
+    """
+    Times degradation and fault queries of the histories of a SampleApproach.
+
+    Parameters
+    ----------
+    mdlclass : class
+        Model class to instantiate.
+    verbose : bool, optional
+        Whether to output the times. The default is True.
+    **kwargs : kwargs
+        Keyword arguments to the SampleApproach
+
+    Returns
+    -------
+    times : dict
+        Query times {'loop': time, 'array': time, 'build_array': time}
+    """
+    mdl = mdlclass()
+    app = SampleApproach(mdl, **kwargs)
+    endclasses, mdlhists = propagate.approach(mdl, app, showprogress=False, track='all')
+    attrs = [*mdl.fxns, *mdl.flows]
+
+    starttime = time.time()
+    scens = {k.split('.')[0] for k in mdlhists}
+    nomhist = History({k[8:]: v for k, v in mdlhists.items() if k.startswith('nominal.')})
+    for scen in scens:
+        scenhist = History({k[len(scen)+1:]: v for k, v in mdlhists.items() if k.startswith(scen+'.')})
+        scenhist.get_degraded_hist(*attrs, nomhist=nomhist)
+        scenhist.get_faulty_hist(*mdl.fxns)
+    loop_time = time.time() - starttime
+
+    starttime = time.time()
+    ha = HistoryArray.from_history(mdlhists)
+    build_time = time.time() - starttime
+    starttime = time.time()
+    ha.get_degraded(*attrs)
+    ha.get_faulty(*mdl.fxns)
+    array_time = time.time() - starttime
+    if verbose:
+        print(mdlclass.__name__+" ("+str(len(scens))+" scenarios): loop: "+str(round(loop_time,3))
+              +" s, HistoryArray: "+str(round(array_time,4))+" s (+"+str(round(build_time,3))
+              +" s to build), speedup: "+str(round(loop_time/(array_time+build_time),1)))
+    return {'loop': loop_time, 'array': array_time, 'build_array': build_time}
+
+if __name__=='__main__':
+    time_queries(Pump, defaultsamp={'samp':'fullint'})
+    time_queries(EPS)
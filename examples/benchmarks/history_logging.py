@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark comparing the per-step cost of logging a model history using the
+getters compiled in History.compile_log (History.log) and by parsing each key
+(History.log_by_key) on the pump, tank, and multirotor examples.
+
+@author: dhulse
+"""
+from examples.pump.ex_pump import Pump
+from examples.tank.tank_model import Tank
+from examples.multirotor.drone_mdl_dynamic import Drone
+
+import time
+import numpy as np
+
+def time_logging(mdl, method='log', reps=10, track='all'):
+    """
+    Times logging a model over its simulation times (without simulating the model).
+
+    Parameters
+    ----------
+    mdl : Model
+        Model to log.
+    method : str, optional
+        History method to use to log the model ('log' or 'log_by_key'). The default is 'log'.
+    reps : int, optional
+        Number of times to log the full history. The default is 10.
+    track : str/dict, optional
+        Tracking option for the history. The default is 'all'.
+
+    Returns
+    -------
+    steptime : float
+        Average time to log a single time-step (in seconds)
+    hist : History
+        History of the model
+    """
+    timerange = np.arange(mdl.sp.times[0], mdl.sp.times[-1]+mdl.sp.dt, mdl.sp.dt)
+    hist = mdl.create_hist(timerange, track).copy()
+    hist.init_att('time', timerange[0], timerange=timerange, track='all', dtype=float)
+    logmethod = getattr(hist, method)
+    starttime = time.time()
+    for i in range(reps):
+        for t_ind, t in enumerate(timerange):
+            logmethod(mdl, t_ind, time=t)
+    return (time.time()-starttime)/(reps*len(timerange)), hist
+
+def compare_logging(mdlclass, reps=10, verbose=True, track='all'):
+    """
+    Compares the per-step logging cost of History.log and History.log_by_key
+    and checks that they produce the same history.
+
+    Parameters
+    ----------
+    mdlclass : class
+        Model class to instantiate.
+    reps : int, optional
+        Number of times to log the full history. The default is 10.
+    verbose : bool, optional
+        Whether to output execution time. The default is True.
+    track : str/dict, optional
+        Tracking option for the history. The default is 'all'.
+
+    Returns
+    -------
+    steptimes : dict
+        Per-step logging times for each method {'log': time, 'log_by_key':time}
+    """
+    mdl = mdlclass()
+    key_time, key_hist = time_logging(mdl, 'log_by_key', reps=reps, track=track)
+    c_time, c_hist = time_logging(mdl, 'log', reps=reps, track=track)
+    same = all([np.array_equal(key_hist[k], c_hist[k]) for k in key_hist])
+    if verbose:
+        print(mdlclass.__name__+" ("+str(len(c_hist))+" keys): log_by_key: "+str(round(key_time*1e6,2))
+              +" us/step, log: "+str(round(c_time*1e6,2))+" us/step, speedup: "
+              +str(round(key_time/c_time,3))+", same history: "+str(same))
+    return {'log':c_time, 'log_by_key':key_time}
+
+if __name__=='__main__':
+    compare_logging(Pump, reps=100)
+    compare_logging(Tank, reps=100)
+    compare_logging(Drone, reps=10)
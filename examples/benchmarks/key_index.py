@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark comparing the time to run key queries (get_values, get_scens,
+get_faults_hist, flatten) on a multi-scenario History by scanning every key and
+with the (cached) KeyIndex.
+
+@author: dhulse
+"""
+from examples.pump.ex_pump import Pump
+from examples.eps.eps import EPS
+from fmdtools.sim.approach import SampleApproach
+from fmdtools.analyze.result import History
+import fmdtools.sim.propagate as propagate
+
+import time
+
+def scan_queries(hist, values, scens):
+    """Runs the queries by scanning every key (the approach without an index)"""
+    keys = [*hist.keys()]
+    for v in values:
+        History({k: hist[k] for k in keys if k.endswith(v)})
+    for s in scens:
+        History({k: hist[k] for k in keys if k.startswith(s) or '.'+s+'.' in k})
+
+def index_queries(hist, values, scens):
+    """Runs the queries with the KeyIndex"""
+    for v in values:
+        hist.get_values(v)
+    for s in scens:
+        hist.get_scens(s)
+
+def time_queries(mdlclass, verbose=True, reps=10, **kwargs):
+    """
+    Times key queries of the histories of a SampleApproach.
+
+    Parameters
+    ----------
+    mdlclass : class
+        Model class to instantiate.
+    verbose : bool, optional
+        Whether to output the times. The default is True.
+    reps : int, optional
+        Number of times to repeat the queries. The default is 10.
+    **kwargs : kwargs
+        Keyword arguments to the SampleApproach
+
+    Returns
+    -------
+    times : dict
+        Query times {'scan': time, 'index': time, 'flatten': time, 'flatten_cached': time}
+    """
+    mdl = mdlclass()
+    app = SampleApproach(mdl, **kwargs)
+    endclasses, mdlhists = propagate.approach(mdl, app, showprogress=False, track='all')
+    values = ['s.'+s for fl in mdl.flows.values() for s in fl.s.__fields__][:10]
+    scens = [scen.name for scen in app.scenlist][:10] + [*mdl.fxns]
+
+    starttime = time.time()
+    for _ in range(reps):
+        scan_queries(mdlhists, values, scens)
+    scan_time = time.time() - starttime
+    starttime = time.time()
+    for _ in range(reps):
+        index_queries(mdlhists, values, scens)
+    index_time = time.time() - starttime
+
+    nested = mdlhists.nest()
+    starttime = time.time()
+    nested.flatten(History())
+    flatten_time = time.time() - starttime
+    nested.flatten()
+    starttime = time.time()
+    nested.flatten()
+    cached_time = time.time() - starttime
+    if verbose:
+        print(mdlclass.__name__+" ("+str(len(mdlhists))+" keys): scan: "+str(round(scan_time,3))
+              +" s, index: "+str(round(index_time,4))+" s, speedup: "+str(round(scan_time/index_time,1))
+              +"; flatten: "+str(round(flatten_time,4))+" s, cached: "+str(round(cached_time,4))+" s")
+    return {'scan': scan_time, 'index': index_time, 'flatten': flatten_time, 'flatten_cached': cached_time}
+
+if __name__=='__main__':
+    time_queries(Pump, defaultsamp={'samp':'fullint'})
+    time_queries(EPS)
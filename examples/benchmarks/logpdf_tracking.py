@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark comparing the execution time of evaluating the probability density of
+random draws per-draw with scipy (get_pdf_for_rand) and with the frozen 
+closed-form log-pdfs used when tracking densities (freeze_logpdf), as well as 
+the overhead of run_stochastic='track_pdf' in a stochastic model.
+
+@author: dhulse
+"""
+from examples.pump.pump_stochastic import Pump
+from fmdtools.define.rand import get_pdf_for_rand, freeze_logpdf
+import fmdtools.sim.propagate as propagate
+
+import time
+import numpy as np
+
+def compare_pdf_evals(num_draws=2000, verbose=True):
+    """
+    Compares the time to evaluate the density of num_draws draws from the
+    distributions used in the stochastic pump model.
+
+    Parameters
+    ----------
+    num_draws : int, optional
+        Number of draws to evaluate. The default is 2000.
+    verbose : bool, optional
+        Whether to output the times. The default is True.
+
+    Returns
+    -------
+    times : dict
+        Execution time (s) for each distribution {randname: (scipy time, logpdf time)}
+    """
+    rng = np.random.default_rng(1)
+    times = {}
+    for randname, args in [('normal', (1.0, 0.2)), ('triangular', (0.9, 1, 1.1)), ('choice', ([1.0, 0.9, 1.1],))]:
+        draws = [getattr(rng, randname)(*args) for i in range(num_draws)]
+        starttime = time.time()
+        pd = np.prod([get_pdf_for_rand(x, randname, args) for x in draws[:20]])
+        scipy_time = time.time()-starttime
+        starttime = time.time()
+        logpdf = freeze_logpdf(randname, args)
+        logpd = np.sum([logpdf(x) for x in draws])
+        times[randname] = (scipy_time*num_draws/20, time.time()-starttime)
+    if verbose:
+        print(str(num_draws)+" draws: "
+              +", ".join([name+": scipy "+str(round(t[0], 3))+" s, logpdf "+str(round(t[1], 4))
+                          +" s ("+str(round(t[0]/t[1]))+"x)" for name, t in times.items()]))
+    return times
+
+def compare_track_pdf(end_time=1000, verbose=True):
+    """
+    Compares the time to simulate the stochastic pump nominally with and without
+    tracking the probability density.
+
+    Parameters
+    ----------
+    end_time : float, optional
+        Final time of the simulation. The default is 1000.
+    verbose : bool, optional
+        Whether to output the times. The default is True.
+
+    Returns
+    -------
+    times : dict
+        Execution time (s) {'run_stochastic': time, 'track_pdf': time}
+    """
+    mdl = Pump(sp={**Pump.default_sp, 'times':(0, 20, end_time)})
+    times = {}
+    for run_stochastic in [True, 'track_pdf']:
+        starttime = time.time()
+        propagate.nominal(mdl, run_stochastic=run_stochastic)
+        times[str(run_stochastic)] = time.time()-starttime
+    if verbose:
+        print("Pump (end time "+str(end_time)+"): run_stochastic: "+str(round(times['True'], 2))
+              +" s, track_pdf: "+str(round(times['track_pdf'], 2))+" s")
+    return times
+
+if __name__=='__main__':
+    compare_pdf_evals()
+    compare_track_pdf()
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark reporting the fraction of time-steps saved (and the execution time)
+when simulating disturbance scenarios with splice_nominal=True, where the nominal
+history is spliced in once a scenario rejoins the nominal trajectory, for both
+non-staged and staged execution.
+
+@author: dhulse
+"""
+from examples.pump.ex_pump import Pump
+from examples.pump.test_pump import CountingPump
+import fmdtools.sim.propagate as propagate
+
+import time
+import numpy as np
+
+def run_disturbances(mdl, disturbances, **kwargs):
+    """
+    Simulates a set of disturbance scenarios.
+
+    Parameters
+    ----------
+    mdl : Model
+        Model to simulate
+    disturbances : list
+        List of disturbance sequences {time:{var:value}} to simulate
+    **kwargs : kwargs
+        Keyword arguments to propagate.sequence
+
+    Returns
+    -------
+    steps : int
+        Number of time-steps simulated in the fault scenarios
+    runtime : float
+        Execution time (s)
+    mdlhists : list
+        Histories of the scenarios
+    """
+    steps = 0
+    mdlhists = []
+    starttime = time.time()
+    for dist in disturbances:
+        endclass, mdlhist = propagate.sequence(mdl, disturbances=dist, **kwargs)
+        mdlhists.append(mdlhist)
+    runtime = time.time() - starttime
+    return runtime, mdlhists
+
+def compare_splicing(end_time=200, verbose=True, **kwargs):
+    """
+    Compares the time-steps simulated in disturbance scenarios with and without
+    splice_nominal.
+
+    Parameters
+    ----------
+    end_time : float, optional
+        Final time of the simulation. The default is 200.
+    verbose : bool, optional
+        Whether to output the steps/times. The default is True.
+    **kwargs : kwargs
+        Keyword arguments to propagate.sequence
+
+    Returns
+    -------
+    saved : float
+        Fraction of the time-steps saved by splice_nominal
+    """
+    mdl = CountingPump(sp={**Pump.default_sp, 'times':(0, 20, end_time),
+                           'phases':(('start',0,4),('on',5,49),('end',50,end_time))})
+    disturbances = [{t:{var:0.0}} for t in range(5, end_time, 10)
+                    for var in ['wat_2.s.flowrate', 'ee_1.s.current', 'sig_1.s.power']]
+    stats = {}
+    hists = {}
+    for name, splice in [('full', False), ('splice', True)]:
+        CountingPump.steps = 0
+        runtime, hists[name] = run_disturbances(mdl, disturbances, splice_nominal=splice, **kwargs)
+        stats[name] = (CountingPump.steps, runtime)
+    same = all([np.array_equal(h[k], hists['splice'][i][k]) for i, h in enumerate(hists['full']) for k in h])
+    saved = 1 - stats['splice'][0]/stats['full'][0]
+    if verbose:
+        print("Pump (end time "+str(end_time)+", "+str(len(disturbances))+" scenarios, "+str(kwargs)+"): full: "
+              +str(stats['full'][0])+" steps, "+str(round(stats['full'][1],2))+" s, splice_nominal: "
+              +str(stats['splice'][0])+" steps, "+str(round(stats['splice'][1],2))+" s, steps saved: "
+              +str(round(100*saved,1))+"%, same history: "+str(same))
+    return saved
+
+if __name__=='__main__':
+    compare_splicing(staged=False, track='all')
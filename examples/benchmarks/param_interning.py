@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark of the execution time of creating models with new parameters 
+(Model.new_with_params, as in each scenario of a parameter sweep) and of 
+copying parameters with new values (Parameter.copy_with_vals) when a few 
+distinct parameter values are repeated over many scenarios.
+
+@author: dhulse
+"""
+from examples.pump.ex_pump import Pump
+from examples.multirotor.drone_mdl_opt import Drone
+
+import time
+
+def time_new_with_params(num_scens=200, num_values=4, verbose=True):
+    """
+    Times creating models with new simulation parameters for num_scens scenarios
+    which have num_values distinct values.
+
+    Parameters
+    ----------
+    num_scens : int, optional
+        Number of scenarios. The default is 200.
+    num_values : int, optional
+        Number of distinct parameter values. The default is 4.
+    verbose : bool, optional
+        Whether to output the times. The default is True.
+
+    Returns
+    -------
+    times : dict
+        Execution time (s) per scenario {model: (copy_with_vals time, new_with_params time)}
+    """
+    times = {}
+    for name, mdl in [('pump', Pump()), ('multirotor', Drone())]:
+        dts = [mdl.sp.dt/2**i for i in range(num_values)]
+        starttime = time.time()
+        for i in range(num_scens):
+            mdl.sp.copy_with_vals(dt=dts[i%num_values])
+        copy_time = (time.time()-starttime)/num_scens
+        starttime = time.time()
+        for i in range(num_scens):
+            mdl.new_with_params(sp={'dt': dts[i%num_values]})
+        times[name] = (copy_time, (time.time()-starttime)/num_scens)
+    if verbose:
+        print(str(num_scens)+" scenarios, "+str(num_values)+" values: "
+              +", ".join([name+": copy_with_vals "+str(round(t[0]*1e6, 1))+" us, new_with_params "
+                          +str(round(t[1]*1e3, 2))+" ms" for name, t in times.items()]))
+    return times
+
+if __name__=='__main__':
+    time_new_with_params()
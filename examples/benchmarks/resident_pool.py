@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark comparing the bytes sent to the workers per scenario (and the
+scenarios/sec) when running propagate.approach in a process pool with the model
+pickled with each scenario and with the model kept resident in the workers
+(resident=True, with the pool initialized by propagate.init_resident), both
+with the nominal history pickled with each scenario and placed in shared memory
+(shared_mem=True).
+
+@author: dhulse
+"""
+from examples.pump.ex_pump import Pump
+from examples.tank.tank_model import Tank
+from examples.eps.eps import EPS
+from fmdtools.sim.approach import SampleApproach
+import fmdtools.sim.propagate as propagate
+
+import multiprocessing as mp
+import pickle
+import time
+import numpy as np
+
+class MeasuredPool():
+    """Pool wrapper which records the pickled size of the inputs sent to the pool."""
+    def __init__(self, pool):
+        self.pool = pool
+        self.input_bytes = []
+    def imap(self, func, inputs):
+        inputs = [*inputs]
+        self.input_bytes.extend([len(pickle.dumps(inp)) for inp in inputs])
+        return self.pool.imap(func, inputs)
+
+def time_pool(mdl, app, pool, **kwargs):
+    """
+    Times the simulation of a SampleApproach in a pool.
+
+    Parameters
+    ----------
+    mdl : Model
+        Model to simulate.
+    app : SampleApproach
+        Fault scenarios to simulate.
+    pool : process pool
+        Pool to simulate the scenarios in
+    **kwargs : kwargs
+        Keyword arguments to propagate.approach
+
+    Returns
+    -------
+    scens_per_sec : float
+        Scenarios simulated per second (including the nominal run)
+    bytes_per_scen : float
+        Average pickled size of the inputs sent to the pool for each scenario
+    mdlhists : History
+        Histories of the simulations
+    """
+    m_pool = MeasuredPool(pool)
+    starttime = time.time()
+    endclasses, mdlhists = propagate.approach(mdl, app, pool=m_pool, showprogress=False, **kwargs)
+    return len(app.scenlist)/(time.time()-starttime), np.mean(m_pool.input_bytes), mdlhists
+
+def compare_resident(mdlclass, pool, verbose=True, **kwargs):
+    """
+    Compares the bytes/scenario and scenarios/sec of simulating with the model
+    pickled with each scenario and resident in the workers (with and without
+    shared_mem) and checks that they produce the same histories.
+
+    Parameters
+    ----------
+    mdlclass : class
+        Model class to instantiate.
+    pool : process pool
+        Pool to simulate the scenarios in (initialized with propagate.init_resident)
+    verbose : bool, optional
+        Whether to output execution time. The default is True.
+    **kwargs : kwargs
+        Keyword arguments to propagate.approach
+
+    Returns
+    -------
+    bytes_per_scen : dict
+        Bytes/scenario for each option {'pickled': bytes, 'resident':bytes, 'resident_shared':bytes}
+    """
+    mdl = mdlclass()
+    app = SampleApproach(mdl)
+    options = {'pickled': {}, 'resident': {'resident': True},
+               'resident_shared': {'resident': True, 'shared_mem': True}}
+    rates, bytes_per_scen, hists = {}, {}, {}
+    for name, opts in options.items():
+        rates[name], bytes_per_scen[name], hists[name] = time_pool(mdl, app, pool, **opts, **kwargs)
+    p_hists = hists['pickled'].flatten()
+    same = all([np.array_equal(p_hists[k], hist.flatten()[k]) for hist in hists.values() for k in p_hists])
+    if verbose:
+        print(mdlclass.__name__+" ("+str(len(app.scenlist))+" scenarios, "+str(kwargs)+"): "
+              +", ".join([name+": "+str(int(bytes_per_scen[name]))+" bytes/scen, "+str(round(rates[name],2))+" scen/s"
+                          for name in options])+", same history: "+str(same))
+    return bytes_per_scen
+
+if __name__=='__main__':
+    specs = [propagate.get_mdl_spec(mdlclass()) for mdlclass in [Pump, Tank, EPS]]
+    pool = mp.Pool(4, initializer=propagate.init_resident, initargs=specs)
+    compare_resident(Pump, pool, track='all', staged=False)
+    compare_resident(Pump, pool, track='all', staged=True)
+    compare_resident(Tank, pool, track='all', staged=False)
+    compare_resident(EPS, pool, track='all', staged=False)
+    compare_resident(EPS, pool, track='all', staged=True)
+    pool.close()
+    pool.join()
@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark comparing the file size and save/load times of the History file formats
+(pickle, csv, json, and columnar npz, including lazy/memory-mapped loading).
+
+@author: dhulse
+"""
+from examples.eps.eps import EPS
+from fmdtools.sim.approach import SampleApproach
+from fmdtools.analyze.result import History
+import fmdtools.sim.propagate as propagate
+
+import tempfile
+import time
+import os
+
+def compare_formats(mdlclass, verbose=True, **kwargs):
+    """
+    Compares the file size and save/load times of each file format for the
+    histories of a SampleApproach.
+
+    Parameters
+    ----------
+    mdlclass : class
+        Model class to instantiate.
+    verbose : bool, optional
+        Whether to output the size/times. The default is True.
+    **kwargs : kwargs
+        Keyword arguments to propagate.approach
+
+    Returns
+    -------
+    stats : dict
+        Dict of {format: (size, save_time, load_time)}
+    """
+    mdl = mdlclass()
+    app = SampleApproach(mdl)
+    endclasses, mdlhists = propagate.approach(mdl, app, showprogress=False, **kwargs)
+    stats = {}
+    with tempfile.TemporaryDirectory() as folder:
+        for name, ext, save_kwargs, load_kwargs in [('pickle', '.pkl', {}, {}),
+                                                    ('csv', '.csv', {}, {}),
+                                                    ('json', '.json', {}, {}),
+                                                    ('npz', '.npz', {}, {}),
+                                                    ('npz (compressed)', '.npz', {'compress':True}, {}),
+                                                    ('npz (lazy)', '.npz', {}, {'lazy':True})]:
+            filename = folder+'/hist'+ext
+            starttime = time.time()
+            mdlhists.save(filename, overwrite=True, **save_kwargs)
+            save_time = time.time()-starttime
+            starttime = time.time()
+            History.load(filename, **load_kwargs)
+            load_time = time.time()-starttime
+            stats[name] = (os.path.getsize(filename), save_time, load_time)
+    if verbose:
+        print(mdlclass.__name__+" ("+str(len(mdlhists))+" keys):")
+        for name, (size, save_time, load_time) in stats.items():
+            print("    "+name+": "+str(round(size/1e6,3))+" MB, save: "+str(round(save_time,3))
+                  +" s, load: "+str(round(load_time,3))+" s")
+    return stats
+
+if __name__=='__main__':
+    compare_formats(EPS, track='all')
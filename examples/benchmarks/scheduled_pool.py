@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark comparing the execution time of staged fault scenarios in a long-horizon
+model when run in a process pool in list order (with different chunk sizes) and
+when scheduled longest-first by their estimated cost (schedule=ScenarioScheduler),
+and reporting the utilization of each worker.
+
+@author: dhulse
+"""
+from examples.pump.ex_pump import Pump
+from fmdtools.sim.approach import SampleApproach
+from fmdtools.sim.scheduler import ScenarioScheduler
+import fmdtools.sim.propagate as propagate
+
+import multiprocessing as mp
+import time
+import numpy as np
+
+def time_approach(mdl, app, pool, **kwargs):
+    """
+    Times the simulation of a SampleApproach in a pool.
+
+    Parameters
+    ----------
+    mdl : Model
+        Model to simulate.
+    app : SampleApproach
+        Fault scenarios to simulate.
+    pool : process pool
+        Pool to simulate the scenarios in
+    **kwargs : kwargs
+        Keyword arguments to propagate.approach
+
+    Returns
+    -------
+    runtime : float
+        Execution time (s)
+    mdlhists : History
+        Histories of the simulations
+    """
+    starttime = time.time()
+    endclasses, mdlhists = propagate.approach(mdl, app, pool=pool, showprogress=False, **kwargs)
+    return time.time() - starttime, mdlhists.flatten()
+
+def compare_schedules(pool, end_time=500, verbose=True, **kwargs):
+    """
+    Compares the execution time of a staged SampleApproach in list order and when
+    scheduled by estimated cost (without and with the cost history of a prior run).
+
+    Parameters
+    ----------
+    pool : process pool
+        Pool to simulate the scenarios in
+    end_time : float, optional
+        Final time of the simulation. The default is 500.
+    verbose : bool, optional
+        Whether to output the times/utilization. The default is True.
+    **kwargs : kwargs
+        Keyword arguments to propagate.approach
+
+    Returns
+    -------
+    times : dict
+        Execution times for each option
+    """
+    mdl = Pump(sp={**Pump.default_sp, 'times':(0, 20, end_time),
+                   'phases':(('start',0,4),('on',5,49),('end',50,end_time))})
+    app = SampleApproach(mdl, defaultsamp={'samp':'evenspacing','numpts':5})
+    times, hists = {}, {}
+    for chunksize in [1, 4]:
+        name = 'list order, chunksize='+str(chunksize)
+        times[name], hists[name] = time_approach(mdl, app, pool, staged=True, chunksize=chunksize, **kwargs)
+    scheduler = ScenarioScheduler()
+    for name in ['scheduled (estimated)', 'scheduled (cost history)']:
+        times[name], hists[name] = time_approach(mdl, app, pool, staged=True, schedule=scheduler, **kwargs)
+    hist = [*hists.values()][0]
+    same = all([np.array_equal(hist[k], h[k]) for h in hists.values() for k in hist])
+    if verbose:
+        print("Pump (end time "+str(end_time)+", "+str(len(app.scenlist))+" scenarios): "
+              +", ".join([name+": "+str(round(t, 2))+" s" for name, t in times.items()])+", same history: "+str(same))
+        print("worker utilization: "+str({w: round(u, 2) for w, u in scheduler.get_utilization().items()}))
+    return times
+
+if __name__=='__main__':
+    pool = mp.Pool(4)
+    compare_schedules(pool, end_time=500, track='all')
+    pool.close()
+    pool.join()
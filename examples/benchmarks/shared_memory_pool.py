@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark comparing the bytes sent to the workers per scenario (and the
+scenarios/sec) when running propagate.approach in a process pool with the default
+inputs (model and nominal history pickled with each scenario) and with
+shared_mem=True (model and nominal history placed once in shared memory).
+
+@author: dhulse
+"""
+from examples.pump.ex_pump import Pump
+from examples.eps.eps import EPS
+from examples.rover.rover_model import Rover
+from fmdtools.sim.approach import SampleApproach
+import fmdtools.sim.propagate as propagate
+
+import multiprocessing as mp
+import pickle
+import time
+import numpy as np
+
+class MeasuredPool():
+    """Pool wrapper which records the pickled size of the inputs sent to the pool."""
+    def __init__(self, pool):
+        self.pool = pool
+        self.input_bytes = []
+    def imap(self, func, inputs):
+        self.input_bytes.extend([len(pickle.dumps(inp)) for inp in inputs])
+        return self.pool.imap(func, inputs)
+
+def time_pool(mdl, app, pool, shared_mem, **kwargs):
+    """
+    Times the simulation of a SampleApproach in a pool.
+
+    Parameters
+    ----------
+    mdl : Model
+        Model to simulate.
+    app : SampleApproach
+        Fault scenarios to simulate.
+    pool : process pool
+        Pool to simulate the scenarios in
+    shared_mem : bool
+        shared_mem option for propagate.approach
+    **kwargs : kwargs
+        Keyword arguments to propagate.approach
+
+    Returns
+    -------
+    scens_per_sec : float
+        Scenarios simulated per second (including the nominal run)
+    bytes_per_scen : float
+        Average pickled size of the inputs sent to the pool for each scenario
+    mdlhists : History
+        Histories of the simulations
+    """
+    m_pool = MeasuredPool(pool)
+    starttime = time.time()
+    endclasses, mdlhists = propagate.approach(mdl, app, pool=m_pool, shared_mem=shared_mem, showprogress=False, **kwargs)
+    return len(app.scenlist)/(time.time()-starttime), np.mean(m_pool.input_bytes), mdlhists
+
+def compare_shared(mdlclass, pool, verbose=True, **kwargs):
+    """
+    Compares the bytes/scenario and scenarios/sec of shared_mem=False and
+    shared_mem=True and checks that they produce the same histories.
+
+    Parameters
+    ----------
+    mdlclass : class
+        Model class to instantiate.
+    pool : process pool
+        Pool to simulate the scenarios in
+    verbose : bool, optional
+        Whether to output execution time. The default is True.
+    **kwargs : kwargs
+        Keyword arguments to propagate.approach
+
+    Returns
+    -------
+    bytes_per_scen : dict
+        Bytes/scenario for each option {'pickled': bytes, 'shared':bytes}
+    """
+    mdl = mdlclass()
+    app = SampleApproach(mdl)
+    p_rate, p_bytes, p_hists = time_pool(mdl, app, pool, False, **kwargs)
+    s_rate, s_bytes, s_hists = time_pool(mdl, app, pool, True, **kwargs)
+    p_hists = p_hists.flatten()
+    s_hists = s_hists.flatten()
+    same = all([np.array_equal(p_hists[k], s_hists[k]) for k in p_hists])
+    if verbose:
+        print(mdlclass.__name__+" ("+str(len(app.scenlist))+" scenarios): pickled: "
+              +str(int(p_bytes))+" bytes/scen, "+str(round(p_rate,2))+" scen/s, shared: "
+              +str(int(s_bytes))+" bytes/scen, "+str(round(s_rate,2))+" scen/s, same history: "+str(same))
+    return {'pickled':p_bytes, 'shared':s_bytes}
+
+if __name__=='__main__':
+    pool = mp.Pool(4)
+    compare_shared(Pump, pool, track='all', staged=True)
+    compare_shared(EPS, pool, track='all', staged=True)
+    compare_shared(Rover, pool, track='all', staged=True)
+    pool.close()
+    pool.join()
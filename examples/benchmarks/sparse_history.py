@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark comparing the memory used by the histories of a fault sweep (and the
+execution time) when stored as dense arrays and as sparse (change-only) arrays
+(sparse_hist=True) over increasing simulation horizons.
+
+@author: dhulse
+"""
+from examples.pump.ex_pump import Pump
+import fmdtools.sim.propagate as propagate
+
+import time
+import numpy as np
+
+def compare_memory(end_time=1000, verbose=True, **kwargs):
+    """
+    Compares the memory used by the histories of single_faults with and without
+    sparse_hist.
+
+    Parameters
+    ----------
+    end_time : float, optional
+        Final time of the simulation. The default is 1000.
+    verbose : bool, optional
+        Whether to output the memory/times. The default is True.
+    **kwargs : kwargs
+        Keyword arguments to propagate.single_faults
+
+    Returns
+    -------
+    stats : dict
+        Memory (bytes) and execution times {'dense': (mem, time), 'sparse': (mem, time)}
+    """
+    mdl = Pump(sp={**Pump.default_sp, 'times':(0, 20, end_time),
+                   'phases':(('start',0,4),('on',5,49),('end',50,end_time))})
+    stats = {}
+    hists = {}
+    for name, sparse in [('dense', False), ('sparse', True)]:
+        starttime = time.time()
+        endclasses, hist = propagate.single_faults(mdl, showprogress=False, sparse_hist=sparse, **kwargs)
+        runtime = time.time()-starttime
+        hists[name] = hist.flatten()
+        stats[name] = (hists[name].get_memory()[0], runtime)
+    same = all([np.array_equal(hists['dense'][k], hists['sparse'][k]) for k in hists['dense']])
+    if verbose:
+        print("Pump (end time "+str(end_time)+"): dense: "+str(round(stats['dense'][0]/1e6, 2))+" MB, "
+              +str(round(stats['dense'][1], 2))+" s, sparse: "+str(round(stats['sparse'][0]/1e6, 2))+" MB, "
+              +str(round(stats['sparse'][1], 2))+" s, reduction: "+str(round(stats['dense'][0]/stats['sparse'][0], 1))
+              +"x, same history: "+str(same))
+    return stats
+
+if __name__=='__main__':
+    for end_time in [100, 1000, 10000]:
+        compare_memory(end_time=end_time, staged=True, track='all')
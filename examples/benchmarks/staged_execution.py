@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark comparing the scenarios/sec of staged execution in propagate.approach
+when copying the nominal model for each scenario (staged='copy') and when restoring
+a single model in place from snapshots of the nominal model (staged=True).
+
+@author: dhulse
+"""
+from examples.pump.ex_pump import Pump
+from examples.eps.eps import EPS
+from examples.rover.rover_model import Rover
+from fmdtools.sim.approach import SampleApproach
+import fmdtools.sim.propagate as propagate
+
+import time
+import numpy as np
+
+def time_staged(mdl, app, staged, **kwargs):
+    """
+    Times the simulation of a SampleApproach using a given staged execution option.
+
+    Parameters
+    ----------
+    mdl : Model
+        Model to simulate.
+    app : SampleApproach
+        Fault scenarios to simulate.
+    staged : bool/str
+        staged option for propagate.approach (True or 'copy')
+    **kwargs : kwargs
+        Keyword arguments to propagate.approach
+
+    Returns
+    -------
+    scens_per_sec : float
+        Scenarios simulated per second (including the nominal run)
+    mdlhists : History
+        Histories of the simulations
+    """
+    starttime = time.time()
+    endclasses, mdlhists = propagate.approach(mdl, app, staged=staged, showprogress=False, **kwargs)
+    return len(app.scenlist)/(time.time()-starttime), mdlhists
+
+def compare_staged(mdlclass, verbose=True, **kwargs):
+    """
+    Compares the scenarios/sec of staged='copy' and staged=True and checks that
+    they produce the same histories.
+
+    Parameters
+    ----------
+    mdlclass : class
+        Model class to instantiate.
+    verbose : bool, optional
+        Whether to output execution time. The default is True.
+    **kwargs : kwargs
+        Keyword arguments to propagate.approach
+
+    Returns
+    -------
+    scens_per_sec : dict
+        Scenarios/sec for each option {'copy': rate, 'restore':rate}
+    """
+    mdl = mdlclass()
+    app = SampleApproach(mdl)
+    copy_rate, copy_hists = time_staged(mdl, app, 'copy', **kwargs)
+    restore_rate, restore_hists = time_staged(mdl, app, True, **kwargs)
+    copy_hists = copy_hists.flatten()
+    restore_hists = restore_hists.flatten()
+    same = all([np.array_equal(copy_hists[k], restore_hists[k]) for k in copy_hists])
+    if verbose:
+        print(mdlclass.__name__+" ("+str(len(app.scenlist))+" scenarios): copy: "
+              +str(round(copy_rate,2))+" scen/s, restore: "+str(round(restore_rate,2))
+              +" scen/s, speedup: "+str(round(restore_rate/copy_rate,3))+", same history: "+str(same))
+    return {'copy':copy_rate, 'restore':restore_rate}
+
+if __name__=='__main__':
+    compare_staged(Pump, track='all')
+    compare_staged(EPS, track='all')
+    compare_staged(Rover, track='all')
@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark of the execution time of the State mutation methods (put, assign, inc,
+limit, mul, add) used in block behaviors, compared with the equivalent direct
+attribute access, and of the behavior-heavy multirotor and rover models.
+
+@author: dhulse
+"""
+from fmdtools.define.state import State
+from examples.multirotor.drone_mdl_hierarchical import Drone
+from examples.rover.rover_model import Rover
+import fmdtools.sim.propagate as propagate
+
+import time
+import timeit
+
+class ExampleState(State):
+    x:      float = 1.0
+    y:      float = 1.0
+    z:      float = 1.0
+    mode:   str = 'nominal'
+
+def compare_methods(number=100000, verbose=True):
+    """
+    Compares the time to call the State mutation methods with the time of the 
+    equivalent direct attribute access.
+
+    Parameters
+    ----------
+    number : int, optional
+        Number of calls to time (the minimum of 5 repeats is taken). The default is 100000.
+    verbose : bool, optional
+        Whether to output the times. The default is True.
+
+    Returns
+    -------
+    times : dict
+        Execution time (s) per call {method: (method time, direct time)}
+    """
+    s = ExampleState()
+    s2 = ExampleState()
+    def direct_assign():
+        s.x = s2.x; s.y = s2.y; s.z = s2.z; s.mode = s2.mode
+    def direct_inc():
+        s.x = s.x + 1.0
+        s.y = s.y + 1.0
+    calls = {'put': (lambda: s.put(x=1.0, y=2.0, mode='nominal'), 
+                     lambda: s.set_atts(x=1.0, y=2.0, mode='nominal')),
+             'assign': (lambda: s.assign(s2), direct_assign),
+             'assign (states)': (lambda: s.assign(s2, 'x', 'y'), 
+                                 lambda: setattr(s, 'x', s2.x) or setattr(s, 'y', s2.y)),
+             'inc': (lambda: s.inc(x=1.0, y=1.0), direct_inc),
+             'limit': (lambda: s.limit(x=(0.0, 10.0)), 
+                       lambda: setattr(s, 'x', min(10.0, max(0.0, s.x)))),
+             'mul': (lambda: s.mul('x', 'y', 'z'), lambda: s.x*s.y*s.z),
+             'add': (lambda: s.add('x', 'y', 'z'), lambda: s.x+s.y+s.z)}
+    times = {name: (min(timeit.repeat(method, number=number, repeat=5))/number, 
+                    min(timeit.repeat(direct, number=number, repeat=5))/number) 
+             for name, (method, direct) in calls.items()}
+    if verbose:
+        print("State methods: "+", ".join([name+": "+str(round(t[0]*1e9))+" ns (direct: "+str(round(t[1]*1e9))+" ns)"
+                                           for name, t in times.items()]))
+    return times
+
+def time_models(reps=5, verbose=True):
+    """
+    Times nominal simulations of the multirotor and rover models.
+
+    Parameters
+    ----------
+    reps : int, optional
+        Number of simulations to average over. The default is 5.
+    verbose : bool, optional
+        Whether to output the times. The default is True.
+
+    Returns
+    -------
+    times : dict
+        Execution time (s) per simulation {model: time}
+    """
+    times = {}
+    for name, mdl in [('multirotor', Drone()), ('rover', Rover())]:
+        propagate.nominal(mdl)
+        starttime = time.time()
+        for i in range(reps):
+            propagate.nominal(mdl)
+        times[name] = (time.time()-starttime)/reps
+    if verbose:
+        print("Nominal simulation: "+", ".join([name+": "+str(round(t, 3))+" s" for name, t in times.items()]))
+    return times
+
+if __name__=='__main__':
+    compare_methods()
+    time_models()
@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark comparing the 'fixed_point' and 'compiled' static propagation methods
+(set using SimParam.static_prop) on the pump, tank, and multirotor examples.
+
+@author: dhulse
+"""
+from examples.pump.ex_pump import Pump
+from examples.tank.tank_model import Tank
+from examples.multirotor.drone_mdl_dynamic import Drone
+import fmdtools.sim.propagate as propagate
+
+import time
+import numpy as np
+
+def time_static_prop(mdlclass, static_prop, reps=10, **kwargs):
+    """
+    Times the nominal simulation of a model using a given static propagation method.
+
+    Parameters
+    ----------
+    mdlclass : class
+        Model class to instantiate.
+    static_prop : str
+        Static propagation method to use (see SimParam.static_prop)
+    reps : int, optional
+        Number of simulations to average the time over. The default is 10.
+    **kwargs : kwargs
+        Keyword arguments to propagate.nominal
+
+    Returns
+    -------
+    exectime : float
+        Average execution time of the simulation (in seconds)
+    mdlhist : History
+        History of the (last) simulation
+    """
+    mdl = mdlclass(sp={**mdlclass.default_sp, 'static_prop':static_prop})
+    starttime = time.time()
+    for i in range(reps):
+        result, mdlhist = propagate.nominal(mdl, showprogress=False, **kwargs)
+    return (time.time()-starttime)/reps, mdlhist
+
+def compare_static_prop(mdlclass, reps=10, verbose=True, **kwargs):
+    """
+    Compares the execution time of the 'fixed_point' and 'compiled' static
+    propagation methods and checks that they produce the same history.
+
+    Parameters
+    ----------
+    mdlclass : class
+        Model class to instantiate.
+    reps : int, optional
+        Number of simulations to average the time over. The default is 10.
+    verbose : bool, optional
+        Whether to output execution time. The default is True.
+    **kwargs : kwargs
+        Keyword arguments to propagate.nominal
+
+    Returns
+    -------
+    exectimes : dict
+        Execution times for each method {'fixed_point': time, 'compiled':time}
+    """
+    fp_time, fp_hist = time_static_prop(mdlclass, 'fixed_point', reps=reps, **kwargs)
+    c_time, c_hist = time_static_prop(mdlclass, 'compiled', reps=reps, **kwargs)
+    fp_hist = fp_hist.flatten()
+    c_hist = c_hist.flatten()
+    same = all([np.array_equal(fp_hist[k], c_hist[k]) for k in fp_hist])
+    if verbose:
+        print(mdlclass.__name__+": fixed_point: "+str(round(fp_time,5))+" s, compiled: "
+              +str(round(c_time,5))+" s, speedup: "+str(round(fp_time/c_time,3))
+              +", same history: "+str(same))
+    return {'fixed_point':fp_time, 'compiled':c_time}
+
+if __name__=='__main__':
+    compare_static_prop(Pump, reps=50, track='all')
+    compare_static_prop(Tank, reps=50, track='all')
+    compare_static_prop(Drone, reps=3, track='all')
@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark comparing the peak memory of simulating a SampleApproach with
+propagate.approach (which accumulates the history of every scenario) and
+propagate.approach_iter (which streams each scenario, here saving each history
+to disk instead of returning it).
+
+@author: dhulse
+"""
+from examples.eps.eps import EPS
+from examples.pump.ex_pump import Pump
+from fmdtools.sim.approach import SampleApproach
+import fmdtools.sim.propagate as propagate
+
+import tracemalloc
+import tempfile
+import time
+
+def peak_memory(func, *args, **kwargs):
+    """
+    Measures the peak memory allocated (in bytes) and time while running func.
+
+    Parameters
+    ----------
+    func : callable
+        Function to run. If it returns a generator, the generator is consumed.
+    *args, **kwargs : args/kwargs
+        Arguments to func
+
+    Returns
+    -------
+    peak : int
+        Peak allocated memory (bytes)
+    runtime : float
+        Execution time (s)
+    """
+    tracemalloc.start()
+    starttime = time.time()
+    out = func(*args, **kwargs)
+    if hasattr(out, '__next__'):
+        for _ in out: pass
+    runtime = time.time() - starttime
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak, runtime
+
+def compare_streaming(mdlclass, verbose=True, **kwargs):
+    """
+    Compares the peak memory of approach and approach_iter.
+
+    Parameters
+    ----------
+    mdlclass : class
+        Model class to instantiate.
+    verbose : bool, optional
+        Whether to output the peak memory. The default is True.
+    **kwargs : kwargs
+        Keyword arguments to the SampleApproach
+
+    Returns
+    -------
+    peaks : dict
+        Peak memory for each option {'approach': bytes, 'approach_iter':bytes}
+    """
+    mdl = mdlclass()
+    app = SampleApproach(mdl, **kwargs)
+    peak, runtime = peak_memory(propagate.approach, mdl, app, staged=True, track='all', showprogress=False)
+    with tempfile.TemporaryDirectory() as folder:
+        save_args = {'mdlhist':{'filename':folder+'/hist.pkl'}, 'indiv':True}
+        peak_iter, runtime_iter = peak_memory(propagate.approach_iter, mdl, app, staged=True, track='all', showprogress=False,
+                                              return_mdlhist=False, save_args=save_args)
+    if verbose:
+        print(mdlclass.__name__+" ("+str(len(app.scenlist))+" scenarios): approach: "
+              +str(round(peak/1e6,2))+" MB peak, "+str(round(runtime,2))+" s, approach_iter: "
+              +str(round(peak_iter/1e6,2))+" MB peak, "+str(round(runtime_iter,2))+" s")
+    return {'approach': peak, 'approach_iter': peak_iter}
+
+if __name__=='__main__':
+    compare_streaming(EPS)
+    compare_streaming(Pump, defaultsamp={"samp":"fullint"})
@@ -170,6 +170,7 @@ class ImportWater(FxnBlock):
     _init_m = ImportWaterMode
     _init_wat_out = Water
     flownames = {"wat_1":"wat_out"}
+    vectorized = True # behavior may be run over arrays of states (see fmdtools.sim.ensemble)
 
     def behavior(self,time):
         """ The behavior is that if the flow has a no_wat fault, the wate level goes to zero"""
@@ -192,6 +193,7 @@ class ExportWater(FxnBlock):
     _init_m = ExportWaterMode 
     _init_wat_in = Water
     flownames = {'wat_2':'wat_in'}
+    vectorized = True
     
     def behavior(self,time):
         """ Here a blockage changes the area the output water flows through """
@@ -299,10 +301,11 @@ class MoveWat(FxnBlock):
             self.ee_in.s.current=0.2*10/5000*self.sig_in.s.power*self.ee_in.s.voltage
             self.s.eff=0.0
         else:
-            self.ee_in.s.current=10/5000*self.sig_in.s.power*self.ee_in.s.voltage*min(13.0, self.wat_out.s.pressure)
+            # np.minimum (rather than min) so the behavior may be run over arrays of states
+            self.ee_in.s.current=10/5000*self.sig_in.s.power*self.ee_in.s.voltage*np.minimum(13.0, self.wat_out.s.pressure)
             self.s.eff=1.0
         
-        velocity = self.sig_in.s.power*self.s.eff*min(1000, self.ee_in.s.voltage)*self.wat_in.s.level
+        velocity = self.sig_in.s.power*self.s.eff*np.minimum(1000, self.ee_in.s.voltage)*self.wat_in.s.level
         self.wat_out.s.pressure = 10/500 * velocity/self.wat_out.s.area
         self.wat_out.s.flowrate = 0.3/500 * velocity*self.wat_out.s.area
 
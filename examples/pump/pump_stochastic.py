@@ -30,8 +30,9 @@ class ImportEERand(Rand):
 class ImportEE(DetImportEE):
     __slots__=()
     _init_r = ImportEERand
+    vectorized = True
     def condfaults(self,time):
-        if self.ee_out.s.current>20.0: self.m.add_fault('no_v')
+        if np.any(self.ee_out.s.current>20.0): self.m.add_fault('no_v')
     def behavior(self,time):
         if self.m.has_fault('no_v'):      self.r.s.effstate=0.0 #an open circuit means no voltage is exported
         elif self.m.has_fault('inf_v'):   self.r.s.effstate=100.0 #a voltage spike means voltage is much higher
@@ -51,6 +52,7 @@ class ImportSigRand(Rand):
 class ImportSig(DetImportSig):
     __slots__=()
     _init_r=ImportSigRand
+    vectorized = True
     def behavior(self, time):
         if self.m.has_fault('no_sig'): 
             self.sig_out.power=0.0 #an open circuit means no voltage is exported
@@ -80,6 +82,9 @@ class MoveWat(DetMoveWat):
     __slots__=()
     _init_s = MoveWatStates
     _init_r=MoveWatRand
+    vectorized = True
+    def condfaults(self, time):
+        if np.any(self.indicate_over_pressure(time)): super().condfaults(time)
     def behavior(self, time):
         self.s.eff=self.r.s.eff
         super().behavior(time)
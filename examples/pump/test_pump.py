@@ -6,7 +6,7 @@ Created on Mon Dec 20 15:49:13 2021
 """
 import os
 import unittest
-from examples.pump.ex_pump import Pump
+from examples.pump.ex_pump import Pump, ImportSig
 from fmdtools.sim import propagate
 import fmdtools.analyze as an
 from fmdtools.define.common import check_pickleability
@@ -15,6 +15,31 @@ from tests.common import CommonTests
 import numpy as np
 from fmdtools.analyze.result import load, load_folder, Result, History
 
+from fmdtools.define.time import Time
+from fmdtools.define.state import State
+
+class SlowSigTime(Time):
+    dt: float = 2.0
+class CountStates(State):
+    x: float = 0.0
+class SlowCountSig(ImportSig):
+    """Signal function with a local timestep (2.0) larger than the global timestep
+    which counts the number of times its dynamic behavior runs"""
+    _init_t = SlowSigTime
+    _init_s = CountStates
+    def dynamic_behavior(self, time):
+        self.s.x += 1
+class MultiRatePump(Pump):
+    def add_fxn(self, name, fclass, *flownames, **kwargs):
+        if name=='import_signal': fclass = SlowCountSig
+        super().add_fxn(name, fclass, *flownames, **kwargs)
+class CountingPump(Pump):
+    """Pump which counts the number of time-steps simulated (reset steps before use)"""
+    steps = 0
+    def propagate(self, *args, **kwargs):
+        CountingPump.steps += 1
+        return super().propagate(*args, **kwargs)
+
 
 class PumpTests(unittest.TestCase, CommonTests):
     """Overall test structure for Pump model"""
@@ -67,6 +92,370 @@ class PumpTests(unittest.TestCase, CommonTests):
         mdl = Pump(); inj_times= [10,20,30,40]
         mdl_reset = Pump()
         self.check_model_reset(mdl, mdl_reset, inj_times, max_time=55)
+    def test_static_prop_compiled(self):
+        """Test that the compiled static propagation gives the same results as fixed-point"""
+        mdl = Pump(sp={**Pump.default_sp, 'static_prop':'compiled'})
+        endclasses, mdlhists = propagate.single_faults(mdl, showprogress=False)
+        endclasses_fp, mdlhists_fp = propagate.single_faults(self.default_mdl, showprogress=False)
+        mdlhists = mdlhists.flatten()
+        mdlhists_fp = mdlhists_fp.flatten()
+        for k in mdlhists_fp:
+            np.testing.assert_array_equal(mdlhists_fp[k], mdlhists[k])
+        inj_times = [10,20,30,40]
+        self.check_model_copy_same(mdl, Pump(sp={**Pump.default_sp, 'static_prop':'compiled'}),
+                                   inj_times, 30, max_time=55)
+    def test_snapshot_restore(self):
+        """Test that a model restored from a snapshot simulates the same as a copy"""
+        mdl = Pump()
+        mdl.create_hist(np.arange(0,56), 'all')
+        for t in range(0, 20):
+            mdl.propagate(t)
+        snap = mdl.snapshot()
+        mdl_copy = mdl.copy()
+        for t in range(20, 30):
+            mdl.propagate(t, fxnfaults={'move_water':['mech_break']} if t==20 else {})
+        mdl.restore(snap)
+        self.check_same_model(mdl, mdl_copy)
+        for t in range(20, 30):
+            mdl.propagate(t, fxnfaults={'import_ee':['no_v']} if t==25 else {})
+            mdl_copy.propagate(t, fxnfaults={'import_ee':['no_v']} if t==25 else {})
+        self.check_same_model(mdl, mdl_copy)
+    def test_staged_restore_same_as_copy(self):
+        """Test that staged execution gives the same results when restoring or copying the model"""
+        app = SampleApproach(self.mdl)
+        endclasses, mdlhists = propagate.approach(self.mdl, app, staged=True, showprogress=False, track='all')
+        endclasses_c, mdlhists_c = propagate.approach(self.mdl, app, staged='copy', showprogress=False, track='all')
+        mdlhists = mdlhists.flatten()
+        mdlhists_c = mdlhists_c.flatten()
+        for k in mdlhists_c:
+            np.testing.assert_array_equal(mdlhists_c[k], mdlhists[k])
+        for k in endclasses_c:
+            self.assertEqual(endclasses_c[k], endclasses[k])
+    def check_same_results(self, endclasses, mdlhists, endclasses_2, mdlhists_2):
+        """Checks that two sets of endclasses and histories are the same"""
+        mdlhists = mdlhists.flatten()
+        mdlhists_2 = mdlhists_2.flatten()
+        self.assertEqual(set(mdlhists), set(mdlhists_2))
+        for k in mdlhists:
+            np.testing.assert_array_equal(mdlhists[k], mdlhists_2[k])
+        for k in endclasses:
+            np.testing.assert_equal(endclasses[k], endclasses_2[k])
+    def test_converge_steps(self):
+        """Test that stopping converged scenarios early gives the same results with fewer simulated time-steps"""
+        mdl = CountingPump(sp={**Pump.default_sp, 'times':(0, 20, 200), 'phases':(('start',0,4),('on',5,49),('end',50,200))})
+        CountingPump.steps = 0
+        endclasses, mdlhists = propagate.single_faults(mdl, showprogress=False, staged=True, track='all')
+        steps = CountingPump.steps
+        CountingPump.steps = 0
+        endclasses_c, mdlhists_c = propagate.single_faults(mdl, showprogress=False, staged=True, track='all', converge_steps=3)
+        self.assertLess(CountingPump.steps, steps/2)
+        self.check_same_results(endclasses, mdlhists, endclasses_c, mdlhists_c)
+    def test_converge_steps_multirate(self):
+        """Test that multi-rate functions which have not yet run (because their local
+        timestep is larger than the global timestep) do not count as converged"""
+        mdl = MultiRatePump(sp={**Pump.default_sp, 'times':(0,20), 'phases':(('on',0,20),)})
+        _, hist = propagate.nominal(mdl, track='all')
+        _, hist_c = propagate.nominal(mdl, track='all', converge_steps=1)
+        self.assertEqual(hist_c['fxns.import_signal.s.x'][-1], 10)
+        for k in hist:
+            np.testing.assert_array_equal(hist[k], hist_c[k])
+    def test_splice_nominal(self):
+        """Test that splicing in the nominal history once a scenario rejoins the nominal gives the same results with fewer simulated time-steps"""
+        mdl = CountingPump()
+        for staged in [False, True]:
+            CountingPump.steps = 0
+            endclass, mdlhists = propagate.sequence(mdl, disturbances={10:{'wat_2.s.flowrate':0.0}}, staged=staged, track='all')
+            steps = CountingPump.steps
+            CountingPump.steps = 0
+            endclass_s, mdlhists_s = propagate.sequence(mdl, disturbances={10:{'wat_2.s.flowrate':0.0}}, staged=staged, track='all', splice_nominal=True)
+            self.assertLess(CountingPump.steps, steps)
+            self.check_same_results(endclass, mdlhists, endclass_s, mdlhists_s)
+        app = SampleApproach(mdl)
+        endclasses, mdlhists = propagate.approach(mdl, app, staged=True, showprogress=False, track='all')
+        endclasses_s, mdlhists_s = propagate.approach(mdl, app, staged=True, showprogress=False, track='all', splice_nominal=True)
+        self.check_same_results(endclasses, mdlhists, endclasses_s, mdlhists_s)
+    def test_event_driven(self):
+        """Test that skipping quiescent time-steps gives the same results with fewer 
+        simulated time-steps, including for functions which declare wake-up times"""
+        class RestartSig(ImportSig):
+            def behavior(self, time):
+                super().behavior(time)
+                if time>=150 and not self.m.has_fault('no_sig'): self.sig_out.s.power=1.0
+            def next_event(self, time):
+                if time<150: return 150.0
+                else:        return super().next_event(time)
+        class RestartPump(CountingPump):
+            def add_fxn(self, name, fclass, *flownames, **kwargs):
+                if name=='import_signal': fclass = RestartSig
+                super().add_fxn(name, fclass, *flownames, **kwargs)
+        mdl = RestartPump(sp={**Pump.default_sp, 'times':(0, 20, 300), 'phases':(('start',0,4),('on',5,49),('end',50,300))})
+        for staged in [False, True]:
+            CountingPump.steps = 0
+            endclasses, mdlhists = propagate.single_faults(mdl, showprogress=False, staged=staged, track='all')
+            steps = CountingPump.steps
+            CountingPump.steps = 0
+            endclasses_e, mdlhists_e = propagate.single_faults(mdl, showprogress=False, staged=staged, track='all', event_driven=True)
+            self.assertLess(CountingPump.steps, steps/2)
+            self.check_same_results(endclasses, mdlhists, endclasses_e, mdlhists_e)
+        self.assertEqual(mdlhists_e.flatten()['nominal.flows.sig_1.s.power'][150], 1.0)
+    def test_event_driven_multirate(self):
+        """Test that event-driven simulation wakes up multi-rate functions (with a local
+        timestep larger than the global timestep) when they are due to run"""
+        mdl = MultiRatePump(sp={**Pump.default_sp, 'times':(0,20), 'phases':(('on',0,20),)})
+        self.assertEqual(mdl.tick_calendar, {'import_signal': 2})
+        _, hist = propagate.nominal(mdl, track='all')
+        _, hist_e = propagate.nominal(mdl, track='all', event_driven=True)
+        np.testing.assert_array_equal(hist['fxns.import_signal.s.x'], np.repeat(np.arange(11), 2)[:-1])
+        for k in hist:
+            np.testing.assert_array_equal(hist[k], hist_e[k])
+    def test_approach_iter(self):
+        """Test that streaming scenarios (in order and unordered in a pool) gives the same results as approach"""
+        from multiprocessing import Pool
+        app = SampleApproach(self.mdl)
+        endclasses, mdlhists = propagate.approach(self.mdl, app, staged=True, showprogress=False)
+        with Pool(2) as pool:
+            for kwargs in [{}, {'pool':pool, 'ordered':False, 'chunksize':2}]:
+                scennames = []
+                for scenname, endclass, mdlhist in propagate.approach_iter(self.mdl, app, staged=True, showprogress=False, **kwargs):
+                    scennames.append(scenname)
+                    for k, v in endclass.flatten().items():
+                        self.assertEqual(endclasses[scenname+'.'+k], v)
+                    for k, v in mdlhist.items():
+                        np.testing.assert_array_equal(mdlhists[scenname+'.'+k], v)
+                self.assertEqual(set(scennames), {*[scen.name for scen in app.scenlist], 'nominal'})
+    def test_scheduled_pool(self):
+        """Test that scheduling scenarios by cost gives the same results as list order and records costs/utilization"""
+        from multiprocessing import Pool
+        from fmdtools.sim.scheduler import ScenarioScheduler
+        app = SampleApproach(self.mdl)
+        endclasses, mdlhists = propagate.approach(self.mdl, app, staged=True, showprogress=False)
+        scheduler = ScenarioScheduler()
+        scheduler.prepare(self.mdl, app.scenlist, staged=True)
+        chunks = scheduler.get_chunks(2)
+        self.assertEqual(sorted([i for chunk in chunks for i in chunk]), [*range(len(app.scenlist))])
+        self.assertEqual(scheduler.costs[chunks[0][0]], max(scheduler.costs))
+        with Pool(2) as pool:
+            for run in range(2):
+                endclasses_s, mdlhists_s = propagate.approach(self.mdl, app, staged=True, showprogress=False, pool=pool, schedule=scheduler)
+                self.assertEqual(endclasses, endclasses_s)
+                for k in mdlhists:
+                    np.testing.assert_array_equal(mdlhists[k], mdlhists_s[k])
+                self.assertEqual(set(scheduler.cost_hist), {scen.name for scen in app.scenlist})
+                self.assertTrue(all([0.0 <= u <= 1.0 for u in scheduler.get_utilization().values()]))
+    def test_profile(self):
+        """Test that profile=True records function/behavior times without changing the results, and aggregates over pool workers"""
+        from multiprocessing import Pool
+        from fmdtools.analyze.result import Profile
+        result, mdlhist = propagate.nominal(self.mdl, track='all')
+        result_p, mdlhist_p = propagate.nominal(self.mdl, track='all', profile=True)
+        self.assertEqual(result.endclass, result_p.endclass)
+        for k in mdlhist:
+            np.testing.assert_array_equal(mdlhist[k], mdlhist_p[k])
+        profile = result_p.profile
+        self.assertEqual(set(profile.get_fxn_times()), set(self.mdl.fxns))
+        for fxnname in self.mdl.fxns:
+            self.assertGreaterEqual(profile['fxns.'+fxnname+'.time'], profile['fxns.'+fxnname+'.behavior'])
+        self.assertEqual(profile['static.steps'], len(mdlhist.time))
+        self.assertGreaterEqual(profile['static.max_iterations'], 1)
+        self.assertGreater(profile['time.propagate'], 0.0)
+        self.assertGreater(profile['time.log'], 0.0)
+        app = SampleApproach(self.mdl)
+        endclasses, _ = propagate.approach(self.mdl, app, showprogress=False, profile=True)
+        with Pool(2) as pool:
+            endclasses_par, _ = propagate.approach(self.mdl, app, showprogress=False, profile=True, pool=pool)
+        total, total_par = Profile.aggregate(endclasses), Profile.aggregate(endclasses_par)
+        self.assertEqual(set(total), set(total_par))
+        for key in ['static.iterations', 'static.steps', 'static.max_iterations', 'fxns.move_water.calls']:
+            self.assertEqual(total[key], total_par[key])
+        self.assertEqual(total['static.iterations'], endclasses.total('profile.static.iterations'))
+    def test_tick_calendar(self):
+        """Test that injection/copy times and local timesteps are compared as integer
+        ticks, so that times which are not exactly represented in the simulation 
+        timerange (e.g., 0.3 with dt=0.1) are still simulated"""
+        class SlowImportSig(ImportSig):
+            runs = []
+            def dynamic_behavior(self, time):
+                SlowImportSig.runs.append(time)
+        class SlowPump(Pump):
+            def add_fxn(self, name, fclass, *flownames, **kwargs):
+                if name=='import_signal': fclass = SlowImportSig
+                super().add_fxn(name, fclass, *flownames, **kwargs)
+        mdl = SlowPump(sp={**Pump.default_sp, 'dt':0.1})
+        self.assertAlmostEqual(mdl.tick_unit, 0.1)
+        self.assertEqual(mdl.tick_calendar, {'import_signal': 10})
+        propagate.nominal(mdl)
+        # dynamic behavior runs at each time which is a multiple of the local timestep (1.0)
+        np.testing.assert_allclose(SlowImportSig.runs[:55], np.arange(1.0, 56.0))
+        res, hist = propagate.sequence(mdl, faultseq={0.3:{'move_water':['short']}}, track='all')
+        np.testing.assert_array_equal(hist.faulty.fxns.move_water.m.faults.short[2:5], [False, True, True])
+    def test_sparse_hist(self):
+        """Test that sparse (change-only) histories read the same as dense histories 
+        and support the History methods, while using less memory"""
+        from fmdtools.analyze.result import SparseArray
+        for staged in [False, True]:
+            endclasses, mdlhists = propagate.single_faults(self.mdl, showprogress=False, staged=staged, track='all')
+            endclasses_s, mdlhists_s = propagate.single_faults(self.mdl, showprogress=False, staged=staged, track='all', sparse_hist=True)
+            mdlhists = mdlhists.flatten()
+            mdlhists_s = mdlhists_s.flatten()
+            self.assertEqual(set(mdlhists), set(mdlhists_s))
+            self.assertTrue(any(isinstance(v, SparseArray) for v in mdlhists_s.values()))
+            for k in mdlhists:
+                np.testing.assert_array_equal(mdlhists[k], mdlhists_s[k])
+                self.assertEqual(mdlhists[k][-1], mdlhists_s[k][-1])
+                np.testing.assert_array_equal(mdlhists[k][3:20], mdlhists_s[k][3:20])
+            for k in endclasses:
+                self.assertEqual(endclasses[k], endclasses_s[k])
+            self.assertLess(mdlhists_s.get_memory()[0], mdlhists.get_memory()[0]/5)
+        for k, v in mdlhists.cut(20, 5, newcopy=True).items():
+            np.testing.assert_array_equal(v, mdlhists_s.cut(20, 5, newcopy=True)[k])
+        self.assertEqual(mdlhists.get_slice(12), mdlhists_s.get_slice(12))
+        hist_c = mdlhists_s.copy()
+        hist_c['nominal.fxns.move_water.s.eff'][10:] = 0.5
+        self.assertEqual(mdlhists_s['nominal.fxns.move_water.s.eff'][-1], 1.0)
+        self.assertEqual(hist_c['nominal.fxns.move_water.s.eff'][-1], 0.5)
+        dense_effs = mdlhists_s.to_dense().get_values('s.eff')
+        for k, v in mdlhists.get_values('s.eff').items():
+            self.assertIs(type(dense_effs[k]), np.ndarray)
+            np.testing.assert_array_equal(v, dense_effs[k])
+    def test_compact_hist(self):
+        """Test that compact histories (float32, categorical modes, packed faults)
+        read the same as full histories and support the History methods, while
+        using less memory"""
+        from fmdtools.analyze.result import CategoricalArray, PackedBoolArray
+        endclasses, mdlhists = propagate.single_faults(self.mdl, showprogress=False, staged=True, track='all')
+        endclasses_c, mdlhists_c = propagate.single_faults(self.mdl, showprogress=False, staged=True, track='all', compact_hist=True)
+        mdlhists = mdlhists.flatten()
+        mdlhists_c = mdlhists_c.flatten()
+        self.assertEqual(set(mdlhists), set(mdlhists_c))
+        self.assertIsInstance(mdlhists_c['nominal.fxns.move_water.m.mode'], CategoricalArray)
+        self.assertIsInstance(mdlhists_c['nominal.fxns.move_water.m.faults.mech_break'], PackedBoolArray)
+        self.assertEqual(mdlhists_c['nominal.fxns.move_water.s.eff'].dtype, np.float32)
+        def assert_same(hist, hist_c):
+            for k, v in hist.items():
+                if np.asarray(v).dtype.kind == 'f':
+                    np.testing.assert_allclose(v, hist_c[k], rtol=1e-6)
+                else:
+                    np.testing.assert_array_equal(v, hist_c[k])
+        assert_same(mdlhists, mdlhists_c)
+        for k in endclasses:
+            self.assertEqual(endclasses[k], endclasses_c[k])
+        self.assertLess(mdlhists_c.get_memory()[0], mdlhists.get_memory()[0]/2)
+        mode_hist = mdlhists_c['move_water_short_t20.fxns.move_water.m.mode']
+        self.assertIs(mode_hist.table, mdlhists_c['nominal.fxns.move_water.m.mode'].table)
+        self.assertEqual(mode_hist[-1], 'nominal')
+        assert_same(mdlhists.cut(20, 5, newcopy=True), mdlhists_c.cut(20, 5, newcopy=True))
+        self.assertTrue(mdlhists_c['move_water_short_t20.fxns.move_water.m.faults.short'][30])
+        assert_same(mdlhists.get_slice(30), mdlhists_c.get_slice(30))
+        hist_c = mdlhists_c.copy()
+        hist_c['nominal.fxns.move_water.m.faults.mech_break'][10:] = True
+        self.assertFalse(mdlhists_c['nominal.fxns.move_water.m.faults.mech_break'].any())
+        self.assertTrue(hist_c['nominal.fxns.move_water.m.faults.mech_break'][-1])
+        mdlhists_c.save("compact_hist.npz", overwrite=True)
+        loaded = History.load("compact_hist.npz")
+        for k in mdlhists_c:
+            np.testing.assert_array_equal(mdlhists_c[k], loaded[k])
+        os.remove("compact_hist.npz")
+        policy = {'float': None, 'atts': {'s.eff': 'float16'}}
+        half_hist = mdlhists.to_compact(policy=policy)
+        self.assertEqual(half_hist['nominal.fxns.move_water.s.eff'].dtype, np.float16)
+        self.assertEqual(half_hist['nominal.flows.wat_1.s.flowrate'].dtype, np.float64)
+    def test_delta_hist(self):
+        """Test that fault scenario histories stored as differences from the nominal
+        read the same as full histories (including degradation), while using less memory"""
+        from fmdtools.analyze.result import DeltaArray
+        app = SampleApproach(self.mdl)
+        for staged in [False, True]:
+            endclasses, mdlhists = propagate.approach(self.mdl, app, showprogress=False, staged=staged, track='all')
+            endclasses_d, mdlhists_d = propagate.approach(self.mdl, app, showprogress=False, staged=staged, track='all', delta_hist=True)
+            mdlhists = mdlhists.flatten()
+            mdlhists_d = mdlhists_d.flatten()
+            self.assertEqual(set(mdlhists), set(mdlhists_d))
+            for k in mdlhists:
+                np.testing.assert_array_equal(mdlhists[k], mdlhists_d[k])
+                self.assertEqual(mdlhists[k][-1], mdlhists_d[k][-1])
+            for k in endclasses:
+                self.assertEqual(endclasses[k], endclasses_d[k])
+            self.assertLess(mdlhists_d.get_memory()[0], mdlhists.get_memory()[0]/5)
+        scen = app.scenlist[-1].name
+        eff_hist = mdlhists_d[scen+'.fxns.move_water.s.eff']
+        self.assertIsInstance(eff_hist, DeltaArray)
+        self.assertTrue(eff_hist.is_delta_of(mdlhists_d['nominal.fxns.move_water.s.eff']))
+        deghist = mdlhists.all_with(scen).get_degraded_hist(*self.mdl.fxns, *self.mdl.flows, nomhist=mdlhists.nominal)
+        deghist_d = mdlhists_d.all_with(scen).get_degraded_hist(*self.mdl.fxns, *self.mdl.flows, nomhist=mdlhists_d.nominal)
+        for k, v in deghist.items():
+            np.testing.assert_array_equal(v, deghist_d[k])
+        for difftype in ['diff', 0.1]:
+            diffhist = mdlhists.all_with(scen).get_degraded_hist('move_water.s.eff', nomhist=mdlhists.nominal, difftype=difftype, operator=np.sum)
+            diffhist_d = mdlhists_d.all_with(scen).get_degraded_hist('move_water.s.eff', nomhist=mdlhists_d.nominal, difftype=difftype, operator=np.sum)
+            np.testing.assert_array_equal(diffhist['move_water.s.eff'], diffhist_d['move_water.s.eff'])
+        cut_hist = mdlhists_d.cut(20, 5, newcopy=True)
+        for k, v in mdlhists.cut(20, 5, newcopy=True).items():
+            np.testing.assert_array_equal(v, cut_hist[k])
+        hist_c = mdlhists_d.copy()
+        hist_c[scen+'.fxns.move_water.s.eff'][:] = 0.5
+        self.assertEqual(hist_c[scen+'.fxns.move_water.s.eff'][0], 0.5)
+        self.assertEqual(mdlhists_d[scen+'.fxns.move_water.s.eff'][0], 1.0)
+        self.assertEqual(mdlhists_d['nominal.fxns.move_water.s.eff'][0], 1.0)
+        endclass, faulthists = propagate.one_fault(self.mdl, 'move_water', 'mech_break', time=10, track='all', delta_hist=True)
+        self.assertIsInstance(faulthists['faulty.fxns.import_ee.m.faults.no_v'], DeltaArray)
+        self.assertTrue(faulthists['faulty.fxns.move_water.m.faults.mech_break'][-1])
+        self.assertFalse(faulthists['faulty.fxns.move_water.m.faults.mech_break'][9])
+    def test_history_array(self):
+        """Test that vectorized HistoryArray queries give the same results as History queries of each scenario"""
+        from fmdtools.analyze.result import HistoryArray
+        app = SampleApproach(self.mdl)
+        endclasses, mdlhists = propagate.approach(self.mdl, app, showprogress=False, track='all')
+        ha = HistoryArray.from_history(mdlhists)
+        self.assertEqual(set(ha.scens), {*[scen.name for scen in app.scenlist], 'nominal'})
+        deghist = ha.get_degraded(*self.mdl.fxns, *self.mdl.flows)
+        faultyhist = ha.get_faulty(*self.mdl.fxns)
+        metrics = ha.get_metrics('s.eff', axis=1)
+        nomhist = ha.get_scen('nominal')
+        for i, scen in enumerate(ha.scens):
+            scenhist = ha.get_scen(scen)
+            for k, v in scenhist.get_degraded_hist(*self.mdl.fxns, *self.mdl.flows, nomhist=nomhist).items():
+                np.testing.assert_array_equal(v, deghist[k][i])
+            for k, v in scenhist.get_faulty_hist(*self.mdl.fxns).items():
+                np.testing.assert_array_equal(v, faultyhist[k][i])
+            for k, v in scenhist.get_metrics('s.eff', axis=1).items():
+                np.testing.assert_allclose(v, metrics[k][i])
+            for k, v in scenhist.items():
+                np.testing.assert_array_equal(v, mdlhists[scen+'.'+k])
+    def test_key_index(self):
+        """Test that indexed key queries give the same keys as scanning every key and that flatten() is re-run after modification"""
+        app = SampleApproach(self.mdl)
+        endclasses, mdlhists = propagate.approach(self.mdl, app, showprogress=False, track='all')
+        keys = [*mdlhists.keys()]
+        for v in ['s.pressure', 'pressure', 'm.faults.no_wat', 'time']:
+            self.assertEqual([*mdlhists.get_values(v).keys()], [k for k in keys if k.endswith(v)])
+        for s in ['nominal', 'move_water', 'ee_1']:
+            self.assertEqual([*mdlhists.get_scens(s).keys()], [k for k in keys if k.startswith(s) or '.'+s+'.' in k])
+        nested = mdlhists.nest()
+        self.assertEqual(set(nested.flatten().keys()), set(keys))
+        nested['nominal']['fxns']['move_water']['extra'] = np.ones(1)
+        self.assertIn('nominal.fxns.move_water.extra', nested.flatten())
+        self.assertIn('nominal.fxns.move_water.extra', nested.flatten().get_values('extra'))
+        del nested['nominal']['fxns']['move_water']['extra']
+        self.assertEqual(set(nested.flatten().keys()), set(keys))
+    def test_hist_log_compiled(self):
+        """Test that logging with compiled getters gives the same history as logging by key"""
+        endresults, mdlhist = propagate.one_fault(self.mdl, "move_water", "mech_break", time=10, track='all')
+        timerange = mdlhist.faulty.time
+        hist = self.mdl.create_hist(timerange, 'all').copy()
+        hist_by_key = self.mdl.create_hist(timerange, 'all').copy()
+        for t_ind, t in enumerate(timerange):
+            self.mdl.propagate(t, fxnfaults={'move_water':['mech_break']} if t==10 else {})
+            hist.log(self.mdl, t_ind, time=t)
+            hist_by_key.log_by_key(self.mdl, t_ind, time=t)
+        for k in hist_by_key:
+            np.testing.assert_array_equal(hist[k], hist_by_key[k])
+            np.testing.assert_array_equal(hist[k], mdlhist.faulty[k])
+        # replacing a key (keeping the same number of keys) recompiles the getters
+        del hist['fxns.move_water.s.eff']
+        hist['fxns.move_water.p.delay'] = np.zeros(len(timerange))
+        hist.log(self.mdl, 0, time=0.0)
+        self.assertEqual(hist['fxns.move_water.p.delay'][0], 10)
+        self.assertNotIn('fxns.move_water.s.eff', hist)
     def test_approach_cost_calc(self):
         """Test that the (linear) resilience loss function is perfectly approximated 
         using the given sampling methods"""
@@ -143,57 +532,86 @@ class PumpTests(unittest.TestCase, CommonTests):
             np.testing.assert_array_equal(mdlhist[hist_key],mdlhist_saved[hist_key])
         os.remove("single_fault.json")
     def test_save_load_nominal(self):
-        for extension in [".pkl",".csv",".json"]:
+        for extension in [".pkl",".csv",".json",".npz"]:
             self.check_save_load_onerun(self.mdl, "pump_mdlhist"+extension, "pump_endclass"+extension, 'nominal')
     def test_save_load_onefault(self):
-        for extension in [".pkl",".csv",".json"]:
+        for extension in [".pkl",".csv",".json",".npz"]:
             self.check_save_load_onerun(self.mdl, "pump_mdlhist"+extension, "pump_endclass"+extension, 'one_fault', faultscen=('export_water', 'block', 25))
     def test_save_load_multfault(self):
-        for extension in [".pkl",".csv",".json"]:
+        for extension in [".pkl",".csv",".json",".npz"]:
             faultscen = {10:{"export_water": ['block']},20:{"move_water":["short"]}}
             self.check_save_load_onerun(self.mdl, "pump_mdlhist"+extension, "pump_endclass"+extension, 'sequence', faultscen =faultscen )
     def test_save_load_singlefaults(self):
         self.check_save_load_approach(self.mdl, "pump_mdlhists.pkl", "pump_endclasses.pkl", 'single_faults')
         self.check_save_load_approach(self.mdl, "pump_mdlhists.csv", "pump_endclasses.csv", 'single_faults')
         self.check_save_load_approach(self.mdl, "pump_mdlhists.json", "pump_endclasses.json", 'single_faults')
+        self.check_save_load_approach(self.mdl, "pump_mdlhists.npz", "pump_endclasses.npz", 'single_faults')
     def test_save_load_singlefaults_indiv(self):
         self.check_save_load_approach_indiv(self.mdl, "pump_mdlhists", "pump_endclasses", "pkl", 'single_faults')
         self.check_save_load_approach_indiv(self.mdl, "pump_mdlhists", "pump_endclasses", "csv", 'single_faults')
         self.check_save_load_approach_indiv(self.mdl, "pump_mdlhists", "pump_endclasses", "json", 'single_faults')
+        self.check_save_load_approach_indiv(self.mdl, "pump_mdlhists", "pump_endclasses", "npz", 'single_faults')
     def test_save_load_nominalapproach(self):
         app = NominalApproach()
         app.add_seed_replicates("replicates", 10)
         self.check_save_load_approach(self.mdl, "pump_mdlhists.pkl", "pump_endclasses.pkl", 'nominal_approach', app=app)
         self.check_save_load_approach(self.mdl, "pump_mdlhists.csv", "pump_endclasses.csv", 'nominal_approach', app=app)
         self.check_save_load_approach(self.mdl, "pump_mdlhists.json", "pump_endclasses.json", 'nominal_approach', app=app)
+        self.check_save_load_approach(self.mdl, "pump_mdlhists.npz", "pump_endclasses.npz", 'nominal_approach', app=app)
     def test_save_load_nominalapproach_indiv(self):
         app = NominalApproach()
         app.add_seed_replicates("replicates", 10)
         self.check_save_load_approach_indiv(self.mdl, "pump_mdlhists", "pump_endclasses", "pkl", 'nominal_approach', app=app)
         self.check_save_load_approach_indiv(self.mdl, "pump_mdlhists", "pump_endclasses", "csv", 'nominal_approach', app=app)
         self.check_save_load_approach_indiv(self.mdl, "pump_mdlhists", "pump_endclasses", "json", 'nominal_approach', app=app)
+        self.check_save_load_approach_indiv(self.mdl, "pump_mdlhists", "pump_endclasses", "npz", 'nominal_approach', app=app)
     def test_save_load_nestedapproach(self):
         app = NominalApproach()
         app.add_seed_replicates("replicates", 10)
         self.check_save_load_approach(self.mdl, "pump_mdlhists.pkl", "pump_endclasses.pkl", 'nested_approach', app=app)
         self.check_save_load_approach(self.mdl, "pump_mdlhists.csv", "pump_endclasses.csv", 'nested_approach', app=app)
         self.check_save_load_approach(self.mdl, "pump_mdlhists.json", "pump_endclasses.json", 'nested_approach', app=app)
+        self.check_save_load_approach(self.mdl, "pump_mdlhists.npz", "pump_endclasses.npz", 'nested_approach', app=app)
     def test_save_load_nestedapproach_indiv(self):
         app = NominalApproach()
         app.add_seed_replicates("replicates", 10)
         self.check_save_load_approach_indiv(self.mdl, "pump_mdlhists", "pump_endclasses", "pkl", 'nested_approach', app=app)
         self.check_save_load_approach_indiv(self.mdl, "pump_mdlhists", "pump_endclasses", "csv", 'nested_approach', app=app)
         self.check_save_load_approach_indiv(self.mdl, "pump_mdlhists", "pump_endclasses", "json", 'nested_approach', app=app)
+        self.check_save_load_approach_indiv(self.mdl, "pump_mdlhists", "pump_endclasses", "npz", 'nested_approach', app=app)
     def test_save_load_approach(self):
         app = SampleApproach(self.mdl)
         self.check_save_load_approach(self.mdl,"pump_mdlhists.pkl", "pump_endclasses.pkl", 'approach', app=app)
         self.check_save_load_approach(self.mdl,"pump_mdlhists.csv", "pump_endclasses.csv", 'approach', app=app)
         self.check_save_load_approach(self.mdl,"pump_mdlhists.json", "pump_endclasses.json", 'approach', app=app)
+        self.check_save_load_approach(self.mdl,"pump_mdlhists.npz", "pump_endclasses.npz", 'approach', app=app)
     def test_save_load_approach_indiv(self):
         app = SampleApproach(self.mdl)
         self.check_save_load_approach_indiv(self.mdl,"pump_mdlhists", "pump_endclasses", "pkl", 'approach', app=app)
         self.check_save_load_approach_indiv(self.mdl,"pump_mdlhists", "pump_endclasses", "csv", 'approach', app=app)
         self.check_save_load_approach_indiv(self.mdl,"pump_mdlhists", "pump_endclasses", "json", 'approach', app=app)
+        self.check_save_load_approach_indiv(self.mdl,"pump_mdlhists", "pump_endclasses", "npz", 'approach', app=app)
+    def test_save_load_lazy(self):
+        """Test that lazily-loaded (memory-mapped) npz histories are the same as the direct output"""
+        import shutil
+        if os.path.exists("pump_mdlhists.npz"): os.remove("pump_mdlhists.npz")
+        if os.path.exists("pump_mdlhists"):     shutil.rmtree("pump_mdlhists")
+        app = SampleApproach(self.mdl)
+        endclasses, mdlhists = propagate.approach(self.mdl, app, showprogress=False, track='all',
+                                                  save_args={'mdlhist':{'filename':'pump_mdlhists.npz'}})
+        hist_lazy = History.load("pump_mdlhists.npz", lazy=True)
+        self.assertFalse(hist_lazy.data.is_loaded([*hist_lazy][0]))
+        self.assertCountEqual([*mdlhists.keys()], [*hist_lazy.keys()])
+        self.compare_results(mdlhists, hist_lazy)
+        del hist_lazy
+        os.remove("pump_mdlhists.npz")
+        endclasses, mdlhists = propagate.approach(self.mdl, app, showprogress=False, track='all',
+                                                  save_args={'mdlhist':{'filename':'pump_mdlhists.npz'}, 'indiv':True})
+        hist_lazy = History.load_folder("pump_mdlhists", "npz", lazy=True)
+        self.assertCountEqual([*mdlhists.keys()], [*hist_lazy.keys()])
+        self.compare_results(mdlhists, hist_lazy)
+        del hist_lazy
+        shutil.rmtree("pump_mdlhists")
     def test_fmea_options(self):
         app = SampleApproach(self.water_mdl, faults=[('move_water','mech_break')], phases=['on'],defaultsamp={'samp':'evenspacing','numpts':5})
         endclasses, mdlhists = propagate.approach(self.water_mdl, app, showprogress=False)
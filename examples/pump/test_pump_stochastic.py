@@ -12,27 +12,78 @@ from tests.common import CommonTests
 import numpy as np
 import multiprocessing as mp
 
+def reset_rand_states(mdl):
+    """Resets the random states of the functions (which are shared between models) to their defaults"""
+    for fxn in mdl.fxns.values():
+        if hasattr(fxn.r, 's'):
+            fxn.r.s.assign(type(fxn.r.s)())
+
+from fmdtools.define.block import FxnBlock
+from fmdtools.define.model import Model
+from fmdtools.define.rand import Rand
+from fmdtools.define.state import State
+
+class DrawState(State):
+    x: float = 0.0
+class DrawRand(Rand):
+    s: DrawState = DrawState()
+class Draw(FxnBlock):
+    """Function which draws a random state which is often the same over consecutive
+    time-steps"""
+    _init_r = DrawRand
+    def dynamic_behavior(self, time):
+        self.r.set_rand('x', 'choice', [0.0, 0.0, 0.0, 1.0])
+class DrawModel(Model):
+    default_sp = dict(phases=(('on', 0, 100),), times=(0, 100), dt=1.0)
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.add_fxn('draw', Draw)
+        self.build(require_connections=False)
+
 class StochasticPumpTests(unittest.TestCase, CommonTests):
     maxDiff=None
     def setUp(self):
         self.mdl = Pump()
     def test_stochastic_pdf(self):
         """Tests that (1) track_pdf option runs and (2) gives repeated probability density results under the same seed(s)"""
-        testvals = [23.427857638009993,
-                    28.879844891816045,
-                    0.0009482614961342181,
-                    10.9180526929105,
-                    6.326593053866564,
-                    1.9736111095116995,
-                    31.579024323385077,
-                    0.016549021807197088,
-                    6.303651266980214]
+        testvals = [35.2357045399396,
+                    49.3212452970297,
+                    0.3132720199919002,
+                    21.386958080811556,
+                    3.331196298953916,
+                    9.06612059834503,
+                    131.79987407014556,
+                    5.814022438897637,
+                    19.01081621541117]
         for i in range(1,10):
             self.mdl.update_seed(i)
             self.mdl.propagate(i, run_stochastic='track_pdf')
             pd = self.mdl.return_probdens()
             #print(pd)
             self.assertAlmostEqual(pd, testvals[i-1])
+    def test_stochastic_logpdf(self):
+        """Tests that the log probability density is accumulated in log-space (matching
+        scipy) so that it does not underflow over many draws"""
+        from examples.pump.pump_stochastic import MoveWatRand
+        from scipy import stats
+        r = MoveWatRand(seed=1, run_stochastic='track_pdf')
+        draws = []
+        for i in range(500):
+            r.set_rand('eff', 'normal', 1.0, 100.0)
+            draws.append(r.s.eff)
+        self.assertAlmostEqual(r.return_logprobdens(), np.sum(stats.norm.logpdf(draws, 1.0, 100.0)))
+        self.assertEqual(r.return_probdens(), 0.0)
+        r.update_stochastic_states()
+        self.assertAlmostEqual(r.return_logprobdens(), stats.norm.logpdf(r.s.eff, 1.0, 0.2))
+        self.mdl.update_seed(1)
+        self.mdl.propagate(1, run_stochastic='track_pdf')
+        self.assertAlmostEqual(self.mdl.return_logprobdens(), np.log(self.mdl.return_probdens()))
+        # the log probability density is tracked in the history alongside probdens
+        fxn = self.mdl.fxns['move_water']
+        hist = fxn.create_hist([1.0], 'default')
+        hist.log(fxn, 0)
+        self.assertEqual(hist['r.logprobdens'][0], fxn.r.logprobdens)
+        self.assertAlmostEqual(hist['r.probdens'][0], np.exp(fxn.r.logprobdens))
     def test_run_safety(self):
         """ Tests that two models with the same seed will run the same and produce the same results"""
         for seed in [1, 10, 209840]:
@@ -47,6 +98,84 @@ class StochasticPumpTests(unittest.TestCase, CommonTests):
             self.assertTrue(all(mdlhist_1.fxns.move_water.s.eff==mdlhist_2.fxns.move_water.s.eff))
             for val in mdlhists_1:
                 self.assertTrue(all(mdlhists_1.get(val)==mdlhists_2.get(val)))
+    def test_stochastic_event_driven(self):
+        """Tests that event-driven simulation is not used in stochastic runs, where
+        equal draws over a time-step are not quiescence"""
+        _, hist = propagate.nominal(DrawModel(), run_stochastic=True, track='all')
+        _, hist_e = propagate.nominal(DrawModel(), run_stochastic=True, track='all', event_driven=True)
+        self.assertGreater(np.count_nonzero(np.diff(hist['fxns.draw.r.s.x'])), 10)
+        for k in hist:
+            np.testing.assert_array_equal(hist[k], hist_e[k])
+    def test_stochastic_converge_steps(self):
+        """Tests that stochastic runs are not stopped early, since equal draws over
+        consecutive time-steps do not mean the model has converged"""
+        _, hist = propagate.nominal(DrawModel(), run_stochastic=True, track='all')
+        _, hist_c = propagate.nominal(DrawModel(), run_stochastic=True, track='all', converge_steps=2)
+        for k in hist:
+            np.testing.assert_array_equal(hist[k], hist_c[k])
+    def test_buffered_rand(self):
+        """Tests that buffered random states (buffer_size>0) give the same values
+        regardless of the buffer size and are reproduced by snapshot/restore and assign"""
+        from examples.pump.pump_stochastic import MoveWatRand
+        from fmdtools.define.rand import RandBuffer
+        streams = []
+        for buffer_size in [1, 7, 256]:
+            r = MoveWatRand(seed=5, run_stochastic=True, buffer_size=buffer_size)
+            stream = []
+            for i in range(50):
+                r.update_stochastic_states()
+                stream.append(r.s.eff)
+            streams.append(stream)
+        self.assertEqual(len(set(streams[0])), 50)
+        self.assertEqual(streams[0], streams[1])
+        self.assertEqual(streams[0], streams[2])
+        # changing the distribution rewinds to the last value served
+        buffer = RandBuffer(5, (0,), 16)
+        vals = [buffer.draw('normal', (1.0, 0.2)) for i in range(3)]
+        vals += [buffer.draw('uniform', (0.0, 1.0)) for i in range(20)]
+        rng = np.random.default_rng(np.random.SeedSequence(5, spawn_key=(0,)))
+        seq = [rng.normal(1.0, 0.2) for i in range(3)] + [rng.uniform(0.0, 1.0) for i in range(20)]
+        np.testing.assert_allclose(vals, seq)
+        # snapshot/restore and assign reproduce the following values
+        r = MoveWatRand(seed=5, run_stochastic=True, buffer_size=7)
+        for i in range(10):
+            r.update_stochastic_states()
+        snap = r.snapshot()
+        r2 = MoveWatRand(seed=1, run_stochastic=True, buffer_size=7)
+        r2.assign(r)
+        after = []
+        for i in range(10):
+            r.update_stochastic_states()
+            r2.update_stochastic_states()
+            after.append(r.s.eff)
+            self.assertEqual(r.s.eff, r2.s.eff)
+        self.assertEqual(after, streams[0][10:20])
+        r.restore(snap)
+        r.update_stochastic_states()
+        self.assertEqual(r.s.eff, after[0])
+    def test_stream_seeds(self):
+        """Tests that blocks given keyed random streams draw from independent generators
+        which may be reconstructed from the seed and key alone"""
+        from fmdtools.define.rand import get_stream_rng
+        mdl = Pump(r={'seed':5, 'stream':('reps', 0)})
+        draws = {fxnname: fxn.r.rng.random() for fxnname, fxn in mdl.fxns.items()}
+        for fxnname, fxn in mdl.fxns.items():
+            self.assertEqual(fxn.r.stream, ('reps', 0, fxnname))
+            self.assertEqual(draws[fxnname], get_stream_rng(5, 'reps', 0, fxnname).random())
+        self.assertEqual(len(set(draws.values())), len(mdl.fxns))
+        mdl.update_seed(7)
+        for fxnname, fxn in mdl.fxns.items():
+            self.assertEqual(fxn.r.rng.random(), get_stream_rng(7, 'reps', 0, fxnname).random())
+        self.assertEqual(mdl.copy().fxns['move_water'].r.stream, ('reps', 0, 'move_water'))
+        app = NominalApproach()
+        app.add_seed_replicates("replicates", 4, stream_seed=5)
+        self.assertEqual(app.scenarios['replicates_1'].r, {'seed':5, 'stream':('replicates', 0)})
+        endclasses, mdlhists = propagate.nominal_approach(self.mdl, app, run_stochastic=True, showprogress=False)
+        endclasses_par, mdlhists_par = propagate.nominal_approach(self.mdl, app, run_stochastic=True, showprogress=False, pool=mp.Pool(2))
+        effs = [mdlhists[scen+'.fxns.move_water.r.s.eff'] for scen in app.scenarios]
+        for scen in app.scenarios: # (compared after the initial value, which is not drawn)
+            np.testing.assert_array_equal(mdlhists[scen+'.fxns.move_water.r.s.eff'][1:], mdlhists_par[scen+'.fxns.move_water.r.s.eff'][1:])
+        self.assertFalse(np.array_equal(effs[0], effs[1]))
     def test_set_seeds(self):
         for seed in [1, 10, 209840]:
             mdl = Pump(r = {'seed':seed})
@@ -65,7 +194,21 @@ class StochasticPumpTests(unittest.TestCase, CommonTests):
          ave_eff = np.mean(ave_effs); std_eff = np.mean(std_effs)
          self.assertAlmostEqual(ave_eff, mdl.fxns['move_water'].r.s.eff_update[1][0], 2) # test means
          self.assertLess(abs(std_eff-mdl.fxns['move_water'].r.s.eff_update[1][1]), 0.05)
-         
+    def test_nominal_ensemble(self):
+        """Tests that simulating seed replicates as an ensemble gives the same results as simulating them individually"""
+        mdl = Pump()
+        nomapp = NominalApproach()
+        nomapp.add_seed_replicates('default', 10)
+        reset_rand_states(mdl)
+        endresults, mdlhists = propagate.nominal_ensemble(mdl, nomapp, run_stochastic=True, track='all')
+        for scen in nomapp.scenarios.values():
+            reset_rand_states(mdl)
+            endresult, mdlhist = propagate.nominal(mdl, mdl_kwargs={'r':scen.r}, run_stochastic=True, track='all')
+            for k, v in mdlhist.flatten().items():
+                np.testing.assert_array_equal(v, mdlhists[scen.name+'.'+k])
+            for k, v in endresult.flatten().items():
+                np.testing.assert_equal(v, endresults[scen.name+'.'+k])
+
     def test_model_copy_same(self):
         self.check_model_copy_same(Pump(), Pump(), [10,20,30], 25, max_time=55, run_stochastic=True)
     def test_model_copy_different(self):
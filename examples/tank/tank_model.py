@@ -83,6 +83,7 @@ class GuideLiquid(FxnBlock):
     __slots__=('watin', 'watout')
     _init_watin=Water
     _init_watout=Water 
+    vectorized = True # behavior may be run over arrays of states (see fmdtools.sim.ensemble)
     def static_behavior(self,time):
         if self.m.has_fault('Clogged'):
             self.watin.s.put(rate=0.0,effort=0.0)
@@ -107,6 +107,12 @@ class TankTests(unittest.TestCase, CommonTests):
             slice_global = an.process.get_flat_hist_slice(mdlhist_global,t_ind=i)
             slice_loc_high = an.process.get_flat_hist_slice(mdlhist_loc_high ,t_ind=i)
             self.compare_results(slice_global, slice_loc_high)
+    def test_profile_actions(self):
+        """Tests that profiling records the time spent in the actions of an ASG"""
+        result, mdlhist = propagate.nominal(Tank(), profile=True)
+        self.assertIn('fxns.human.a.look', result.profile)
+        self.assertLessEqual(result.profile['fxns.human.a.look']+result.profile['fxns.human.a.detect'],
+                             result.profile['fxns.human.time'])
     def test_epc_math(self):
         """Spot check of epc math work in human error calculation"""
         mdl=Tank()
@@ -4,10 +4,18 @@ Description: A module defining how simulation results (histories) structured and
 
 - :class:`Result`:  Class for defining result dictionaries (nested dictionaries of metric(s))
 - :class:`History`: Class for defining simulation histories (nested dictionaries of arrays or lists)
+- :class:`SparseArray`: Class for storing history arrays compactly as the values at the indices where they change
+- :class:`CategoricalArray`: Class for storing string history arrays compactly as codes into a shared lookup table
+- :class:`PackedBoolArray`: Class for storing bool history arrays compactly as rows of a shared bit-packed matrix
+- :class:`DeltaArray`: Class for storing fault scenario history arrays as differences from the nominal history array
+- :class:`HistoryArray`: Class for analyzing multi-scenario histories as stacked (scenario, time) arrays
+- :class:`Profile`: Class for recording the execution time of simulations (per function/behavior)
 
 And functions:
 - :func:`load`:             Loads a given file to a Result/History
 - :func:`load_folder`:      Loads a given folder to a Result/History
+- :func:`save_npz`:         Saves a Result/History to a columnar (npz) file
+- :func:`load_npz`:         Loads a (lazy) dict of arrays from a columnar (npz) file
 """
 
 import numpy as np
@@ -15,7 +23,13 @@ import pandas as pd
 import copy
 import sys
 import os
+from operator import attrgetter, itemgetter
+from bisect import bisect_left
+from itertools import count
+from time import perf_counter
 from collections import UserDict
+from abc import ABC, abstractmethod
+from multiprocessing import shared_memory
 from ordered_set import OrderedSet
 from fmdtools.define.common import get_var, t_key
 
@@ -36,7 +50,7 @@ def file_check(filename, overwrite):
 
 
 def auto_filetype(filename, filetype=""):
-    """Helper function that automatically determines the filetype (pickle, csv, or json) of a given filename"""
+    """Helper function that automatically determines the filetype (pickle, csv, json, or npz) of a given filename"""
     if not filetype:
         if '.' not in filename:
             raise Exception("No file extension")
@@ -46,8 +60,10 @@ def auto_filetype(filename, filetype=""):
             filetype = "csv"
         elif filename[-5:] == '.json':
             filetype = "json"
+        elif filename[-4:] == '.npz':
+            filetype = "npz"
         else:
-            raise Exception("Invalid File Type in: "+filename+", ensure extension is pkl, csv, or json ")
+            raise Exception("Invalid File Type in: "+filename+", ensure extension is pkl, csv, json, or npz ")
     return filetype
 
 
@@ -152,6 +168,71 @@ def bootstrap_confidence_interval(data, method=np.mean, return_anyway=False, **k
         raise Exception("All data are the same!")
 
 
+class KeyIndex():
+    """
+    Index of the (dotted) string keys of a Result, used to find the keys which start
+    with, end with, or contain a given string in O(matches) rather than by scanning
+    every key.
+
+    Attributes
+    ----------
+    pos : dict
+        Position of each key in the Result {key: position}
+    sorted_keys : list
+        Keys in sorted order (for prefix search)
+    by_last : dict
+        Keys by their last component {component: [keys]}
+    by_comp : dict
+        Keys by their (non-first) components {component: [keys]}
+    """
+    def __init__(self, keys):
+        self.pos = {}
+        self.by_last = {}
+        self.by_comp = {}
+        for k in keys:
+            if type(k) != str:
+                continue
+            self.pos[k] = len(self.pos)
+            comps = k.split('.')
+            self.by_last.setdefault(comps[-1], []).append(k)
+            for comp in set(comps[1:]):
+                self.by_comp.setdefault(comp, []).append(k)
+        self.sorted_keys = sorted(self.pos)
+
+    def ordered(self, keys):
+        """Sorts (unique) keys into the order they have in the Result"""
+        return sorted(set(keys), key=self.pos.__getitem__)
+
+    def startingwith(self, prefix):
+        """Gets the keys which start with the string prefix"""
+        keys = []
+        for k in self.sorted_keys[bisect_left(self.sorted_keys, prefix):]:
+            if not k.startswith(prefix):
+                break
+            keys.append(k)
+        return keys
+
+    def endingwith(self, suffix):
+        """Gets the keys which end with the string suffix"""
+        if '.' in suffix:
+            candidates = self.by_last.get(suffix.rsplit('.', 1)[1], [])
+        else:
+            candidates = [k for name, keys in self.by_last.items() if name.endswith(suffix) for k in keys]
+        return [k for k in candidates if k.endswith(suffix)]
+
+    def containing(self, substr):
+        """Gets the keys which contain the string substr"""
+        comps = substr.split('.')
+        if substr.startswith('.') and len(comps) > 2:
+            # the first full component of substr must be a (non-first) component of the key
+            candidates = self.by_comp.get(comps[1], [])
+        else:
+            candidates = self.pos
+        return [k for k in candidates if substr in k]
+
+
+_versions = count()
+
 class Result(UserDict):
     """
     Result is a special type of dictionary that makes it convenient to store, access,
@@ -228,8 +309,35 @@ class Result(UserDict):
     def __setattr__(self, key, val):
         if key == "data":
             UserDict.__setattr__(self, key, val)
+            self.__dict__['_version'] = next(_versions)
         else:
-            self.data[key] = val
+            self[key] = val
+
+    def __setitem__(self, key, val):
+        self.__dict__['_version'] = next(_versions)
+        self.data[key] = val
+
+    def __delitem__(self, key):
+        self.__dict__['_version'] = next(_versions)
+        del self.data[key]
+
+    def _struct_version(self):
+        """Gets a signature of the (nested) result, which changes when it is
+        modified at any level"""
+        attrs = self.__dict__
+        if attrs.get('_subs_version') != attrs['_version']:
+            attrs['_subs'] = [v for v in dict.values(self.data) if isinstance(v, Result)]
+            attrs['_subs_version'] = attrs['_version']
+        return (attrs['_version'], *[sub._struct_version() for sub in attrs['_subs']])
+
+    def key_index(self):
+        """Gets the :class:`KeyIndex` of the keys of the result (built when first
+        needed and kept until the result is modified)"""
+        attrs = self.__dict__
+        if attrs.get('_keyindex_version') != attrs['_version']:
+            attrs['_keyindex'] = KeyIndex(self.data)
+            attrs['_keyindex_version'] = attrs['_version']
+        return attrs['_keyindex']
 
     def get(self, *argstr,  **to_include):
         """
@@ -261,9 +369,8 @@ class Result(UserDict):
         if attr in self:
             return self[attr]
         new = self.__class__()
-        for k, v in self.items():
-            if k.startswith(attr+'.'):
-                new[k[len(attr)+1:]] = v
+        for k in self.key_index().startingwith(attr+'.'):
+            new[k[len(attr)+1:]] = self[k]
         if len(new) > 1:
             return new
         elif len(new) > 0:
@@ -276,14 +383,18 @@ class Result(UserDict):
     def fromdict(inputdict):
         return fromdict(Result, inputdict)
 
-    def load(filename, filetype="", renest_dict=False, indiv=False):
+    def load(filename, filetype="", renest_dict=False, indiv=False, lazy=False):
         """Loads as Result using :func:`load'"""
-        inputdict = load(filename, filetype="", renest_dict=renest_dict, indiv=indiv, Rclass=Result)
+        inputdict = load(filename, filetype="", renest_dict=renest_dict, indiv=indiv, Rclass=Result, lazy=lazy)
+        if lazy:
+            return inputdict
         return fromdict(Result, inputdict)
 
-    def load_folder(folder, filetype, renest_dict=False):
+    def load_folder(folder, filetype, renest_dict=False, lazy=False):
         """Loads as History using :func:`load_folder'"""
         files_toread = load_folder(folder, filetype)
+        if lazy:
+            return load_folder_lazy(Result, folder, files_toread, filetype)
         result = Result()
         for filename in files_toread:
             result.update(Result.load(folder+'/'+filename, filetype, renest_dict=renest_dict, indiv=True))
@@ -293,7 +404,8 @@ class Result(UserDict):
     def get_values(self, *values):
         """Gets a dict with all values corresponding to the strings in *values"""
         h = self.__class__()
-        k_vs = [k for k in self.keys() for v in values if k.endswith(v)]
+        index = self.key_index()
+        k_vs = index.ordered([k for v in values for k in index.endingwith(v)])
         for k in k_vs:
             h[k] = self[k]
         return h
@@ -301,7 +413,9 @@ class Result(UserDict):
     def get_scens(self, *scens):
         """Gets a dictlike with all scenarios corresponding to the strings in *scens"""
         h = self.__class__()
-        k_s = [k for k in self.keys() for s in scens if k.startswith(s) or '.'+s+'.' in k]
+        index = self.key_index()
+        k_s = index.ordered([k for s in scens 
+                             for k in [*index.startingwith(s), *index.containing('.'+s+'.')]])
         for k in k_s:
             h[k] = self[k]
         return h
@@ -328,13 +442,15 @@ class Result(UserDict):
         if 'time' not in values:
             values = values + ('time', )
         group_hist = self.__class__()
+        index = self.key_index()
         for group, scens in groups.items(): 
             if scens == 'default':
                 scens = {k.split('.')[0] for k in self.keys()}
             elif type(scens) == str:
                 scens = [scens]
-            k_vs = [k for k in self.keys() for scen in scens for v in values 
-                    if k.startswith(scen) and k.endswith(v) and '.t.' not in k]
+            with_v = {k for v in values for k in index.endingwith(v) if '.t.' not in k}
+            k_vs = index.ordered([k for scen in scens for k in index.startingwith(scen)
+                                  if k in with_v])
             if len(k_vs) > 0 and (group not in group_hist):
                 group_hist[group] = self.__class__()
             for k in k_vs:
@@ -361,6 +477,8 @@ class Result(UserDict):
         newhist : dict
             Flattened model history of form: {(fxnflow, ..., attname):array(att)}
         """
+        if newhist is False and not prevname and to_include == 'all':
+            return self._cached_flatten()
         if newhist is False: 
             newhist = self.__class__()
 
@@ -383,6 +501,21 @@ class Result(UserDict):
                     newhist[newname] = val
         return newhist
 
+    def _cached_flatten(self):
+        """Flattens the result (with the default arguments), re-using the last
+        flattened result (and its key index) if the result has not been modified"""
+        attrs = self.__dict__
+        version = self._struct_version()
+        if attrs.get('_flat_version') != version:
+            attrs['_flat'] = self.flatten(self.__class__())
+            attrs['_flat_version'] = version
+        flat = attrs['_flat']
+        newhist = self.__class__()
+        newhist.data = type(flat.data)(flat.data)
+        newhist.__dict__['_keyindex'] = flat.key_index()
+        newhist.__dict__['_keyindex_version'] = newhist._version
+        return newhist
+
     def is_flat(self):
         """Checks if the history is flat."""
         for v in self.values():
@@ -433,10 +566,10 @@ class Result(UserDict):
             mem_profile[k] = mem
         return mem_total, mem_profile
 
-    def save(self, filename, filetype="", overwrite=False, result_id=''):
+    def save(self, filename, filetype="", overwrite=False, result_id='', compress=False):
         """
         Saves a given result variable (endclasses or mdlhists) to a file filename. 
-        Files can be saved as pkl, csv, or json.
+        Files can be saved as pkl, csv, json, or npz (columnar, see :func:`save_npz`).
     
         Parameters
         ----------
@@ -448,6 +581,9 @@ class Result(UserDict):
             Whether to overwrite existing files with this name. The default is False.
         result_id : str, optional
             For individual results saving. Places an identifier for the result in the file. The default is ''.
+        compress : bool, optional
+            Whether to compress the arrays (npz only). Compressed arrays cannot be
+            memory-mapped when loaded lazily. The default is False.
         """
         import dill, json, csv
         file_check(filename, overwrite)
@@ -466,7 +602,7 @@ class Result(UserDict):
                 if result_id:
                     writer.writerow([result_id])
                 writer.writerow(variable.keys())
-                if isinstance([*variable.values()][0], np.ndarray):
+                if isinstance([*variable.values()][0], (np.ndarray, CompactArray)):
                     writer.writerows(zip(*variable.values()))
                 else:
                     writer.writerow([*variable.values()])
@@ -475,7 +611,7 @@ class Result(UserDict):
                 variable = variable.flatten()
                 new_variable = {}
                 for key in variable:
-                    if isinstance(variable[key], np.ndarray):
+                    if isinstance(variable[key], (np.ndarray, CompactArray)):
                         new_variable[str(key)] = [var.item() for var in variable[key]]
                     else:
                         new_variable[str(key)] = variable[key]
@@ -483,6 +619,9 @@ class Result(UserDict):
                     new_variable = {result_id:new_variable}
                 strs = json.dumps(new_variable, indent=4, sort_keys=True, separators=(',', ': '), ensure_ascii=False)
                 file_handle.write(str(strs))
+        elif filetype == 'npz':
+            with open(filename, 'wb') as file_handle:
+                save_npz(variable, file_handle, result_id=result_id, compress=compress)
         else:
             raise Exception("Invalid File Type")
         file_handle.close()
@@ -669,7 +808,9 @@ def diff(val1, val2, difftype='bool'):
     difftype option ('diff' (takes the difference), 'bool' (checks if the same), 
                      and float (checks if under the provided tolerance))
     """
-    if difftype == 'diff':
+    if isinstance(val2, DeltaArray) and val2.is_delta_of(val1):
+        return val2.diff_nominal(difftype)
+    elif difftype == 'diff':
         return val1-val2
     elif difftype == 'bool':
         return val1 == val2
@@ -740,6 +881,47 @@ def get_sub_include(att, to_include):
     return new_to_include
 
 
+def compile_getter(obj, split_att):
+    """
+    Compiles a getter for the (nested) attribute split_att of obj, which can be used
+    in place of :func:`fmdtools.define.common.get_var` for objects with the same structure.
+
+    Parameters
+    ----------
+    obj : object
+        Object (e.g., Model, Function, dict) to get the attribute from
+    split_att : list
+        Nested attribute names (e.g., ['fxns', 'fxnname', 's', 'x'])
+
+    Returns
+    -------
+    getter : callable
+        Function returning the attribute when called on obj (e.g., getter(obj))
+    """
+    getters = []
+    attrs = []
+    for att in split_att:
+        if type(obj) == dict:
+            if attrs:
+                getters.append(attrgetter('.'.join(attrs)))
+                attrs = []
+            getters.append(itemgetter(att))
+            obj = obj[att]
+        else:
+            attrs.append(att)
+            obj = getattr(obj, att)
+    if attrs:
+        getters.append(attrgetter('.'.join(attrs)))
+    if len(getters) == 1:
+        return getters[0]
+
+    def getter(obj):
+        for get in getters:
+            obj = get(obj)
+        return obj
+    return getter
+
+
 def init_indicator_hist(obj, h, timerange, track):
     """
     Creates a history for an object with indicator methods (e.g., obj.indicate_XX)
@@ -832,6 +1014,465 @@ def init_dicthist(start_dict, timerange, track="all"):
     return hist
 
 
+class CompactArray(np.lib.mixins.NDArrayOperatorsMixin, ABC):
+    """
+    Superclass for 1-D history arrays which are stored in a compact form (see
+    :class:`SparseArray`, :class:`CategoricalArray`, and :class:`PackedBoolArray`)
+    but can be read as dense numpy arrays: indexing with an int gives the value 
+    at that index, slicing (or fancy indexing) gives a dense array, and numpy
+    functions and operators (e.g., np.sum, ==) operate on the dense array. Other
+    numpy array methods/attributes (e.g., .any(), .astype()) are called on the 
+    dense array.
+
+    Subclasses define dense(), from_array(), cut(), copy(), and nbytes, and have 
+    attributes length (length of the dense array) and dtype (its data type).
+    """
+    @abstractmethod
+    def dense(self, start=0, stop=None):
+        """Gets the dense array from index start to stop (not including stop)"""
+
+    @abstractmethod
+    def from_array(arr):
+        """Creates the compact array from the dense array arr"""
+
+    @abstractmethod
+    def cut(self, end_ind=None, start_ind=None):
+        """Cuts the array to the indices start_ind to end_ind"""
+
+    @abstractmethod
+    def copy(self):
+        """Creates an independent copy of the array"""
+
+    @property
+    @abstractmethod
+    def nbytes(self):
+        """Number of bytes used to store the array"""
+
+    def _get(self, ind):
+        """Gets the value at (non-negative) index ind"""
+        return self.dense(ind, ind+1)[0]
+
+    def _set_dense(self, arr):
+        """Re-encodes the array from the dense array arr"""
+        new = self.__class__.from_array(arr)
+        for slot, val in vars(new).items():
+            setattr(self, slot, val)
+
+    def __getitem__(self, key):
+        if isinstance(key, (int, np.integer)):
+            ind = key+self.length if key < 0 else key
+            if not 0 <= ind < self.length:
+                raise IndexError("index "+str(key)+" is out of bounds for "+self.__class__.__name__+" of length "+str(self.length))
+            return self._get(ind)
+        elif isinstance(key, slice) and key.step in (None, 1):
+            start, stop, _ = key.indices(self.length)
+            return self.dense(start, stop)
+        else:
+            return self.dense()[key]
+
+    def __setitem__(self, key, val):
+        arr = self.dense()
+        arr[key] = val
+        self._set_dense(arr)
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return getattr(self.dense(), name)
+
+    def __array__(self, dtype=None, copy=None):
+        arr = self.dense()
+        if dtype is not None:
+            return arr.astype(dtype)
+        return arr
+
+    def __array_ufunc__(self, ufunc, method, *inputs, **kwargs):
+        inputs = [inp.dense() if isinstance(inp, CompactArray) else inp for inp in inputs]
+        return getattr(ufunc, method)(*inputs, **kwargs)
+
+    def __len__(self):
+        return self.length
+
+    def __iter__(self):
+        return iter(self.dense())
+
+    def __repr__(self):
+        return self.__class__.__name__+"("+str(self.nbytes)+" bytes): "+repr(self.dense())
+
+    @property
+    def shape(self):
+        return (self.length,)
+
+    @property
+    def ndim(self):
+        return 1
+
+    @property
+    def size(self):
+        return self.length
+
+    def _cut_inds(self, end_ind=None, start_ind=None):
+        """Gets the start and stop indices (in the dense array) of :meth:`cut`"""
+        if end_ind is not None:
+            end_ind = end_ind+1
+        start, stop, _ = slice(start_ind, end_ind).indices(self.length)
+        return start, max(start, stop)
+
+
+class SparseArray(CompactArray):
+    """
+    Run-length encoded (change-only) 1-D array, which stores the indices where the
+    value changes and the value at each of these change points rather than the 
+    value at each index. Used by :meth:`History.to_sparse` to compactly store 
+    histories of attributes which change only a few times over a simulation 
+    (e.g., modes and fault flags).
+
+    Attributes
+    ----------
+    inds : np.ndarray
+        Indices where the value changes (starting with 0)
+    vals : np.ndarray
+        Value at each change point
+    length : int
+        Length of the (dense) array
+    dtype : np.dtype
+        Data type of the (dense) array
+    """
+    def __init__(self, inds, vals, length, dtype):
+        self.inds = np.asarray(inds, dtype=np.int64)
+        self.vals = np.asarray(vals, dtype=dtype)
+        self.length = int(length)
+        self.dtype = np.dtype(dtype)
+
+    def from_array(arr):
+        """Encodes a (dense, 1-D) array as a SparseArray"""
+        arr = np.asarray(arr)
+        if len(arr) == 0:
+            return SparseArray([], [], 0, arr.dtype)
+        changed = arr[1:] != arr[:-1]
+        if arr.dtype.kind in 'fc':
+            changed &= ~(np.isnan(arr[1:]) & np.isnan(arr[:-1]))
+        inds = np.concatenate(([0], np.flatnonzero(changed)+1))
+        return SparseArray(inds, arr[inds], len(arr), arr.dtype)
+
+    def dense(self, start=0, stop=None):
+        """Gets the dense array from index start to stop (not including stop)"""
+        if stop is None:
+            stop = self.length
+        if stop <= start:
+            return np.empty(0, dtype=self.dtype)
+        first = np.searchsorted(self.inds, start, 'right')-1
+        last = np.searchsorted(self.inds, stop, 'left')
+        bounds = np.concatenate(([start], self.inds[first+1:last], [stop]))
+        return np.repeat(self.vals[first:last], np.diff(bounds))
+
+    def _get(self, ind):
+        return self.vals[np.searchsorted(self.inds, ind, 'right')-1]
+
+    def cut(self, end_ind=None, start_ind=None):
+        """Gets the SparseArray from start_ind to end_ind (inclusive), as in :meth:`History.cut`"""
+        start, stop = self._cut_inds(end_ind, start_ind)
+        if stop == start:
+            return SparseArray([], [], 0, self.dtype)
+        first = np.searchsorted(self.inds, start, 'right')-1
+        last = np.searchsorted(self.inds, stop, 'left')
+        inds = np.concatenate(([0], self.inds[first+1:last]-start))
+        return SparseArray(inds, self.vals[first:last], stop-start, self.dtype)
+
+    def copy(self):
+        """Creates an independent copy of the SparseArray"""
+        return SparseArray(self.inds.copy(), self.vals.copy(), self.length, self.dtype)
+
+    @property
+    def nbytes(self):
+        """Bytes used to store the change points (rather than the dense array)"""
+        return self.inds.nbytes + self.vals.nbytes
+
+
+category_tables = {}
+"""Lookup tables of the categories of each attribute encoded as a 
+:class:`CategoricalArray` in :meth:`History.to_compact` (by default), which are
+shared by the histories of each scenario in the same process {att: [categories]}"""
+
+
+class CategoricalArray(CompactArray):
+    """
+    1-D array of strings (e.g., modes) stored as integer codes into a lookup 
+    table of categories, which may be shared between arrays (e.g., the histories
+    of the same attribute in different scenarios). New categories are appended 
+    to the table, so the codes of existing arrays remain valid.
+
+    Attributes
+    ----------
+    codes : np.ndarray
+        Index of the category at each index (as the smallest unsigned int type)
+    table : list
+        Categories
+    dtype : np.dtype
+        Data type of the (dense) array
+    """
+    def __init__(self, codes, table, dtype):
+        self.codes = codes
+        self.table = table
+        self.dtype = np.dtype(dtype)
+
+    def from_array(arr, table=None):
+        """
+        Encodes a (dense, 1-D) array as a CategoricalArray.
+
+        Parameters
+        ----------
+        arr : array
+            Array to encode
+        table : list, optional
+            Lookup table to use/extend with the categories in arr. The default is
+            None, which creates a new table.
+        """
+        arr = np.asarray(arr)
+        if table is None:
+            table = []
+        cats, inv = np.unique(arr, return_inverse=True)
+        lookup = {cat: i for i, cat in enumerate(table)}
+        for cat in cats.tolist():
+            if cat not in lookup:
+                lookup[cat] = len(table)
+                table.append(cat)
+        code_map = np.array([lookup[cat] for cat in cats.tolist()], dtype=np.min_scalar_type(max(len(table)-1, 0)))
+        return CategoricalArray(code_map[inv.ravel()], table, arr.dtype)
+
+    @property
+    def length(self):
+        return len(self.codes)
+
+    def dense(self, start=0, stop=None):
+        """Gets the dense array from index start to stop (not including stop)"""
+        return np.array(self.table, dtype=self.dtype)[self.codes[start:stop]]
+
+    def _set_dense(self, arr):
+        self.codes = CategoricalArray.from_array(arr, self.table).codes
+
+    def cut(self, end_ind=None, start_ind=None):
+        """Gets the CategoricalArray from start_ind to end_ind (inclusive), as in :meth:`History.cut`"""
+        start, stop = self._cut_inds(end_ind, start_ind)
+        return CategoricalArray(self.codes[start:stop].copy(), self.table, self.dtype)
+
+    def copy(self):
+        """Creates a copy of the CategoricalArray (sharing the lookup table)"""
+        return CategoricalArray(self.codes.copy(), self.table, self.dtype)
+
+    @property
+    def nbytes(self):
+        """Bytes used to store the codes (not including the shared table)"""
+        return self.codes.nbytes
+
+
+class PackedBoolArray(CompactArray):
+    """
+    1-D boolean array (e.g., a fault flag) stored as a row of bits in a bit-packed
+    matrix, which may be shared by the arrays of the same block (e.g., the 
+    fault modes of a function, see :meth:`History.to_compact`).
+
+    Attributes
+    ----------
+    bits : np.ndarray
+        Bit-packed (uint8) matrix with a row for each array
+    row : int
+        Row of the array in bits
+    length : int
+        Length of the (dense) array
+    """
+    dtype = np.dtype(bool)
+    def __init__(self, bits, row, length):
+        self.bits = bits
+        self.row = row
+        self.length = int(length)
+
+    def from_array(arr):
+        """Encodes a (dense, 1-D) bool array as a PackedBoolArray"""
+        arr = np.asarray(arr, dtype=bool)
+        return PackedBoolArray(np.packbits(arr)[np.newaxis], 0, len(arr))
+
+    def pack(arrs):
+        """Encodes a list of (dense, 1-D) bool arrays of the same length as
+        PackedBoolArrays sharing a single bit-packed matrix"""
+        bits = np.packbits(np.array(arrs, dtype=bool), axis=1)
+        return [PackedBoolArray(bits, i, len(arrs[0])) for i in range(len(arrs))]
+
+    def dense(self, start=0, stop=None):
+        """Gets the dense array from index start to stop (not including stop)"""
+        return np.unpackbits(self.bits[self.row], count=self.length).astype(bool)[start:stop]
+
+    def cut(self, end_ind=None, start_ind=None):
+        """Gets the PackedBoolArray from start_ind to end_ind (inclusive), as in :meth:`History.cut`"""
+        start, stop = self._cut_inds(end_ind, start_ind)
+        return PackedBoolArray.from_array(self.dense(start, stop))
+
+    def copy(self):
+        """Creates an independent copy of the PackedBoolArray"""
+        return PackedBoolArray(self.bits[self.row:self.row+1].copy(), 0, self.length)
+
+    @property
+    def nbytes(self):
+        """Bytes used to store the row of bits"""
+        return self.bits.shape[1]
+
+
+class DeltaArray(CompactArray):
+    """
+    1-D array stored as the differences from a (shared, dense) nominal array, 
+    i.e., the indices where the value differs from the nominal and the values at
+    these indices. Used by :meth:`History.to_delta` to store the histories of 
+    fault scenarios, which are the same as the nominal history before the fault
+    is injected (and often after).
+
+    The nominal array is referenced rather than copied, so it should not be 
+    modified after the DeltaArray is created.
+
+    Attributes
+    ----------
+    nominal : np.ndarray
+        Nominal array
+    offset : int
+        Index in the nominal array of the first index of the array
+    inds : np.ndarray
+        Indices where the value differs from the nominal
+    vals : np.ndarray
+        Values at these indices
+    length : int
+        Length of the (dense) array
+    """
+    def __init__(self, nominal, offset, inds, vals, length):
+        self.nominal = nominal
+        self.offset = int(offset)
+        self.inds = np.asarray(inds, dtype=np.int64)
+        self.vals = np.asarray(vals, dtype=nominal.dtype)
+        self.length = int(length)
+
+    def from_array(arr, nominal, offset=0):
+        """
+        Encodes a (dense, 1-D) array as a DeltaArray.
+
+        Parameters
+        ----------
+        arr : array
+            Array to encode
+        nominal : np.ndarray
+            Nominal array (of the same dtype) to encode the differences from
+        offset : int, optional
+            Index in nominal of the first index of arr. The default is 0.
+        """
+        arr = np.asarray(arr)
+        inds = np.flatnonzero(arr != nominal[offset:offset+len(arr)])
+        return DeltaArray(nominal, offset, inds, arr[inds], len(arr))
+
+    @property
+    def dtype(self):
+        return self.nominal.dtype
+
+    def _nom(self, start=0, stop=None):
+        """Gets the nominal array aligned with the array (from start to stop)"""
+        if stop is None:
+            stop = self.length
+        return self.nominal[self.offset+start:self.offset+stop]
+
+    def dense(self, start=0, stop=None):
+        """Gets the dense array from index start to stop (not including stop)"""
+        if stop is None:
+            stop = self.length
+        arr = self._nom(start, stop).copy()
+        first, last = np.searchsorted(self.inds, [start, stop])
+        arr[self.inds[first:last]-start] = self.vals[first:last]
+        return arr
+
+    def _get(self, ind):
+        i = np.searchsorted(self.inds, ind)
+        if i < len(self.inds) and self.inds[i] == ind:
+            return self.vals[i]
+        return self.nominal[self.offset+ind]
+
+    def _set_dense(self, arr):
+        new = DeltaArray.from_array(arr, self.nominal, self.offset)
+        self.inds, self.vals = new.inds, new.vals
+
+    def cut(self, end_ind=None, start_ind=None):
+        """Gets the DeltaArray from start_ind to end_ind (inclusive), as in :meth:`History.cut`"""
+        start, stop = self._cut_inds(end_ind, start_ind)
+        first, last = np.searchsorted(self.inds, [start, stop])
+        return DeltaArray(self.nominal, self.offset+start, self.inds[first:last]-start,
+                          self.vals[first:last], stop-start)
+
+    def copy(self):
+        """Creates a copy of the DeltaArray (referencing the same nominal array)"""
+        return DeltaArray(self.nominal, self.offset, self.inds.copy(), self.vals.copy(), self.length)
+
+    def is_delta_of(self, arr):
+        """Checks whether arr is the (aligned) nominal array of the DeltaArray"""
+        if not isinstance(arr, np.ndarray):
+            return False
+        nom = self._nom()
+        return (arr.shape == nom.shape and arr.strides == nom.strides and arr.dtype == nom.dtype
+                and arr.__array_interface__['data'][0] == nom.__array_interface__['data'][0])
+
+    def diff_nominal(self, difftype='bool'):
+        """
+        Computes :func:`diff` (nominal, array) from the differences only.
+
+        Parameters
+        ----------
+        difftype : 'bool'/'diff'/float
+            Way to calculate the difference (see :func:`diff`). The default is 'bool'.
+
+        Returns
+        -------
+        arr_diff : np.ndarray
+            Difference at each index
+        """
+        nom_vals = self.nominal[self.offset+self.inds]
+        if difftype == 'bool':
+            arr_diff = np.ones(self.length, dtype=bool)
+        else:
+            arr_diff = np.zeros(self.length, dtype=bool)
+        val_diff = diff(nom_vals, self.vals, difftype)
+        if difftype == 'diff':
+            arr_diff = arr_diff.astype(val_diff.dtype)
+        arr_diff[self.inds] = val_diff
+        return arr_diff
+
+    @property
+    def nbytes(self):
+        """Bytes used to store the differences (not including the shared nominal array)"""
+        return self.inds.nbytes + self.vals.nbytes
+
+
+default_dtype_policy = {'float': 'float32',
+                        'int': 'min',
+                        'str': 'categorical',
+                        'faults': 'packed',
+                        'atts': {}}
+"""
+Default policy for the data types of compact histories (see :meth:`History.to_compact`).
+
+Parameters
+----------
+    float : str/dtype/None
+        Data type to cast float arrays to (e.g., 'float32' or 'float16'). None keeps
+        the original data type.
+    int : str/dtype/None
+        Data type to cast int arrays to. 'min' uses the smallest int type which can
+        represent the values in the array. None keeps the original data type.
+    str : str/None
+        'categorical' encodes string arrays (e.g., modes) as :class:`CategoricalArray` 
+        with shared lookup tables. None keeps the original data type.
+    faults : str/None
+        'packed' encodes the fault flags of each block (*.m.faults.<mode>) as 
+        :class:`PackedBoolArray` sharing a bit-packed matrix. None keeps them as bool arrays.
+    atts : dict
+        Data types for specific attributes (by key or key ending), e.g. 
+        {'s.eff': 'float16'}, which override the above. May be a dtype, 'categorical',
+        or None (to keep the original data type).
+"""
+
+
 class History(Result):
     """ 
     History is a special time of :class:'Result' specifically for keeping simulation
@@ -860,14 +1501,18 @@ class History(Result):
     def fromdict(inputdict):
         return fromdict(History, inputdict)
 
-    def load(filename, filetype="", renest_dict=False, indiv=False):
+    def load(filename, filetype="", renest_dict=False, indiv=False, lazy=False):
         """Loads file as History using :func:`load'"""
-        inputdict = load(filename, filetype=filetype, renest_dict=renest_dict, indiv=indiv, Rclass=History)
+        inputdict = load(filename, filetype=filetype, renest_dict=renest_dict, indiv=indiv, Rclass=History, lazy=lazy)
+        if lazy:
+            return inputdict
         return fromdict(History, inputdict)
 
-    def load_folder(folder, filetype, renest_dict=False):
+    def load_folder(folder, filetype, renest_dict=False, lazy=False):
         """Loads folder as History using :func:`load_folder'"""
         files_toread = load_folder(folder, filetype)
+        if lazy:
+            return load_folder_lazy(History, folder, files_toread, filetype)
         hist = History()
         for filename in files_toread:
             hist.update(History.load(folder+'/'+filename, filetype, renest_dict=renest_dict, indiv=True))
@@ -878,12 +1523,259 @@ class History(Result):
         """Creates a new independent copy of the current history dict"""
         newhist = History()
         for k, v in self.items():
-            if isinstance(v, History):
+            if isinstance(v, (History, CompactArray)):
                 newhist[k] = v.copy()
             else:
                 newhist[k] = np.copy(v)
+        if self.__dict__.get('_log_accessors') is not None:
+            newhist.__dict__['_log_accessors'] = self.__dict__['_log_accessors']
+            newhist.__dict__['_log_version'] = newhist._struct_version()
         return newhist
 
+    def to_sparse(self, exclude=('time',)):
+        """
+        Creates a (flat) copy of the history where each (1-D, non-object) array is
+        stored as a :class:`SparseArray` of the values at the time-indices where
+        it changes, which is much smaller for attributes which rarely change 
+        (e.g., modes and fault flags). The SparseArrays can be read as dense arrays 
+        and support the History methods (e.g., cut, copy, get_slice, get_values).
+
+        Parameters
+        ----------
+        exclude : tuple, optional
+            Keys (or key endings) of arrays to keep dense. The default is ('time',),
+            since time changes at every time-step.
+
+        Returns
+        -------
+        hist : History
+            Sparse history
+        """
+        hist = self.__class__()
+        for k, v in self.flatten().items():
+            if (isinstance(v, np.ndarray) and v.ndim == 1 and v.dtype != object
+                and not any(k == ex or k.endswith('.'+ex) for ex in exclude)):
+                hist[k] = SparseArray.from_array(v)
+            else:
+                hist[k] = v
+        return hist
+
+    def to_compact(self, policy=default_dtype_policy, tables=None, exclude=('time',)):
+        """
+        Creates a (flat) copy of the history where the arrays are stored in the 
+        compact data types given by policy (e.g., float32 floats, categorical 
+        strings, and bit-packed fault flags), which can be read as arrays of the
+        original data type (except for cast floats/ints).
+
+        Parameters
+        ----------
+        policy : dict, optional
+            Data type policy. The default is :data:`default_dtype_policy`. Missing 
+            entries are taken from the default.
+        tables : dict, optional
+            Lookup tables of the categories of each attribute {key: [categories]}, 
+            which are shared by the CategoricalArrays of each attribute (and extended
+            with new categories). The default is None, which uses the tables
+            in :data:`category_tables`.
+        exclude : tuple, optional
+            Keys (or key endings) of arrays to keep as-is. The default is ('time',).
+
+        Returns
+        -------
+        hist : History
+            Compact history
+        """
+        policy = {**default_dtype_policy, **policy}
+        if tables is None:
+            tables = category_tables
+        def matches(k, ends):
+            return [end for end in ends if k == end or k.endswith('.'+end)]
+        hist = self.__class__()
+        faults = {}
+        for k, v in self.flatten().items():
+            if not isinstance(v, np.ndarray) or v.ndim != 1 or v.dtype == object or matches(k, exclude):
+                hist[k] = v
+                continue
+            att_dtype = matches(k, policy['atts'])
+            if att_dtype:
+                dtype = policy['atts'][max(att_dtype, key=len)]
+            elif v.dtype == bool and ('.m.faults.' in k or k.startswith('m.faults.')):
+                dtype = policy['faults']
+            elif v.dtype.kind == 'f':
+                dtype = policy['float']
+            elif v.dtype.kind in 'iu':
+                dtype = policy['int']
+            elif v.dtype.kind == 'U':
+                dtype = policy['str']
+            else:
+                dtype = None
+            if dtype is None:
+                hist[k] = v
+            elif dtype == 'packed':
+                faults.setdefault(k.split('m.faults.')[0], []).append(k)
+                hist[k] = v
+            elif dtype == 'categorical':
+                hist[k] = CategoricalArray.from_array(v, tables.setdefault(k, []))
+            elif dtype == 'min':
+                hist[k] = v.astype(np.result_type(np.min_scalar_type(v.min()), np.min_scalar_type(v.max()))) if len(v) else v
+            else:
+                hist[k] = v.astype(dtype)
+        for block, keys in faults.items():
+            for k, packed in zip(keys, PackedBoolArray.pack([hist[k] for k in keys])):
+                hist[k] = packed
+        return hist
+
+    def to_delta(self, nomhist):
+        """
+        Creates a (flat) copy of the (fault scenario) history where each array is 
+        stored as a :class:`DeltaArray` of the differences from the corresponding
+        array in the nominal history nomhist, which is much smaller for attributes
+        which are nominal over most of the simulation (including the time-steps 
+        before the fault is injected). Arrays are kept as-is if they have no 
+        corresponding nominal array or if they differ from the nominal at most 
+        time-steps.
+
+        The DeltaArrays reference (rather than copy) the arrays in nomhist, so
+        nomhist should not be modified in place afterwards. Degradation from these
+        nominal arrays (see :meth:`History.get_degraded_hist`) is computed from 
+        the differences.
+
+        Parameters
+        ----------
+        nomhist : History
+            Nominal history (with the same attributes, tracked over the same times)
+
+        Returns
+        -------
+        hist : History
+            Delta history
+        """
+        hist = self.flatten()
+        nomhist = nomhist.flatten()
+        offset = 0
+        if 'time' in hist and 'time' in nomhist and len(hist['time']):
+            time, nomtime = np.asarray(hist['time']), np.asarray(nomhist['time'])
+            offset = int(np.searchsorted(nomtime, time[0]))
+            if not np.array_equal(time, nomtime[offset:offset+len(time)]):
+                return hist
+        for k, v in hist.items():
+            nom = nomhist[k] if k in nomhist else None
+            if (isinstance(v, np.ndarray) and v.ndim == 1 and isinstance(nom, np.ndarray)
+                and nom.dtype == v.dtype and len(nom) >= offset+len(v)):
+                delta = DeltaArray.from_array(v, nom, offset)
+                if delta.nbytes < v.nbytes:
+                    hist[k] = delta
+        return hist
+
+    def to_dense(self):
+        """Creates a (flat) copy of the history where compact arrays (e.g., SparseArrays)
+        are converted to dense arrays (see :meth:`History.to_sparse`, :meth:`History.to_compact`,
+        :meth:`History.to_delta`)"""
+        hist = self.__class__()
+        for k, v in self.flatten().items():
+            if isinstance(v, CompactArray):
+                hist[k] = v.dense()
+            else:
+                hist[k] = v
+        return hist
+
+    def to_shared_memory(self):
+        """
+        Places the (flattened) arrays of the history in a single block of shared
+        memory, so that other processes can attach to them without copying, see
+        :meth:`History.from_shared_memory`.
+
+        Returns
+        -------
+        shm : multiprocessing.shared_memory.SharedMemory
+            Shared memory block holding the arrays. Should be closed/unlinked by
+            the caller when no longer needed.
+        hist_desc : tuple
+            Descriptor of the history (shm name, layout) with layout of structure
+            {key: ('array', offset, dtype, shape)} for arrays in the shared memory
+            block and {key: ('value', val)} for (object) values which are not.
+        """
+        flathist = self.flatten()
+        layout = {}
+        size = 0
+        for k, v in flathist.items():
+            if isinstance(v, np.ndarray) and v.dtype != object:
+                layout[k] = ('array', size, v.dtype.str, v.shape)
+                size += -(-v.nbytes//8)*8
+            else:
+                layout[k] = ('value', v)
+        shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        for k, desc in layout.items():
+            if desc[0] == 'array':
+                arr = np.frombuffer(shm.buf, dtype=desc[2], count=int(np.prod(desc[3])), offset=desc[1])
+                arr.reshape(desc[3])[...] = flathist[k]
+                del arr
+        return shm, (shm.name, layout)
+
+    def from_shared_memory(hist_desc):
+        """
+        Creates a (flat) History of read-only views of the arrays placed in shared
+        memory by :meth:`History.to_shared_memory`.
+
+        Parameters
+        ----------
+        hist_desc : tuple
+            Descriptor returned by :meth:`History.to_shared_memory`
+
+        Returns
+        -------
+        hist : History
+            History with arrays backed by the shared memory block
+        shm : multiprocessing.shared_memory.SharedMemory
+            Attached shared memory block. Must be kept open while hist is in use.
+        """
+        shm = shared_memory.SharedMemory(name=hist_desc[0])
+        hist = History()
+        for k, desc in hist_desc[1].items():
+            if desc[0] == 'array':
+                # frombuffer keeps the buffer exported, so shm cannot be closed under arr
+                arr = np.frombuffer(shm.buf, dtype=desc[2], count=int(np.prod(desc[3])), offset=desc[1]).reshape(desc[3])
+                arr.flags.writeable = False
+                hist[k] = arr
+            else:
+                hist[k] = desc[1]
+        return hist, shm
+
+    def compile_log(self, obj):
+        """
+        Compiles the keys of the history into getters for the values of obj, which
+        are then used by :meth:`History.log` to log obj without re-parsing the keys
+        at each time-step.
+
+        Parameters
+        ----------
+        obj : Model/Function/State...
+            Object to log
+        """
+        accessors = []
+        for att, hist in self.items():
+            arg = None
+            if att == 'time':
+                kind = 'time'
+                getter = None
+            elif att.startswith('i.') or '.i.' in att:
+                split_att = att.split('.')
+                i_ind = split_att.index('i')
+                kind = 'indicator'
+                getter = compile_getter(obj, split_att[:i_ind] + ['indicate_'+split_att[-1]])
+            elif 'faults' in att:
+                split_att = att.split('.')
+                faultind = split_att.index('faults')
+                kind = 'fault'
+                getter = compile_getter(obj, split_att[:faultind])
+                arg = split_att[faultind+1]
+            else:
+                kind = 'var'
+                getter = compile_getter(obj, att.split('.'))
+            copy_val = type(hist) == list or (isinstance(hist, np.ndarray) and hist.dtype == object)
+            accessors.append((att, kind, getter, arg, copy_val))
+        self.__dict__['_log_accessors'] = accessors
+
     def log(self, obj, t_ind, time=None):
         """
         Updates the history from obj at the time t_ind
@@ -897,7 +1789,71 @@ class History(Result):
         time : float
             Real time for the history (if initialized). Used at the top level of the history.
         """
-        for att, hist in self.items():
+        attrs = self.__dict__
+        data = self.data
+        version = self._struct_version()
+        if attrs.get('_log_version') != version:
+            # (re)compile when the keys change, recording if compiling failed
+            try:
+                self.compile_log(obj)
+            except Exception:
+                attrs['_log_accessors'] = None
+            attrs['_log_version'] = version
+        accessors = attrs.get('_log_accessors')
+        if accessors is None:
+            return self.log_by_key(obj, t_ind, time=time)
+        i = 0
+        try:
+            for att, kind, getter, arg, copy_val in accessors:
+                if kind == 'var':
+                    val = getter(obj)
+                elif kind == 'fault':
+                    val = arg in getter(obj).faults
+                elif kind == 'indicator':
+                    val = getter(obj)(time)
+                elif time is not None:
+                    val = time
+                else:
+                    val = get_var(obj, att)
+                hist = data[att]
+                if copy_val:
+                    if is_known_mutable(val):
+                        val = copy.deepcopy(val)
+                    if type(hist) == list:
+                        hist.append(val)
+                        i += 1
+                        continue
+                if type(hist) == History:
+                    hist.log(val, t_ind)
+                else:
+                    hist[t_ind] = val
+                i += 1
+        except Exception:
+            # log remaining atts by key to raise the appropriate error (recompiling at the next log)
+            attrs['_log_accessors'] = attrs['_log_version'] = None
+            logged = {acc[0] for acc in accessors[:i]}
+            self.log_by_key(obj, t_ind, time=time, atts=[att for att in data if att not in logged])
+
+    def log_by_key(self, obj, t_ind, time=None, atts=None):
+        """
+        Updates the history from obj at the time t_ind by parsing each key
+        (rather than using the getters compiled in :meth:`History.compile_log`).
+
+        Parameters
+        ----------
+        obj : Model/Function/State...
+            Object to log
+        t_ind : int
+            Time-index of the log.
+        time : float
+            Real time for the history (if initialized). Used at the top level of the history.
+        atts : list, optional
+            Keys of the history to log. The default is None, which logs all keys.
+        """
+        if atts is None:
+            atts = [*self.keys()]
+        for att in atts:
+            hist = self[att]
             try:
                 val = None
                 if att == 'time' and time is not None:
@@ -926,7 +1882,7 @@ class History(Result):
                     val = copy.deepcopy(val)
                 if type(hist) == list:
                     hist.append(val)
-                elif isinstance(hist, np.ndarray):  
+                elif isinstance(hist, (np.ndarray, CompactArray)):  
                     try:
                         hist[t_ind] = val
                     except Exception as e:
@@ -939,6 +1895,63 @@ class History(Result):
                         else:
                             raise Exception(obj_str+"Value too large to represent: "+att+"="+str(val)) from e
 
+    def fill(self, start_ind, times, obj=None):
+        """
+        Fills the history after start_ind with the values at start_ind (e.g., for a
+        model which has stopped changing), rather than logging each time.
+
+        Parameters
+        ----------
+        start_ind : int
+            Time-index of the last logged values.
+        times : list
+            Times of the history from start_ind onward, e.g. [t_start, t_1... t_n]
+            fills n time-steps after start_ind.
+        obj : Model/Function/State..., optional
+            Object the history is logged from. If provided, the time and indicators
+            (which may depend on time) are logged at each of the given times 
+            rather than filled. The default is None.
+        """
+        end_ind = start_ind+len(times)
+        for att, hist in self.items():
+            if obj is not None and att == 'time':
+                hist[start_ind:end_ind] = times
+            elif obj is not None and (att.startswith('i.') or '.i.' in att):
+                for i, time in enumerate(times):
+                    self.log_by_key(obj, start_ind+i, time=time, atts=[att])
+            elif type(hist) == History:
+                hist.fill(start_ind, times)
+            elif type(hist) == list:
+                hist.extend([copy.deepcopy(hist[-1]) for _ in times[1:]])
+            elif hist.dtype == object:
+                for i in range(start_ind+1, end_ind):
+                    hist[i] = copy.deepcopy(hist[start_ind])
+            else:
+                hist[start_ind+1:end_ind] = hist[start_ind]
+
+    def splice(self, other, start_ind, end_ind):
+        """
+        Copies the values of another history with the same structure (e.g., the
+        nominal history) into the history from start_ind to end_ind (inclusive).
+
+        Parameters
+        ----------
+        other : History
+            History to copy the values from.
+        start_ind : int
+            First time-index to copy.
+        end_ind : int
+            Last time-index to copy.
+        """
+        for att, hist in self.items():
+            other_hist = other[att]
+            if type(hist) == History:
+                hist.splice(other_hist, start_ind, end_ind)
+            elif type(hist) == list:
+                hist[start_ind:] = copy.deepcopy(other_hist[start_ind:end_ind+1])
+            else:
+                hist[start_ind:end_ind+1] = other_hist[start_ind:end_ind+1]
+
     def cut(self, end_ind=None, start_ind=None, newcopy=False):
         """Cuts the history to a given index"""
         if newcopy:
@@ -948,6 +1961,8 @@ class History(Result):
         for name, att in hist.items():
             if isinstance(att, History):
                 hist[name] = hist[name].cut(end_ind, start_ind, newcopy=False)
+            elif isinstance(att, CompactArray):
+                hist[name] = att.cut(end_ind, start_ind)
             else:   
                 try:
                     if end_ind is None:
@@ -972,7 +1987,7 @@ class History(Result):
 
     def is_in(self, at):
         """ checks if at is in the dictionary"""
-        return any([k for k in self.keys() if at in k])
+        return any(at in k for k in self.keys())
 
     def get_fault_time(self, metric="earliest"):
         """
@@ -1075,10 +2090,11 @@ class History(Result):
         faults_hist = History()
         if not attrs:
             attrs = self.keys()
+        index = faulthist.key_index()
         for att in attrs:
-            faults_hist[att] = History({k.split('.')[-1]:v for k, v in faulthist.items() 
-                                        if ('.'+att+'.m.faults' in k) or 
-                                        (att+'.m.faults' in k and k.startswith(att))})
+            fault_keys = index.ordered([*index.containing('.'+att+'.m.faults'),
+                                        *[k for k in index.startingwith(att) if att+'.m.faults' in k]])
+            faults_hist[att] = History({k.split('.')[-1]:faulthist[k] for k in fault_keys})
         return faults_hist
 
     def get_faulty_hist(self, *attrs, withtime=True, withtotal=True, operator=np.any):
@@ -1242,7 +2258,310 @@ class History(Result):
         return metrics
 
 
-def load(filename, filetype="", renest_dict=True, indiv=False, Rclass=History):
+class HistoryArray():
+    """
+    Representation of a multi-scenario History where the values of each attribute
+    are stacked across the N scenarios into a single (N, T) array, so that queries
+    over all scenarios can be performed with numpy in one call.
+
+    e.g., for a (flat) History hist with keys 'scen1.flows.x.s.y', 'scen2.flows.x.s.y',
+        ha = HistoryArray.from_history(hist)
+        ha['flows.x.s.y']
+        > array with shape (2, T)
+        ha.scens
+        > ('scen1', 'scen2')
+
+    Attributes
+    ----------
+    scens : tuple
+        Names of the scenarios (rows of the arrays)
+    scen_index : dict
+        Index of each scenario {scen: row}
+    data : dict
+        Stacked arrays for each attribute {attribute: array(N, T)}
+    """
+    def __init__(self, scens, data):
+        self.scens = tuple(scens)
+        self.scen_index = {scen: i for i, scen in enumerate(self.scens)}
+        self.data = data
+
+    def from_history(hist, *scens):
+        """
+        Creates a HistoryArray from a multi-scenario History (e.g., from propagate.approach).
+
+        Parameters
+        ----------
+        hist : History
+            History with (flattened) keys of the form 'scen.attribute'
+        *scens : str
+            Scenarios to include. If not provided, all scenarios are included.
+
+        Returns
+        -------
+        ha : HistoryArray
+            Stacked history. Histories which end early (e.g., from an end condition)
+            are padded with their last value.
+        """
+        flathist = hist.flatten()
+        scenkeys = {}
+        for k in flathist:
+            scen, att = k.split('.', 1)
+            if not scens or scen in scens:
+                scenkeys.setdefault(scen, []).append(att)
+        if not scenkeys:
+            raise Exception("No scenarios found in history: "+str(scens))
+        atts = [*scenkeys.values()][0]
+        for scen, scenatts in scenkeys.items():
+            if set(scenatts) != set(atts):
+                raise Exception("Attributes of scenario "+scen+" do not match those of the other scenarios")
+        data = {}
+        for att in atts:
+            vals = [flathist[scen+'.'+att] for scen in scenkeys]
+            max_len = max([len(v) for v in vals])
+            data[att] = np.stack([v if len(v) == max_len else np.pad(v, (0, max_len-len(v)), mode='edge')
+                                  for v in vals])
+        return HistoryArray(scenkeys, data)
+
+    def __getitem__(self, att):
+        return self.data[att]
+
+    def __contains__(self, att):
+        return att in self.data
+
+    def __len__(self):
+        return len(self.data)
+
+    def keys(self):
+        return self.data.keys()
+
+    def items(self):
+        return self.data.items()
+
+    @property
+    def time(self):
+        """Time array (from the first scenario)"""
+        return self.data['time'][0]
+
+    def keys_with(self, att):
+        """Gets the attributes which contain the string att"""
+        return [k for k in self.data if att in k]
+
+    def keys_endingwith(self, att):
+        """Gets the attributes which end with the string att"""
+        return [k for k in self.data if k.endswith(att)]
+
+    def get_scen(self, scen):
+        """Gets a (flat) History of the scenario scen"""
+        ind = self.scen_index[scen]
+        return History({k: v[ind] for k, v in self.data.items()})
+
+    def to_history(self):
+        """Converts back to a (flat) multi-scenario History"""
+        return History({scen+'.'+k: v[i] for i, scen in enumerate(self.scens) for k, v in self.data.items()})
+
+    def get_degraded(self, *attrs, nominal='nominal', operator=np.prod, difftype='bool', withtime=True, withtotal=True):
+        """
+        Gets the times when the attributes *attrs deviate from their nominal values in
+        every scenario (see :meth:`History.get_degraded_hist`).
+
+        Parameters
+        ----------
+        *attrs : names of attributes
+            Names to check (e.g., `flow_1`, `fxn_2`). If not provided, uses all.
+        nominal : str, optional
+            Name of the nominal scenario to compare against. The default is 'nominal'.
+        operator : function
+            Method of combining multiple degraded values. The default is np.prod
+        difftype : 'bool'/'diff'/float
+            Way to calculate the difference (see :func:`diff`)
+        withtime : bool
+            Whether to include time. Default is True.
+        withtotal : bool
+            Whether to include a total. Default is True.
+
+        Returns
+        -------
+        deghist : HistoryArray
+            (N, T) histories of degraded attributes in each scenario
+        """
+        if not attrs:
+            attrs = self.keys()
+        nom_ind = self.scen_index[nominal]
+        deghist = {}
+        for att in attrs:
+            att_diff = [diff(self.data[k][nom_ind], self.data[k], difftype) for k in self.keys_with(att)]
+            if att_diff:
+                deghist[att] = operator(att_diff, 0)
+        if withtotal:
+            deghist['total'] = len(deghist) - np.sum([*deghist.values()], axis=0)
+        if withtime:
+            deghist['time'] = self.data['time']
+        return HistoryArray(self.scens, deghist)
+
+    def get_faulty(self, *attrs, withtime=True, withtotal=True, operator=np.any):
+        """
+        Gets the times when the attributes *attrs have faults present in every scenario
+        (see :meth:`History.get_faulty_hist`).
+
+        Parameters
+        ----------
+        *attrs : names of attributes
+            Names to check (e.g., `fxn_1`, `fxn_2`)
+        withtime : bool
+            Whether to include time. Default is True.
+        withtotal : bool
+            Whether to include a total. Default is True.
+        operator : function
+            Method of combining multiple faults. The default is np.any
+
+        Returns
+        -------
+        has_faults_hist : HistoryArray
+            (N, T) histories of attrs being faulty/not faulty in each scenario
+        """
+        has_faults_hist = {}
+        for att in attrs:
+            fault_keys = [k for k in self.keys_with(att+'.m.faults')
+                          if '.'+att+'.m.faults' in k or k.startswith(att)]
+            if fault_keys:
+                has_faults_hist[att] = operator([self.data[k] for k in fault_keys], 0)
+        if withtotal:
+            has_faults_hist['total'] = np.sum([*has_faults_hist.values()], axis=0)
+        if withtime:
+            has_faults_hist['time'] = self.data['time']
+        return HistoryArray(self.scens, has_faults_hist)
+
+    def get_metrics(self, *values, metric=np.mean, args=(), axis=None):
+        """
+        Calculates a statistic of the values in every scenario using a provided
+        metric function (see :meth:`History.get_metrics`).
+
+        Parameters
+        ----------
+        *values : strs
+            Values to calculate the statistic over (matched as the end of the
+            attribute names). If none provided, creates metric of all.
+        metric : func, optional
+            Function to process the history (e.g. np.mean, np.min...). Must take an
+            axis argument. The default is np.mean.
+        args : args, optional
+            Arguments for the metric function. Default is ().
+        axis : None or 0 or 1
+            Whether to take the metric over variables (0) or over time (1) or both (None).
+            The default is None.
+
+        Returns
+        -------
+        metrics : Result
+            Metrics for each value, with scenario as the first axis.
+        """
+        if not values:
+            values = self.keys()
+        scen_axis = {None: (1, 2), 0: 1, 1: 2}[axis]
+        metrics = Result()
+        for value in values:
+            vals = np.stack([self.data[k] for k in self.keys_endingwith(value)], axis=1)
+            metrics[value] = metric(vals, *args, axis=scen_axis)
+        return metrics
+
+
+def timed_call(profile, key, method, *args, **kwargs):
+    """Calls method(*args, **kwargs), timing it in profile at key (see
+    :meth:`Profile.time_call`) unless profile is None"""
+    if profile is None:
+        return method(*args, **kwargs)
+    return profile.time_call(key, method, *args, **kwargs)
+
+
+class Profile(Result):
+    """
+    Result recording where simulation time goes, given in the result of a simulation
+    when run with profile=True (see :data:`fmdtools.sim.propagate.sim_kwargs`).
+
+    Has (flat) keys:
+        - 'time.propagate': total time (s) in Model.propagate
+        - 'time.log': total time (s) in History.log
+        - 'fxns.<fxnname>.time'/'calls': total time (s)/number of calls of each function
+        - 'fxns.<fxnname>.behavior'/'static_behavior'/'dynamic_behavior': total time (s)
+          in each behavior method of each function
+        - 'fxns.<fxnname>.a.<actionname>': total time (s) in each action of each function's ASG
+        - 'static.iterations'/'steps'/'max_iterations': total/max number of static
+          propagation iterations over the given number of time-steps
+
+    Profiles from multiple scenarios (e.g., run in a pool) may be totalled using
+    :meth:`Profile.aggregate`.
+    """
+    def add(self, key, val=1):
+        """Adds val to the value at key (starting from zero)"""
+        if key in self.data:
+            self.data[key] += val
+        else:
+            self[key] = val
+
+    def time_call(self, key, method, *args, **kwargs):
+        """Calls method(*args, **kwargs) and adds its execution time (s) to key"""
+        starttime = perf_counter()
+        out = method(*args, **kwargs)
+        self.add(key, perf_counter()-starttime)
+        return out
+
+    def add_iterations(self, n):
+        """Records the number of static propagation iterations n at a time-step"""
+        self.add('static.iterations', n)
+        self.add('static.steps')
+        self.set_max('static.max_iterations', n)
+
+    def set_max(self, key, val):
+        """Sets the value at key to the maximum of val and its current value"""
+        if key not in self.data or val > self.data[key]:
+            self[key] = val
+
+    def aggregate(result):
+        """
+        Aggregates the profiles in a (multi-scenario) result.
+
+        Parameters
+        ----------
+        result : Result
+            Result with profiles in it, e.g., from propagate.approach(..., profile=True)
+
+        Returns
+        -------
+        profile : Profile
+            Profile with the totals (and maxes) over all of the profiles in the result
+        """
+        profile = Profile()
+        for k, v in result.flatten().items():
+            atts = k.split('.')
+            if 'profile' in atts:
+                key = join_key(atts[atts.index('profile')+1:])
+                if key.endswith('max_iterations'):
+                    profile.set_max(key, v)
+                else:
+                    profile.add(key, v)
+        return profile
+
+    def get_fxn_times(self, att='time'):
+        """
+        Gets the total time spent in each function (or behavior), in decreasing order.
+
+        Parameters
+        ----------
+        att : str, optional
+            Attribute of each function to get (e.g., 'time', 'behavior', 'dynamic_behavior').
+            The default is 'time'.
+
+        Returns
+        -------
+        fxn_times : dict
+            Times for each function {fxnname: time}
+        """
+        fxn_times = {k.split('.')[1]: v for k, v in self.items()
+                     if k.startswith('fxns.') and k.split('.', 2)[2] == att}
+        return dict(sorted(fxn_times.items(), key=lambda kv: kv[1], reverse=True))
+
+
+def load(filename, filetype="", renest_dict=True, indiv=False, Rclass=History, lazy=False):
     """
     Loads a given (endclasses or mdlhists) results dictionary from a (pickle/csv/json) file.
     e.g. a file saved using process.save_result or save_args in propagate functions.
@@ -1260,6 +2579,9 @@ def load(filename, filetype="", renest_dict=True, indiv=False, Rclass=History):
         The default is False.
     Rclass : class
         Class to return (Result, History, or Dict)
+    lazy : bool, optional
+        Whether to load the arrays of the file lazily (on access, memory-mapped where
+        possible). Only used for npz files, which are returned flat. The default is False.
 
     Returns
     -------
@@ -1299,6 +2621,12 @@ def load(filename, filetype="", renest_dict=True, indiv=False, Rclass=History):
             else:       
                 resultdict = clean_resultdict_keys(loadeddict)
         file_handle.close()
+    elif filetype == 'npz':
+        resultdict = load_npz(filename, lazy=lazy)
+        if lazy and Rclass not in [dict, 'dict']:
+            result = Rclass()
+            result.data = resultdict
+            return result
     else:
         raise Exception("Invalid File Type")
     if Rclass not in [dict, 'dict']:
@@ -1335,6 +2663,306 @@ def load_folder(folder, filetype):
     return files_toread
 
 
+def load_folder_lazy(Rclass, folder, files_toread, filetype):
+    """
+    Loads the given files in a folder as a single lazily-loaded (flat) Result/History,
+    where arrays are only read from each file when accessed.
+
+    Parameters
+    ----------
+    Rclass : class
+        Class to return (Result or History)
+    folder : str
+        Name of the folder
+    files_toread : list
+        Files in the folder to load
+    filetype : str
+        Type of files in the folder (must be 'npz')
+
+    Returns
+    -------
+    result : Result/History
+        Result/History over the data in all of the files
+    """
+    if filetype != 'npz':
+        raise Exception("Lazy loading only supported for npz files, not: "+filetype)
+    data = LazyData()
+    for filename in sorted(files_toread):
+        data.update_lazy(load_npz(folder+'/'+filename, lazy=True))
+    result = Rclass()
+    result.data = data
+    return result
+
+
+class LazyValue():
+    """Placeholder for a value in :class:`LazyData` which is loaded when accessed."""
+    __slots__ = ('loader', 'args')
+
+    def __init__(self, loader, *args):
+        self.loader = loader
+        self.args = args
+
+    def load(self):
+        return self.loader(*self.args)
+
+
+class LazyData(dict):
+    """
+    Dict of values which are loaded (from :class:`LazyValue`) the first time they are
+    accessed. Used as the data of lazily-loaded Results/Histories.
+    """
+    def __getitem__(self, key):
+        val = dict.__getitem__(self, key)
+        if isinstance(val, LazyValue):
+            val = val.load()
+            dict.__setitem__(self, key, val)
+        return val
+
+    def get(self, key, default=None):
+        if key in self:
+            return self[key]
+        return default
+
+    def items(self):
+        return [(k, self[k]) for k in self.keys()]
+
+    def values(self):
+        return [self[k] for k in self.keys()]
+
+    def update_lazy(self, other):
+        """Updates with the (unloaded) values of another LazyData"""
+        for k, v in dict.items(other):
+            dict.__setitem__(self, k, v)
+
+    def is_loaded(self, key):
+        """Checks whether the value for key has been loaded"""
+        return not isinstance(dict.__getitem__(self, key), LazyValue)
+
+
+def to_npz_array(val):
+    """Converts a value to an array to store in an npz file"""
+    if isinstance(val, np.ndarray):
+        return val
+    elif isinstance(val, CompactArray):
+        return val.dense()
+    elif isinstance(val, (int, float, bool, str, np.number, np.bool_)):
+        return np.array(val)
+    else:
+        arr = np.empty((), dtype=object)
+        arr[()] = val
+        return arr
+
+
+def from_npz_array(arr):
+    """Converts an array loaded from an npz file back to its original value"""
+    if arr.ndim == 0:
+        return arr.item()
+    return arr
+
+
+def get_scen_axis(flatdict):
+    """
+    Finds the scenarios and their (shared) sub-keys in a flat dict with keys of
+    structure 'scen.subkey', which are used to store values with scenario as an axis.
+
+    Parameters
+    ----------
+    flatdict : dict
+        Flattened Result/History
+
+    Returns
+    -------
+    scens : list
+        Scenario names (empty if the keys do not have a shared scenario structure)
+    subkeys : list
+        Sub-keys shared by each of the scenarios
+    """
+    scenkeys = {}
+    for k in flatdict:
+        if '.' not in k:
+            return [], []
+        scen, subkey = k.split('.', 1)
+        scenkeys.setdefault(scen, []).append(subkey)
+    subkeys = [*scenkeys.values()][0] if scenkeys else []
+    if len(scenkeys) < 2 or any(sks != subkeys for sks in scenkeys.values()):
+        return [], []
+    return [*scenkeys], subkeys
+
+
+def save_npz(result, file, result_id='', compress=False):
+    """
+    Saves a Result/History to a columnar npz file, with one array per flattened key.
+    Where the keys have a shared scenario structure ('scen.subkey'), values of the
+    same shape for each subkey are stacked into a single array with scenario as the
+    first axis.
+
+    Parameters
+    ----------
+    result : Result/History
+        Result/History to save
+    file : str/file
+        File (or name of the file) to save to
+    result_id : str, optional
+        Identifier for the result, prepended to the keys in the file. The default is ''.
+    compress : bool, optional
+        Whether to compress the arrays. The default is False, which enables the
+        arrays to be memory-mapped when loaded lazily.
+    """
+    import zipfile
+    flatdict = result.flatten()
+    if result_id:
+        flatdict = {result_id+'.'+k: v for k, v in flatdict.items()}
+    scens, subkeys = get_scen_axis(flatdict)
+    compression = zipfile.ZIP_DEFLATED if compress else zipfile.ZIP_STORED
+    with zipfile.ZipFile(file, mode='w', compression=compression, allowZip64=True) as zipf:
+        def write_array(name, arr):
+            with zipf.open(name+'.npy', 'w', force_zip64=True) as file_handle:
+                np.lib.format.write_array(file_handle, arr, allow_pickle=True)
+        if scens:
+            write_array('__scens__', np.array(scens))
+            write_array('__subkeys__', np.array(subkeys))
+            for subkey in subkeys:
+                arrs = [to_npz_array(flatdict[scen+'.'+subkey]) for scen in scens]
+                if all([a.shape == arrs[0].shape and a.dtype == arrs[0].dtype for a in arrs]):
+                    write_array('__scen__.'+subkey, np.stack(arrs))
+                else:
+                    for scen, arr in zip(scens, arrs):
+                        write_array(scen+'.'+subkey, arr)
+        else:
+            for k, v in flatdict.items():
+                write_array(k, to_npz_array(v))
+
+
+def npz_array_headers(filename):
+    """
+    Reads the headers of the arrays in an npz file.
+
+    Parameters
+    ----------
+    filename : str
+        Name of the file
+
+    Returns
+    -------
+    headers : dict
+        Dict of {name: (offset, shape, fortran_order, dtype)} for each array, where
+        offset is the position of the array data in the file (None if compressed).
+    """
+    import zipfile, struct
+    headers = {}
+    with zipfile.ZipFile(filename) as zipf, open(filename, 'rb') as file_handle:
+        for info in zipf.infolist():
+            name = info.filename[:-4]
+            if info.compress_type == zipfile.ZIP_STORED:
+                file_handle.seek(info.header_offset+26)
+                name_len, extra_len = struct.unpack('<HH', file_handle.read(4))
+                file_handle.seek(info.header_offset+30+name_len+extra_len)
+                array_file = file_handle
+            else:
+                array_file = zipf.open(info)
+            version = np.lib.format.read_magic(array_file)
+            if version == (1, 0):
+                shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(array_file)
+            else:
+                shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(array_file)
+            if array_file is file_handle:
+                offset = file_handle.tell()
+            else:
+                offset = None
+                array_file.close()
+            headers[name] = (offset, shape, fortran_order, dtype)
+    return headers
+
+
+def load_npz_array(filename, name, header=(None,), mmap=False):
+    """
+    Loads the array name from the npz file filename.
+
+    Parameters
+    ----------
+    filename : str
+        Name of the file
+    name : str
+        Name of the array
+    header : tuple, optional
+        Header of the array from :func:`npz_array_headers`. Only needed for mmap.
+    mmap : bool, optional
+        Whether to memory-map the array (if uncompressed, non-empty, and not object
+        dtype). The default is False.
+
+    Returns
+    -------
+    arr : np.array
+        Loaded array
+    """
+    offset, *arrinfo = header
+    if mmap and offset is not None and not arrinfo[2].hasobject and np.prod(arrinfo[0]) > 0:
+        shape, fortran_order, dtype = arrinfo
+        return np.memmap(filename, dtype=dtype, mode='r', shape=shape,
+                         order='F' if fortran_order else 'C', offset=offset)
+    with np.load(filename, allow_pickle=True) as npz:
+        return npz[name]
+
+
+def load_npz(filename, lazy=False):
+    """
+    Loads a (flat) dict of values from a columnar npz file saved using :func:`save_npz`.
+
+    Parameters
+    ----------
+    filename : str
+        Name of the file
+    lazy : bool, optional
+        Whether to load each array when it is accessed (memory-mapping uncompressed
+        arrays). The default is False.
+
+    Returns
+    -------
+    resultdict : dict/LazyData
+        Dict of the values in the file with flattened keys {'scen.subkey': value}
+    """
+    if lazy:
+        headers = npz_array_headers(filename)
+        stacked = {}
+        def get_stacked(name):
+            if name not in stacked:
+                stacked[name] = load_npz_array(filename, name, headers[name], mmap=True)
+            return stacked[name]
+        def load_value(name, ind=None):
+            if ind is None:
+                return from_npz_array(load_npz_array(filename, name, headers[name], mmap=True))
+            return from_npz_array(get_stacked(name)[ind])
+        names = [*headers]
+        resultdict = LazyData()
+    else:
+        with np.load(filename, allow_pickle=True) as npz:
+            arrays = {name: npz[name] for name in npz.files}
+        def load_value(name, ind=None):
+            if ind is None:
+                return from_npz_array(arrays[name])
+            return from_npz_array(arrays[name][ind])
+        names = [*arrays]
+        resultdict = {}
+    def add_value(key, name, ind=None):
+        if lazy:
+            resultdict[key] = LazyValue(load_value, name, ind)
+        else:
+            resultdict[key] = load_value(name, ind)
+    if '__scens__' in names:
+        scens = load_npz_array(filename, '__scens__') if lazy else arrays['__scens__']
+        subkeys = load_npz_array(filename, '__subkeys__') if lazy else arrays['__subkeys__']
+        for i, scen in enumerate(scens):
+            for subkey in subkeys:
+                if '__scen__.'+subkey in names:
+                    add_value(scen+'.'+subkey, '__scen__.'+subkey, i)
+                else:
+                    add_value(scen+'.'+subkey, scen+'.'+subkey)
+    else:
+        for name in names:
+            add_value(name, name)
+    return resultdict
+
+
         
 
 
@@ -10,23 +10,23 @@ Description: A module to define Functions, Components, Actions, and other classe
 - :class:`ASG`:         Class for defining Action Sequence Graphs, or sets of actions with specific relationships.
 """
 import numpy as np
-from decimal import Decimal
 import sys
 import itertools
 import networkx as nx
 import copy
 import inspect
 import warnings
+from time import perf_counter
 from recordclass import dataobject, asdict, astuple
 
 from .state import State
 from .parameter import Parameter, SimParam
 from .rand import Rand
 from .common import get_true_fields, get_true_field, init_obj_attr, get_obj_track, eq_units, set_var
-from .time import Time
+from .time import Time, to_tick
 from .mode import Mode
 from .flow import init_flow, Flow
-from fmdtools.analyze.result import Result, History, get_sub_include, init_indicator_hist
+from fmdtools.analyze.result import Result, History, get_sub_include, init_indicator_hist, timed_call
 
 
 def assoc_flows(obj, flows={}):
@@ -147,7 +147,7 @@ class Simulable(object):
                 if fh:
                     hist.flows[flowname] = fh
 
-    def update_seed(self, seed=[]):
+    def update_seed(self, seed=[], stream=None):
         """
         Updates seed and propogates update to contained actions/components.
         (keeps seeds in sync)
@@ -156,9 +156,12 @@ class Simulable(object):
         ----------
         seed : int, optional
             Random seed. The default is [].
+        stream : tuple, optional
+            Random stream key (see :class:`fmdtools.define.rand.Rand`). The default
+            is None, which keeps the current stream.
         """
         if seed:
-            self.r.update_seed(seed)
+            self.r.update_seed(seed, stream)
 
     def find_classification(self, scen, mdlhists):
         """
@@ -206,7 +209,7 @@ class Simulable(object):
         p = self.p.copy_with_vals(**p)
         sp = self.sp.copy_with_vals(**sp)
         if not r:
-            r = {'seed': self.r.seed}
+            r = {'seed': self.r.seed, 'stream': self.r.stream}
         if not track:
             track = copy.deepcopy(self.track)
         return p, sp, r, track
@@ -444,6 +447,33 @@ class Block(Simulable):
         for flow in self.flows.values():
             flow.reset()
 
+    def snapshot(self):
+        """
+        Gets a snapshot of the mutable attributes of the block (s, m, r, t), which
+        can be used to restore the block (or a block with the same structure) to
+        its current state using Block.restore().
+
+        Returns
+        -------
+        snap : tuple
+            Snapshots of the block's State, Mode, Rand, and Time
+        """
+        return (self.s.snapshot(), self.m.snapshot(), self.r.snapshot(), self.t.snapshot())
+
+    def restore(self, snap):
+        """
+        Restores the mutable attributes of the block in place from a snapshot.
+
+        Parameters
+        ----------
+        snap : tuple
+            Snapshot of the block given by Block.snapshot()
+        """
+        self.s.restore(snap[0])
+        self.m.restore(snap[1])
+        self.r.restore(snap[2])
+        self.t.restore(snap[3])
+
     def copy(self, flows, *args, **kwargs):
         """
 
@@ -521,16 +551,44 @@ class Block(Simulable):
         """
         return (*astuple(self.s), *self.m.return_mutables(), *self.r.return_mutables(), *self.t.return_mutables())
 
-    def return_probdens(self):
-        """Gets the probability density associated with a Block and its components/actions (if any)"""
-        state_pd = self.r.return_probdens()
+    def next_event(self, time):
+        """
+        Gets the next time (after time) the block may change independently of its 
+        current states, which is used to skip time-steps where the model is
+        quiescent in event-driven simulation (see event_driven in 
+        :data:`fmdtools.sim.propagate.sim_kwargs`).
+        
+        By default, this is the next time-step if any timer is set or ticking (and
+        np.inf otherwise), since behaviors are assumed to only change with time at
+        phase changes. Blocks with other time-dependent behaviors (e.g., inputs
+        which change at given times) should extend this method to declare 
+        their wake-up times.
+
+        Parameters
+        ----------
+        time : float
+            Current time.
+
+        Returns
+        -------
+        next_time : float
+            Next time the block may change (np.inf if only when its states change)
+        """
+        return self.t.next_event(time)
+
+    def return_logprobdens(self):
+        """Gets the log probability density associated with a Block and its components/actions (if any)"""
+        state_logpd = self.r.return_logprobdens()
         if hasattr(self, 'c'): 
-            for compname, comp in self.c.components:
-                state_pd*=comp.return_probdens()
+            for compname, comp in self.c.components.items():
+                state_logpd+=comp.return_logprobdens()
         if hasattr(self, 'a'):
-            for actionname, action in self.a.actions:
-                state_pd*=action.return_probdens()
-        return state_pd
+            for actionname, action in self.a.actions.items():
+                state_logpd+=action.return_logprobdens()
+        return state_logpd
+    def return_probdens(self):
+        """Gets the probability density associated with a Block and its components/actions (if any)"""
+        return np.exp(self.return_logprobdens())
 
     def create_hist(self, timerange, track='default'):
         """Initializes the function state history fxnhist of the model mdl over the time range timerange.
@@ -688,9 +746,9 @@ class CompArch(dataobject, mapping=True):
                 cop_comp.h = component.h.copy()
         return cop
 
-    def update_seed(self, seed):
-        for comp in self.components.values():
-            comp.update_seed(seed)
+    def update_seed(self, seed, stream=()):
+        for compname, comp in self.components.items():
+            comp.update_seed(seed, (*stream, compname) if stream else ())
 
     def get_rand_states(self, auto_update_only=False):
         rand_states={}
@@ -706,6 +764,13 @@ class CompArch(dataobject, mapping=True):
         for name, component in self.components.items():
             component.reset()
 
+    def snapshot(self):
+        return {name: component.snapshot() for name, component in self.components.items()}
+
+    def restore(self, snap):
+        for name, comp_snap in snap.items():
+            self.components[name].restore(comp_snap)
+
     def get_true_field(self, fieldname, *args, **kwargs):
         return get_true_field(self, fieldname, *args, **kwargs)
 
@@ -748,6 +813,10 @@ class CompArch(dataobject, mapping=True):
         for c in self.components.values():
             cm.extend(c.return_mutables())
         return cm
+
+    def next_event(self, time):
+        """Gets the next time any of the components may change (see :meth:`Block.next_event`)"""
+        return min([c.next_event(time) for c in self.components.values()], default=np.inf)
     
 # Actions/ASGs
 
@@ -936,7 +1005,7 @@ class ASG(dataobject, mapping=True):
         else:
             raise Exception("Invalid option for initial_action")
 
-    def __call__(self, time, run_stochastic, proptype, dt):
+    def __call__(self, time, run_stochastic, proptype, dt, profile=None, prefix=''):
         """
         Propagates behaviors through the internal Action Sequence Graph
 
@@ -950,6 +1019,11 @@ class ASG(dataobject, mapping=True):
             Type of propagation step to update ('behavior', 'static_behavior', or 'dynamic_behavior')
         dt : float
             Timestep to propagate over.
+        profile : Profile, optional
+            Profile to record the execution time of each action in (with key
+            prefix+actionname). The default is None.
+        prefix : str, optional
+            Prefix for the keys of the actions in profile. The default is ''.
         """
         if not self.per_timestep: 
             self.set_active_actions(self.initial_action)
@@ -961,7 +1035,7 @@ class ASG(dataobject, mapping=True):
             while active_actions:
                 new_active_actions = set(active_actions)
                 for action in active_actions:
-                    self.actions[action](time, run_stochastic, proptype=proptype, )
+                    timed_call(profile, prefix+action, self.actions[action], time, run_stochastic, proptype=proptype)
                     action_cond_edges = self.action_graph.out_edges(action, data=True)
                     for act_in, act_out, atts in action_cond_edges:
                         try:
@@ -988,10 +1062,26 @@ class ASG(dataobject, mapping=True):
     def get_faults(self):
         return {act.name+"_"+f for act in self.actions.values() for f in act.m.faults}
 
-    def update_seed(self, seed=[]):
+    def update_seed(self, seed=[], stream=()):
         if seed:
-            for act in self.actions.values():
-                act.update_seed(seed)
+            for actname, act in self.actions.items():
+                act.update_seed(seed, (*stream, actname) if stream else ())
+
+    def snapshot(self):
+        act_snap = {name: action.snapshot() for name, action in self.actions.items()}
+        flow_snap = {name: flow.snapshot() for name, flow in self.flows.items()}
+        field_snap = {f: copy.copy(getattr(self, f)) for f in self.__fields__ if f not in ASG.__fields__}
+        return (act_snap, flow_snap, set(self.active_actions), field_snap)
+
+    def restore(self, snap):
+        act_snap, flow_snap, active_actions, field_snap = snap
+        for name, action_snap in act_snap.items():
+            self.actions[name].restore(action_snap)
+        for name, fl_snap in flow_snap.items():
+            self.flows[name].restore(fl_snap)
+        self.active_actions = set(active_actions)
+        for f, val in field_snap.items():
+            setattr(self, f, copy.copy(val))
 
     def copy(self, flows={}, **kwargs):
         new_flows = {**{fn: flow.copy() for fn, flow in self.flows.items() if fn not in flows}, **flows}
@@ -1043,15 +1133,28 @@ class ASG(dataobject, mapping=True):
         am.append(copy.copy(self.active_actions))
         return am
 
+    def next_event(self, time, dt=1.0):
+        """Gets the next time any of the actions may change (see :meth:`Block.next_event`),
+        which is the next time-step (time+dt) if any active action has a duration, since
+        leaving it depends on the time spent in it"""
+        if any([getattr(self.actions[a], 'duration', 0.0) for a in self.active_actions]):
+            return time+dt
+        return min([a.next_event(time) for a in self.actions.values()], default=np.inf)
+
 # Function superclass
 
 
 class FxnBlock(Block):
     __slots__ = ["c", "_args_c", "a", "_args_a", "args_f"]
     default_track = ["c", "a"]+Block.default_track
+    vectorized = False
     """
     Superclass class for functions which is a special type of Block\
     with c and a attributes for CompArch and ASGs, as well as a defined method for propagation
+
+    Functions with behaviors (and condfaults) which support array-valued states
+    (in the nominal mode) may set vectorized = True, which enables them to be
+    simulated for all members of an :class:`fmdtools.sim.ensemble.Ensemble` at once.
     """
 
     def __init__(self, name='', flows={}, c=dict(), a=dict(), local=dict(), args_f=dict(), **kwargs):
@@ -1125,7 +1228,7 @@ class FxnBlock(Block):
                 raise Exception("Mode "+mode+" not in m.faultmodes for fxn "+self.__class__.__name__+" and may not be tracked.")
         return ms, modeprops
 
-    def update_seed(self, seed=[]):
+    def update_seed(self, seed=[], stream=None):
         """
         Updates seed and propogates update to contained actions/components.
         (keeps seeds in sync)
@@ -1134,13 +1237,32 @@ class FxnBlock(Block):
         ----------
         seed : int, optional
             Random seed. The default is [].
+        stream : tuple, optional
+            Random stream key (see :class:`fmdtools.define.rand.Rand`), which the 
+            streams of the contained actions/components are keyed from. The default
+            is None, which keeps the current stream.
         """
-        super().update_seed(seed)
+        super().update_seed(seed, stream)
         
         if hasattr(self, 'c'):
-            self.c.update_seed(self.r.seed)
+            self.c.update_seed(self.r.seed, self.r.stream)
         if hasattr(self, 'a'):
-            self.a.update_seed(self.r.seed)
+            self.a.update_seed(self.r.seed, self.r.stream)
+
+    def snapshot(self):
+        """Gets a snapshot of the mutable attributes of the function (and its components/actions)
+        which can be restored using FxnBlock.restore()"""
+        snap = {'block': super().snapshot()}
+        if hasattr(self, 'c'): snap['c'] = self.c.snapshot()
+        if hasattr(self, 'a'): snap['a'] = self.a.snapshot()
+        return snap
+
+    def restore(self, snap):
+        """Restores the function (and its components/actions) in place from a
+        snapshot given by FxnBlock.snapshot()"""
+        super().restore(snap['block'])
+        if 'c' in snap: self.c.restore(snap['c'])
+        if 'a' in snap: self.a.restore(snap['a'])
 
     def copy(self, newflows, *args, **kwargs):
         """
@@ -1188,7 +1310,17 @@ class FxnBlock(Block):
             am = self.a.return_mutables()
         return *bm, *cm, *am
 
-    def __call__(self, proptype, faults=[], time=0, run_stochastic=False):
+    def next_event(self, time):
+        """Gets the next time the function (or its components/actions) may change
+        (see :meth:`Block.next_event`)"""
+        next_time = super().next_event(time)
+        if hasattr(self, 'c'):
+            next_time = min(next_time, self.c.next_event(time))
+        if hasattr(self, 'a'):
+            next_time = min(next_time, self.a.next_event(time, self.t.dt))
+        return next_time
+
+    def __call__(self, proptype, faults=[], time=0, run_stochastic=False, profile=None, due=None):
         """
         Updates the state of the function at a given time and injects faults.
 
@@ -1202,7 +1334,19 @@ class FxnBlock(Block):
             Model time. The default is 0.
         run_stochastic : book
             Whether to run the simulation using stochastic or deterministic behavior
-        """
+        profile : Profile, optional
+            Profile to record the execution time of the function (and its behaviors
+            and actions) in. The default is None.
+        due : bool, optional
+            Whether the dynamic behavior is due at this time (for functions with a
+            local timestep larger than the global timestep), as given by the model's
+            tick calendar (see :meth:`fmdtools.define.model.Model.compile_calendar`).
+            The default is None, which checks if the time is a multiple of the
+            local timestep.
+        """
+        key = 'fxns.'+self.name+'.'
+        if profile is not None:
+            starttime = perf_counter()
         self.r.run_stochastic = run_stochastic
         if faults:
             self.m.add_fault(*faults)  # if there is a fault, it is instantiated in the function
@@ -1217,20 +1361,24 @@ class FxnBlock(Block):
         if hasattr(self, 'a'): 
             inject_faults_internal(self.a, faults)
             try:
-                self.a(time, run_stochastic, proptype, self.t.dt)
+                if profile is None:
+                    self.a(time, run_stochastic, proptype, self.t.dt)
+                else:
+                    self.a(time, run_stochastic, proptype, self.t.dt, profile=profile, prefix=key+'a.')
             except TypeError as e:
                 raise Exception("Poorly specified ASG: "+str(self.a.__class__)) from e
         
         if proptype == 'static' and hasattr(self, 'behavior'):
-            self.behavior(time)     # generic behavioral methods are run at all steps
+            # generic behavioral methods are run at all steps
+            timed_call(profile, key+'behavior', self.behavior, time)
         if proptype == 'static' and hasattr(self, 'static_behavior'):
-            self.static_behavior(time)
+            timed_call(profile, key+'static_behavior', self.static_behavior, time)
         elif proptype == 'dynamic' and hasattr(self, 'dynamic_behavior') and time > self.t.time:
             if self.t.run_times >= 1:
                 for i in range(self.t.run_times):
-                    self.dynamic_behavior(time)
-            elif not Decimal(str(time))%Decimal(str(self.t.dt)):
-                self.dynamic_behavior(time)
+                    timed_call(profile, key+'dynamic_behavior', self.dynamic_behavior, time)
+            elif due or (due is None and to_tick(time, self.t.dt) is not None):
+                timed_call(profile, key+'dynamic_behavior', self.dynamic_behavior, time)
         elif proptype == 'reset':
             if hasattr(self, 'static_behavior'):
                 self.static_behavior(time)
@@ -1247,7 +1395,11 @@ class FxnBlock(Block):
             self.m.faults.update(self.c.get_faults())
         self.t.time = time
         if run_stochastic == 'track_pdf':
+            # logprobdens is accumulated by the Rand, probdens is kept for compatibility
             self.r.probdens = self.r.return_probdens()
+        if profile is not None:
+            profile.add(key+'time', perf_counter()-starttime)
+            profile.add(key+'calls')
         if self.m.exclusive is True and len(self.m.faults) > 1:
             raise Exception("More than one fault present in "+self.name+"\n at t= "+str(time)+"\n faults: "+str(self.m.faults)+"\n Is the mode representation nonexclusive?")  # noqa
         return
@@ -130,11 +130,67 @@ def init_obj_attr(obj, **attrs):
     """
     for at in attrs:
         at_arg = attrs[at]
+        init_at = getattr(obj, '_init_'+at)
+        if type(at_arg)==init_at and is_readonly(init_at):
+            # immutable objects (e.g., Parameters) are already validated and may be shared
+            setattr(obj, '_args_'+at, asdict(at_arg))
+            setattr(obj, at, at_arg)
+            continue
         if type(at_arg)!=dict: 
             at_arg = asdict(at_arg)
         setattr(obj, '_args_'+at, at_arg)
-        init_at = getattr(obj, '_init_'+at)
-        setattr(obj, at, init_at(**at_arg))
+        if is_readonly(init_at):    setattr(obj, at, get_interned(init_at, **at_arg))
+        else:                       setattr(obj, at, init_at(**at_arg))
+
+def is_readonly(objclass):
+    """Checks whether a class is a readonly (immutable) dataobject (e.g., a Parameter)"""
+    return getattr(objclass, '__options__', {}).get('readonly', False)
+
+interned = {}
+"""Cache of instances of readonly dataobjects (e.g., Parameters) with structure
+{(class, key): instance}, where key is given by :func:`get_intern_key` (see 
+:func:`get_interned`)"""
+max_interned = 4096
+"""Maximum number of instances to keep in the interned cache"""
+
+def get_intern_key(value):
+    """Gets a hashable key for a value which distinguishes values of different types
+    (e.g., 1 and 1.0), including within tuples"""
+    if type(value)==tuple:  return (tuple, *[get_intern_key(v) for v in value])
+    else:                   return (type(value), value)
+
+def get_interned(objclass, **kwargs):
+    """
+    Gets the instance of the readonly dataobject class objclass (e.g., a Parameter)
+    with the given arguments from the interned cache, instantiating (and thus
+    validating) it only if an instance with the same arguments has not been 
+    instantiated before. Since the instances are immutable, they may be shared 
+    between blocks and models (e.g., for each scenario of a parameter sweep).
+
+    Parameters
+    ----------
+    objclass : class
+        Readonly dataobject class to instantiate
+    **kwargs : kwargs
+        Arguments to instantiate objclass with. If any are unhashable (e.g., dicts
+        processed in __init__), objclass is instantiated without interning.
+
+    Returns
+    -------
+    obj : objclass
+        Instance of objclass with the given arguments
+    """
+    try:
+        key = (objclass, tuple([(k, get_intern_key(v)) for k, v in kwargs.items()]))
+        obj = interned.get(key)
+    except TypeError:
+        return objclass(**kwargs)
+    if obj is None:
+        obj = objclass(**kwargs)
+        if len(interned) >= max_interned:
+            interned.pop(next(iter(interned)))
+        interned[key] = obj
+    return obj
 
 def get_dataobj_track(obj, track):
     """
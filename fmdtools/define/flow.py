@@ -53,6 +53,12 @@ class Flow(object):
         self.s=self._init_s(**self._args_s)
     def return_mutables(self):
         return astuple(self.s)
+    def snapshot(self):
+        """Returns a snapshot of the flow states, which can be restored using Flow.restore()"""
+        return self.s.snapshot()
+    def restore(self, snap):
+        """Restores the flow to the states in a snapshot given by Flow.snapshot()"""
+        self.s.restore(snap)
     def status(self):
         """
         Returns a dict with the current states of the flow.
@@ -212,6 +218,12 @@ class MultiFlow(Flow):
         super().reset()
         for local in self.locals:
             getattr(self, local).reset()
+    def snapshot(self):
+        return (super().snapshot(), {local: getattr(self, local).snapshot() for local in self.locals})
+    def restore(self, snap):
+        super().restore(snap[0])
+        for local, local_snap in snap[1].items():
+            getattr(self, local).restore(local_snap)
     def copy(self, glob=[], p={}, s={}):
         if not s: s=asdict(self.s)
         cop = self.__class__(self.name, glob=glob, p=p, s=s)
@@ -383,6 +395,14 @@ class CommsFlow(MultiFlow):
         for fxn in self.fxns:
             self.fxns[fxn]["in"] = {}
             self.fxns[fxn]["received"] = {}
+    def snapshot(self):
+        comms_snap = {fxn: copy.deepcopy((f["in"], f["received"])) for fxn, f in self.fxns.items()}
+        return (super().snapshot(), comms_snap)
+    def restore(self, snap):
+        super().restore(snap[0])
+        for fxn, (ins, received) in snap[1].items():
+            self.fxns[fxn]["in"] = copy.deepcopy(ins)
+            self.fxns[fxn]["received"] = copy.deepcopy(received)
     def copy(self, glob=[], p={}, s={}):
         cop = super().copy(glob=glob, p=p, s=s)
         for fxn in self.fxns:
@@ -4,9 +4,11 @@ Description: Module for helping define Modes (faulty and otherwise).
 
 Has classes:
 - :class:`Fault`: Class for defining fault parameters
+- :class:`FaultMask`: Set of faults represented as an integer bitmask (used in Modes with fault_mask=True)
 - :Mode:`Mode`: Class for defining the mode property (and associated probability model) held in Blocks. 
 """
 from recordclass import dataobject
+from collections.abc import MutableSet, Set
 import numpy as np
 import itertools
 import copy
@@ -23,6 +25,101 @@ class Fault(dataobject, readonly=True, mapping=True):
     probtype:   str = 'rate'
     units:      str = 'hr'
 
+class FaultMask(MutableSet):
+    """
+    Set of faults represented as an integer bitmask, where the bit of each fault 
+    is given by a (shared) fault index {faultname: bit}. Faults not in the index 
+    are assigned the next bit when added, so the bits of existing faults are 
+    unchanged.
+    
+    Supports the set API used for Mode.faults (e.g., add, update, discard, clear,
+    difference_update, intersection, copy, iteration, and `in`), with O(1) 
+    membership tests and comparisons between FaultMasks with the same index.
+
+    Attributes
+    ----------
+    index : dict
+        Bit of each fault {faultname: bit} (shared between FaultMasks of the same Mode class)
+    bits : int
+        Bitmask of the faults present
+    """
+    __slots__ = ('index', 'bits')
+    def __init__(self, index, faults=()):
+        self.index = index
+        self.bits = 0
+        self.update(faults)
+    def get_bit(self, fault):
+        """Gets the bit of a given fault (adding it to the index if not present)"""
+        bit = self.index.get(fault)
+        if bit is None:
+            bit = 1 << len(self.index)
+            self.index[fault] = bit
+        return bit
+    def get_mask(self, faults):
+        """Gets the bitmask of an iterable of faults"""
+        if isinstance(faults, FaultMask) and faults.index is self.index:
+            return faults.bits
+        mask = 0
+        for fault in faults:
+            mask |= self.get_bit(fault)
+        return mask
+    def __contains__(self, fault):
+        bit = self.index.get(fault)
+        return bit is not None and self.bits & bit != 0
+    def __iter__(self):
+        bits = self.bits
+        return (fault for fault, bit in [*self.index.items()] if bits & bit)
+    def __len__(self):
+        return bin(self.bits).count('1')
+    def __bool__(self):
+        return self.bits != 0
+    def __eq__(self, other):
+        if isinstance(other, FaultMask) and other.index is self.index:
+            return self.bits == other.bits
+        elif isinstance(other, Set):
+            return set(self) == set(other)
+        return NotImplemented
+    __hash__ = None
+    def __repr__(self):
+        return self.__class__.__name__+"("+(str(set(self)) if self.bits else "")+")"
+    def __copy__(self):
+        return self.copy()
+    def __deepcopy__(self, memo):
+        return self.copy()
+    def __reduce__(self):
+        return self.__class__, (self.index, [*self])
+    def _from_iterable(self, faults):
+        return set(faults)
+    def add(self, fault):
+        self.bits |= self.get_bit(fault)
+    def discard(self, fault):
+        bit = self.index.get(fault)
+        if bit is not None:
+            self.bits &= ~bit
+    def remove(self, fault):
+        if fault not in self:
+            raise KeyError(fault)
+        self.discard(fault)
+    def clear(self):
+        self.bits = 0
+    def update(self, *faults):
+        for fault_it in faults:
+            self.bits |= self.get_mask(fault_it)
+    def difference_update(self, *faults):
+        for fault_it in faults:
+            self.bits &= ~self.get_mask(fault_it)
+    def intersection(self, *faults):
+        mask = self.bits
+        for fault_it in faults:
+            mask &= self.get_mask(fault_it)
+        return {fault for fault, bit in self.index.items() if mask & bit}
+    def copy(self):
+        """Creates a copy of the FaultMask (sharing the index)"""
+        cop = self.__class__.__new__(self.__class__)
+        cop.index = self.index
+        cop.bits = self.bits
+        return cop
+
 class Mode(dataobject, readonly=False):
     """
     Description: Class for defining the mode property (and associated probability model) held in Blocks. 
@@ -75,6 +172,12 @@ class Mode(dataobject, readonly=False):
         Name of the current mode. the default is 'nominal'
     he_args : tuple
         Arguments for add_he_rate defining a human error probability model.
+    fault_mask : bool
+        Whether to represent faults as a :class:`FaultMask` (an integer bitmask with
+        the bits given by fault_index) rather than a set. The default is False.
+    fault_index : dict
+        Bit of each fault mode {faultname: bit}, assigned from faultparams when
+        the Mode class is created (and extended with any other faults added).
         
     
     These properties can then be used in simulation
@@ -107,13 +210,19 @@ class Mode(dataobject, readonly=False):
     key_phases_by = 'global'
     longnames = {}
     default_track = ('mode', 'faults')
+    fault_mask = False
+    fault_index = {}
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.fault_index = {fault: 1 << i for i, fault in enumerate(cls.faultparams)}
     def __init__(self, *args, s_kwargs={}, **kwargs):
         if self.he_args:
             kwargs['failrate']=self.add_he_rate(*self.he_args)
         args = get_true_fields(self, *args, **kwargs)
         super().__init__(*args)
         if not self.mode:            self.mode='nominal'
-        if not self.faults:          self.faults=set()
+        if self.fault_mask:          self.faults=FaultMask(self.fault_index, self.faults)
+        elif not self.faults:        self.faults=set()
         if not self.faultmodes:      self.faultmodes=dict()
         if not self.mode_state_dict: self.mode_state_dict=dict()
         
@@ -140,7 +249,16 @@ class Mode(dataobject, readonly=False):
         else: raise Exception("Invalid type for EPCs: "+str(type(EPCs)))
         return gtp*EPC_f
     def return_mutables(self):
-        return (self.mode, copy.copy(self.faults))
+        return (self.mode, self.faults.copy())
+    def snapshot(self):
+        """Returns a tuple of the current mode and faults, which can be restored
+        using Mode.restore()"""
+        return (self.mode, frozenset(self.faults))
+    def restore(self, snap):
+        """Sets the mode and faults to those in a snapshot given by Mode.snapshot()"""
+        self.mode = snap[0]
+        self.faults.clear()
+        self.faults.update(snap[1])
     def init_faultmodes(self):
         """
         Initializes the self.faultmodes dictionary from the parameters of the Mode
@@ -265,7 +383,7 @@ class Mode(dataobject, readonly=False):
         *faults : strs
             names of the fault to check.
         """
-        return any(self.faults.intersection(set(faults)))
+        return any(fault in self.faults for fault in faults)
     def no_fault(self,fault): 
         """Check if the block does not have fault (a str)
         
@@ -274,10 +392,19 @@ class Mode(dataobject, readonly=False):
         fault : str
             name of the fault to check.
         """
-        return not(any(self.faults.intersection(set([fault]))))
+        return fault not in self.faults
     def any_faults(self):
         """check if the block has any fault modes"""
-        return any(self.faults)
+        return bool(self.faults)
+    @property
+    def fault_bits(self):
+        """Bitmask of the faults present (with the bits given by fault_index)"""
+        if isinstance(self.faults, FaultMask) and self.faults.index is self.fault_index:
+            return self.faults.bits
+        return FaultMask(self.fault_index, self.faults).bits
+    def get_faults_from_bits(self, bits):
+        """Gets the set of faults in a given bitmask (e.g., from a fault_bits history)"""
+        return {fault for fault, bit in self.fault_index.items() if int(bits) & bit}
     def to_fault(self,fault): 
         """Moves from the current fault mode to a new fault mode
         
@@ -366,6 +493,11 @@ class Mode(dataobject, readonly=False):
             for faultmode in self.faultmodes:
                 fh.init_att(faultmode, False, timerange, track='all', dtype=bool)
             h['faults']=fh
+        if 'fault_bits' in track:
+            FaultMask(self.fault_index).update(self.faultmodes) # assigns bits to all fault modes
+            if len(self.fault_index) > 64:
+                raise Exception("Too many fault modes in "+self.__class__.__name__+" to track fault_bits (max 64)")
+            h.init_att('fault_bits', self.fault_bits, timerange, track='all', dtype=np.uint64)
         modelength = max([len(fm) for fm in self.faultmodes]+[len(m) for m in self.opermodes])
         str_size = '<U'+str(modelength)
         h.init_att('mode', self.mode, timerange, track, str_size=str_size)
@@ -14,19 +14,23 @@ import warnings
 import sys
 from recordclass import asdict
 import time
+from time import perf_counter
 import copy
+from fractions import Fraction
 
 from .flow import Flow, init_flow
 from .common import check_pickleability, get_var, set_var, init_obj_attr, get_obj_track, eq_units
 from .parameter import Parameter, SimParam
 from .rand import Rand
 from .block import Simulable
+from .time import get_tick_unit, to_tick
 from fmdtools.analyze.result import History, get_sub_include, init_hist_iter, init_indicator_hist
 
 #Model superclass    
 class Model(Simulable):
     __slots__ =['fxns', 'functionorder', '_fxnflows', '_fxninput', '_flowstates',
-                'graph', 'staticfxns', 'dynamicfxns', 'staticflows'] #added in self.build())
+                'graph', 'staticfxns', 'dynamicfxns', 'staticflows', '_static_schedule',
+                'tick_unit', 'tick_calendar'] #added in self.build())
     default_track=('fxns', 'flows', 'i')
     default_name='model'
     """
@@ -48,6 +52,10 @@ class Model(Simulable):
         fxnflowgraph graph view of the functions and flows (fxnflowgraph)
     graph : networkx graph
         multigraph view of functions and flows
+    tick_unit : float
+        duration of one (integer) tick, which all simulation times/timesteps are multiples of
+    tick_calendar : dict
+        period (in ticks) of the dynamic functions which run slower than the global timestep {fxnname: period}
     """
     def __init__(self, name='', p={}, sp={}, r={}, track=''):
         super().__init__(name=name, p=p, sp=sp, r=r, track=track)
@@ -69,7 +77,7 @@ class Model(Simulable):
         return self.__class__.__name__+' model at '+hex(id(self))+' \n'+'FUNCTIONS: \n'+fxnstr+'FLOWS: \n'+flowstr
     def get_typename(self):
         return "Model"
-    def update_seed(self,seed=[]):
+    def update_seed(self,seed=[], stream=None):
         """
         Updates model seed and the seed in all functions. 
 
@@ -77,10 +85,14 @@ class Model(Simulable):
         ----------
         seed : int, optional
             Seed to use. The default is [].
+        stream : tuple, optional
+            Random stream key for the model (see :class:`fmdtools.define.rand.Rand`),
+            which the streams of the functions are keyed from. The default is None, 
+            which keeps the current stream.
         """
-        super().update_seed(seed)
+        super().update_seed(seed, stream)
         for fxn in self.fxns:
-            self.fxns[fxn].update_seed(self.r.seed)
+            self.fxns[fxn].update_seed(self.r.seed, self.r.sub_stream(fxn))
     def get_rand_states(self, auto_update_only=False):
         """Gets dictionary of random states throughout the model functions"""
         rand_states = {}
@@ -145,7 +157,7 @@ class Model(Simulable):
         """
         if not getattr(self, 'is_copy', False):
             flows=self.get_flows(flownames)
-            fkwargs = {**{'r':{"seed":self.r.seed}}, **{'t':{'dt': self.sp.dt}}, **fkwargs}
+            fkwargs = {**{'r':{"seed":self.r.seed, "stream": self.r.sub_stream(name)}}, **{'t':{'dt': self.sp.dt}}, **fkwargs}
             try:
                 self.fxns[name] = fclass(name, flows=flows, args_f=args_f, **fkwargs)
             except TypeError as e:
@@ -199,6 +211,48 @@ class Model(Simulable):
                                            if fxn.is_dynamic()])
             self.construct_graph(require_connections=require_connections)
             self.staticflows = [flow for flow in self.flows if any([ n in self.staticfxns for n in self.graph.neighbors(flow)])]
+            if self.sp.static_prop=='compiled': self.compile_static()
+            self.compile_calendar()
+    def compile_calendar(self):
+        """
+        Precomputes the (multi-rate) calendar used to determine which dynamic
+        functions run at each time-step in :meth:`propagate`.
+
+        Simulation times are represented as an integer number of ticks of
+        self.tick_unit (the largest unit which the start time, global timestep, and
+        local function timesteps are all multiples of), so that whether a function
+        with a local timestep larger than the global timestep runs at a given
+        time-step is an exact integer check (tick % period == 0) rather than a
+        floating-point comparison.
+        """
+        unit = get_tick_unit(self.sp.times[0], self.sp.dt, *[fxn.t.dt for fxn in self.fxns.values()])
+        self.tick_unit = float(unit)
+        self.tick_calendar = {fxnname: round(Fraction(str(fxn.t.dt))/unit)
+                              for fxnname, fxn in self.fxns.items() if fxn.is_dynamic() and fxn.t.run_times < 1}
+    def get_tick(self, time):
+        """Gets the integer tick of a given time (None if not a multiple of self.tick_unit)"""
+        return to_tick(time, self.tick_unit)
+    def compile_static(self):
+        """
+        Precomputes the static propagation schedule used by :meth:`prop_static_compiled`.
+        
+        The schedule consists of the static functions (in the order given by
+        self.functionorder), the indices of the static flows connected to each function,
+        and the indices of the static functions connected to each flow. Since flows
+        are undirected, functions are ordered by functionorder rather than by
+        their dependencies.
+        """
+        order = [fxnname for fxnname in self.functionorder if fxnname in self.staticfxns]
+        fxninds = {fxnname:i for i, fxnname in enumerate(order)}
+        flowinds = {flowname:i for i, flowname in enumerate(self.staticflows)}
+        fxn_flows = tuple(tuple(flowinds[n] for n in self.graph.neighbors(fxnname) if n in flowinds)
+                          for fxnname in order)
+        flow_fxns = tuple(tuple(fxninds[n] for n in self.graph.neighbors(flowname) if n in fxninds)
+                          for flowname in self.staticflows)
+        flows = tuple(self.flows[flowname] for flowname in self.staticflows)
+        flowstates = [flow.return_mutables() for flow in flows]
+        self._static_schedule = (tuple(self.fxns[fxnname] for fxnname in order),
+                                 fxn_flows, flows, flow_fxns, flowstates)
     def construct_graph(self, require_connections=True):
         """
         Creates .graph nx.graph representation of the model
@@ -286,7 +340,7 @@ class Model(Simulable):
         """
         copy = self.__new__(self.__class__)  # Is this adequate? Wouldn't this give it new components?
         copy.is_copy=True
-        copy.__init__(p=getattr(self, 'p', {}),sp=getattr(self, 'sp', {}),track=getattr(self, 'track', {}), r={'seed':self.r.seed})
+        copy.__init__(p=getattr(self, 'p', {}),sp=getattr(self, 'sp', {}),track=getattr(self, 'track', {}), r={'seed':self.r.seed, 'stream':self.r.stream})
         for flowname, flow in self.flows.items():
             copy.flows[flowname]=flow.copy()
         for fxnname, fxn in self.fxns.items():
@@ -315,6 +369,53 @@ class Model(Simulable):
                     hist[k]=self.h[k].copy()
             copy.h = hist.flatten()
         return copy
+    def snapshot(self, with_hist=True):
+        """
+        Gets a snapshot of the mutable states of the model (function/flow states,
+        modes, random states, timers, and history) at the current time, which
+        can be used to restore this model (or another model with the same structure)
+        to its current state using :meth:`Model.restore`.
+
+        Unlike :meth:`Model.copy`, this does not re-instantiate the model, so a
+        single model can be restored in place for each scenario in staged execution.
+
+        Parameters
+        ----------
+        with_hist : bool, optional
+            Whether to include (a copy of) the history in the snapshot. The default is True.
+
+        Returns
+        -------
+        snap : dict
+            Snapshot of the model of structure {'fxns':{fxnname:fxnsnap}, 'flows':{flowname:flowsnap}, 'r':randsnap, 'h':hist}
+        """
+        snap = {'fxns': {fxnname: fxn.snapshot() for fxnname, fxn in self.fxns.items()},
+                'flows': {flowname: flow.snapshot() for flowname, flow in self.flows.items()},
+                'r': self.r.snapshot()}
+        if with_hist and hasattr(self, 'h'):
+            snap['h'] = self.h.copy()
+        return snap
+    def restore(self, snap):
+        """
+        Restores the model in place to the state in a given snapshot.
+
+        Parameters
+        ----------
+        snap : dict
+            Snapshot of the model given by :meth:`Model.snapshot`
+        """
+        for flowname, flowsnap in snap['flows'].items():
+            self.flows[flowname].restore(flowsnap)
+        for fxnname, fxnsnap in snap['fxns'].items():
+            self.fxns[fxnname].restore(fxnsnap)
+        self.r.restore(snap['r'])
+        if 'h' in snap:
+            self.h = snap['h'].copy()
+        elif hasattr(self, 'h'):
+            del self.h
+        self._flowstates = {}
+        if self.sp.static_prop=='compiled':
+            self._static_schedule[4][:] = [flow.return_mutables() for flow in self._static_schedule[2]]
     def reset(self):
         """Resets the model to the initial state (with no faults, etc)"""
         for flowname, flow in self.flows.items():
@@ -322,12 +423,58 @@ class Model(Simulable):
         for fxnname, fxn in self.fxns.items():
             fxn.reset()
         self.r.reset()
+    def next_event(self, time, calendar=True):
+        """
+        Gets the next time (after time) any function in the model may change
+        independently of its current states (see :meth:`fmdtools.define.block.Block.next_event`), 
+        which is used to skip quiescent time-steps in event-driven simulation.
+        
+        Includes the next time each multi-rate function in self.tick_calendar is
+        due to run its dynamic behavior (the next multiple of its local timestep).
+
+        Parameters
+        ----------
+        time : float
+            Current time.
+        calendar : bool, optional
+            Whether to include the due times of the functions in self.tick_calendar.
+            The default is True.
+
+        Returns
+        -------
+        next_time : float
+            Next wake-up time of the functions (np.inf if none)
+        """
+        next_time = min([fxn.next_event(time) for fxn in self.fxns.values()], default=np.inf)
+        if calendar and self.tick_calendar:
+            tick = self.get_tick(time)
+            if tick is None: tick = int(np.floor(time/self.tick_unit))
+            for period in self.tick_calendar.values():
+                next_time = min(next_time, (tick//period+1)*period*self.tick_unit)
+        return next_time
+    def return_mutables(self):
+        """
+        Returns all mutable values in the model (of the functions, flows, and model
+        random states). Used to check if the model has changed over time.
+
+        Returns
+        -------
+        mutables : tuple
+            tuple of the mutables of each function and flow
+        """
+        return (*[fxn.return_mutables() for fxn in self.fxns.values()],
+                *[flow.return_mutables() for flow in self.flows.values()],
+                self.r.return_mutables())
+    def return_logprobdens(self):
+        """Returns the log probability density of the model distributions (summed 
+        in log-space so that it does not underflow in large models)"""
+        logprobdens=0.0
+        for fxn in self.fxns.values():
+            logprobdens += fxn.return_logprobdens()
+        return logprobdens
     def return_probdens(self):
         """Returns the probability desnity of the model distributions given a """
-        probdens=1.0
-        for fxn in self.fxns.values():
-            probdens *= fxn.return_probdens()
-        return probdens
+        return np.exp(self.return_logprobdens())
     def set_vars(self, *args, **kwargs):
         """
         Sets variables in the model to set values (useful for optimization, etc.)
@@ -404,8 +551,9 @@ class Model(Simulable):
             #if len(hist)<len(track) and track!='all': #TODO: this warning should be valid for all hists
             #    raise Exception("History doesn't match tracking options (are names correct?): \n track="+str(track)+"\n hist= \n"+str(hist))
             self.h = hist.flatten()
+            self.h.compile_log(self)
         return self.h
-    def propagate(self, time, fxnfaults={}, disturbances={}, run_stochastic=False):
+    def propagate(self, time, fxnfaults={}, disturbances={}, run_stochastic=False, profile=None, tick=None):
         """
         Injects and propagates faults through the graph at one time-step
 
@@ -420,7 +568,18 @@ class Model(Simulable):
         run_stochastic : bool
             Whether to run stochastic behaviors or use default values. Default is False.
             Can set as 'track_pdf' to calculate/track the probability densities of random states over time.
+        profile : Profile, optional
+            Profile to record the execution time of the propagation step (and each
+            function) in. The default is None.
+        tick : int, optional
+            Integer tick of the current time (see :meth:`compile_calendar`). The
+            default is None, which computes it from the time.
         """
+        if profile is not None:
+            starttime = perf_counter()
+        calendar = self.tick_calendar
+        if calendar and tick is None:
+            tick = self.get_tick(time)
         #Step 0: Update model states with disturbances
         self.set_vars(**disturbances)
         
@@ -429,14 +588,23 @@ class Model(Simulable):
             fxn=self.fxns[fxnname]
             faults = fxnfaults.get(fxnname, [])
             if type(faults)!=list: faults=[faults]
-            fxn('dynamic', faults=faults, time=time, run_stochastic=run_stochastic)
+            if fxnname in calendar:
+                due = tick is not None and not tick % calendar[fxnname]
+                fxn('dynamic', faults=faults, time=time, run_stochastic=run_stochastic, profile=profile, due=due)
+            else:
+                fxn('dynamic', faults=faults, time=time, run_stochastic=run_stochastic, profile=profile)
             
         #Step 2: Run Static Propagation Methods
         try:
-            self.prop_static(time, run_stochastic=run_stochastic)
+            if self.sp.static_prop=='compiled':
+                self.prop_static_compiled(time, run_stochastic=run_stochastic, profile=profile)
+            else:
+                self.prop_static(time, run_stochastic=run_stochastic, profile=profile)
         except Exception as e:
             raise Exception("Error in static propagation at time t="+str(time)) 
-    def prop_static(self, time, run_stochastic=False):
+        if profile is not None:
+            profile.add('time.propagate', perf_counter()-starttime)
+    def prop_static(self, time, run_stochastic=False, profile=None):
         """
         Propagates behaviors through model graph (static propagation step)
 
@@ -447,6 +615,9 @@ class Model(Simulable):
         run_stochastic : bool
             Whether to run stochastic behaviors or use default values. Default is False.
             Can set as 'track_pdf' to calculate/track the probability densities of random states over time.
+        profile : Profile, optional
+            Profile to record the execution time of each function and the number
+            of iterations in. The default is None.
         """
         #set up history of flows to see if any has changed
         activefxns=self.staticfxns.copy()
@@ -461,7 +632,7 @@ class Model(Simulable):
             for fxnname in list(activefxns).copy():
                 #Update functions with new values, check to see if new faults or states
                 oldmutables = self.fxns[fxnname].return_mutables()
-                self.fxns[fxnname]('static', time=time, run_stochastic=run_stochastic)
+                self.fxns[fxnname]('static', time=time, run_stochastic=run_stochastic, profile=profile)
                 if oldmutables!=self.fxns[fxnname].return_mutables(): 
                     nextfxns.update([fxnname])
                 
@@ -484,6 +655,57 @@ class Model(Simulable):
             if n>1000: #break if this is going for too long
                 raise Exception("Undesired looping between functions in static propagation step",
                                 "at t="+str(time)+", these functions remain active:"+str(activefxns))
+        if profile is not None:
+            profile.add_iterations(n)
+    def prop_static_compiled(self, time, run_stochastic=False, profile=None):
+        """
+        Propagates behaviors through model graph (static propagation step) using
+        the schedule precomputed in :meth:`compile_static`.
+        
+        Each static function is run once per timestep. Afterward, functions are
+        only re-run (in schedule order) if a connected flow or their own mutables
+        changed over the previous iteration. Unlike :meth:`prop_static`, only the
+        flows connected to the functions which were run are checked for changes.
+
+        Parameters
+        ----------
+        time : float
+            Current time-step.
+        run_stochastic : bool
+            Whether to run stochastic behaviors or use default values. Default is False.
+            Can set as 'track_pdf' to calculate/track the probability densities of random states over time.
+        profile : Profile, optional
+            Profile to record the execution time of each function and the number
+            of iterations in. The default is None.
+        """
+        fxns, fxn_flows, flows, flow_fxns, flowstates = self._static_schedule
+        activefxns = range(len(fxns))
+        n=0
+        while activefxns:
+            nextfxns = set()
+            flows_to_check = set()
+            for i in activefxns:
+                #Update functions with new values, check to see if new faults or states
+                fxn = fxns[i]
+                oldmutables = fxn.return_mutables()
+                fxn('static', time=time, run_stochastic=run_stochastic, profile=profile)
+                if oldmutables!=fxn.return_mutables():
+                    nextfxns.add(i)
+                flows_to_check.update(fxn_flows[i])
+            # check flows connected to the functions which were run and add connected functions
+            for j in flows_to_check:
+                mutables = flows[j].return_mutables()
+                if flowstates[j]!=mutables:
+                    flowstates[j] = mutables
+                    nextfxns.update(flow_fxns[j])
+            activefxns = sorted(nextfxns)
+            n+=1
+            if n>1000: #break if this is going for too long
+                activefxns = [fxns[i].name for i in activefxns]
+                raise Exception("Undesired looping between functions in static propagation step",
+                                "at t="+str(time)+", these functions remain active:"+str(activefxns))
+        if profile is not None:
+            profile.add_iterations(n)
         
 def check_model_pickleability(model, try_pick=False):
     """ Checks to see which attributes of a model object will pickle, providing more detail about functions/flows"""
@@ -10,7 +10,7 @@ from recordclass import dataobject, asdict
 import warnings
 import numpy as np
 
-from .common import get_true_fields, get_true_field
+from .common import get_true_fields, get_true_field, get_interned, is_readonly
 
 class Parameter(dataobject, readonly=True):
     """
@@ -115,18 +115,29 @@ class Parameter(dataobject, readonly=True):
                 str(true_type).split("'")[1] not in str(attr_type)): # weaker, but enables use of np.str, np.float, etc
                 raise Exception(typed_field+" in "+str(self.__class__)+" assigned incorrect type: "+str(attr_type)+" (should be "+str(true_type)+")")
     def copy_with_vals(self, **kwargs):
-        """Creates a copy of itself with modified values given by kwargs"""
+        """Creates a copy of itself with modified values given by kwargs (for readonly
+        Parameters, the interned copy with the same values, see 
+        :func:`fmdtools.define.common.get_interned`)"""
+        if is_readonly(self.__class__):
+            if not kwargs:  return self
+            else:           return get_interned(self.__class__, **{**asdict(self), **kwargs})
         return self.__class__(**{**asdict(self), **kwargs})
     def check_pickle(self):
-        """Checks to make sure pickled object will get *args and **kwargs"""
-        signature = str(inspect.signature(self.__init__))
-        if not ('*args' in signature) and ('**kwargs' in signature):
-            raise Exception("*args and **kwargs not in __init__()--will not pickle.")
+        """Checks to make sure pickled object will get *args and **kwargs (once for
+        each class)"""
+        if self.__class__ not in pickle_checked:
+            signature = str(inspect.signature(self.__init__))
+            if not ('*args' in signature) and ('**kwargs' in signature):
+                raise Exception("*args and **kwargs not in __init__()--will not pickle.")
+            pickle_checked.add(self.__class__)
     def get_true_field(self, fieldname, *args, **kwargs):
         return get_true_field(self, fieldname, *args, **kwargs)
     def get_true_fields(self, *args, **kwargs):
         return get_true_fields(self, *args, **kwargs)
 
+pickle_checked = set()
+"""Parameter classes which have passed Parameter.check_pickle"""
+
 class SimParam(Parameter, readonly=True):
     """
     Class defining Simulation parameters.
@@ -145,6 +156,12 @@ class SimParam(Parameter, readonly=True):
             the simulation ends at the final time. Default is ''
         use_local : bool
             Whether to use locally-defined timesteps in functions (if any). Default is True.
+        static_prop : str
+            Method used to propagate behaviors in the static propagation step:
+                - 'fixed_point' (default) re-derives the functions to run at each
+                iteration by comparing the mutables of every function and flow
+                - 'compiled' uses the schedule precomputed in Model.build() and
+                only re-runs functions connected to flows which have changed
     """
     phases :            tuple = (('na', 0, 100),)
     times :             tuple = (0, 100)
@@ -153,6 +170,8 @@ class SimParam(Parameter, readonly=True):
     units_set = ('sec', 'min', 'hr', 'day', 'wk', 'month', 'year')
     end_condition :     str = ''
     use_local :         bool = True
+    static_prop :       str = 'fixed_point'
+    static_prop_set = ('fixed_point', 'compiled')
     def __init__(self, *args, **kwargs):
         if ('times' in kwargs) and not('phases' in kwargs):
             kwargs['phases']=(("na", 0, kwargs['times'][-1]),)
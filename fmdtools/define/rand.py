@@ -3,13 +3,14 @@
 Description: A module for defining randon properties for use in blocks. Has Classes:
     
 - :class:`Rand`: Superclass for Block random properties.
+- :class:`RandBuffer`: Buffer of values pre-drawn for an auto-updating random state.
 """
 
-from scipy import stats 
+from scipy import stats, special
+import hashlib
 from recordclass import dataobject, asdict, astuple
 import numpy as np
 from .common import get_true_fields, get_true_field, get_dataobj_track
-import copy
 
 from fmdtools.analyze.result import History, get_sub_include, init_hist_iter
 
@@ -21,10 +22,36 @@ class Rand(dataobject, mapping=True):
     ----------
     rng : np.random.default_rng
         random number generator
-    probs : list
-        probability of the given states
+    logprobdens : float
+        Running log probability density of the states drawn in the current time-step
+        (if run_stochastic=='track_pdf')
+    probdens : float
+        Probability density of the states drawn in the current time-step (which may
+        underflow to zero, so logprobdens is tracked in the history alongside it)
+    logpdfs : dict
+        Log-pdf functions frozen for the current distribution of each random state
+        {state: (methodname, args, logpdf)} (see :func:`freeze_logpdf`), which is
+        created in __init__ rather than shared as a field default.
     seed : int
         state for the random number generator
+    stream : tuple
+        Key of the random stream of the Rand (e.g., (scenario_id, replicate, block_name)),
+        which its generator is spawned from (with the seed) using :func:`get_stream_rng`.
+        The default is (), which seeds the generator with the seed directly. When a
+        Model is given a stream, the stream of each of its blocks is the model's
+        stream plus the block name, so the generator of any block may be 
+        reconstructed from the seed and key alone.
+    buffer_size : int
+        Number of values to pre-draw for each auto-updating random state (see 
+        :class:`RandBuffer`). The default is 0, which draws each value from rng 
+        when the state is updated. May be set as a field default in a subclass
+        or passed as an argument (e.g., r={'buffer_size':256}). Note that buffering
+        changes the values drawn for a given seed: since each buffered state is 
+        drawn from its own generator, the values are the same for any buffer_size>0,
+        but differ from the values drawn without buffering.
+    buffers : dict
+        RandBuffers for each auto-updating random state (if buffer_size>0), which
+        is created in __init__ rather than shared as a field default.
     
     Rand is meant to be extended in model definition with random states, e.g.:
         
@@ -38,15 +65,22 @@ class Rand(dataobject, mapping=True):
     these states with methods called from the rng.
     """
     rng:            np.random.default_rng
-    probs:          list = list()
+    logprobdens:    float = 0.0
     probdens:       float = 1.0
+    logpdfs:        dict = None
     seed:           int =   42
+    stream:         tuple = ()
     run_stochastic: bool=False
-    default_track = ('s', 'probdens')
-    def __init__(self, *args, seed=42, run_stochastic=False, probs = list(), s_kwargs={}):
-        args = get_true_fields(self, *args, seed=seed, run_stochastic=run_stochastic, probs=probs)
+    buffer_size:    int = 0
+    buffers:        dict = None
+    default_track = ('s', 'probdens', 'logprobdens')
+    def __init__(self, *args, seed=42, stream=(), run_stochastic=False, logprobdens=0.0, buffer_size=None, s_kwargs={}):
+        buffer_kwargs = {} if buffer_size is None else {'buffer_size': buffer_size}
+        args = get_true_fields(self, *args, seed=seed, stream=tuple(stream), run_stochastic=run_stochastic, logprobdens=logprobdens, **buffer_kwargs)
         super().__init__(*args)
-        self.rng = np.random.default_rng(self.seed)
+        self.rng = self.new_rng()
+        self.buffers = dict()
+        self.logpdfs = dict()
         if 's' in self.__fields__:
             self.s.set_atts(**s_kwargs)
         if self.seed==None:
@@ -75,42 +109,109 @@ class Rand(dataobject, mapping=True):
         if getattr(self, 'run_stochastic', True):
             gen_method = getattr(self.rng, methodname)
             newvalue = gen_method(*args)
-            if isinstance(newvalue, np.ndarray) and type(self.s[statename]) not in [list, np.array]:
-                raise Exception("Random method for "+statename+" in "+str(self.__class__),
-                                " returned array when it should be a float/int--check args")
-                newvalue = newvalue[0]
-            setattr(self.s, statename, newvalue)
-            if self.run_stochastic == 'track_pdf':
-                value_pds = get_pdf_for_rand(newvalue, methodname, args)
-                self.probs.append(value_pds)
+            self.set_rand_value(statename, methodname, args, newvalue)
+    def set_rand_value(self, statename, methodname, args, newvalue):
+        """Sets the random state statename to a value newvalue drawn from the numpy
+        method methodname with arguments args (see :meth:`Rand.set_rand`)"""
+        if isinstance(newvalue, np.ndarray) and type(self.s[statename]) not in [list, np.ndarray]:
+            raise Exception("Random method for "+statename+" in "+str(self.__class__),
+                            " returned array when it should be a float/int--check args")
+            newvalue = newvalue[0]
+        setattr(self.s, statename, newvalue)
+        if self.run_stochastic == 'track_pdf':
+            frozen = self.logpdfs.get(statename)
+            if frozen is None or frozen[0] != methodname or not same_args(frozen[1], args):
+                frozen = self.logpdfs[statename] = (methodname, args, freeze_logpdf(methodname, args))
+            logpd = frozen[2](newvalue)
+            if isinstance(logpd, np.ndarray): 
+                logpd = np.sum(logpd)
+            self.logprobdens += logpd
+    def return_logprobdens(self):
+        """Returns the log probability density of the states drawn in the current time-step"""
+        return self.logprobdens
     def return_probdens(self):
-        if self.probs:  state_pd= np.prod(self.probs)
-        else:           state_pd= 1.0
-        return state_pd
+        """Returns the probability density of the states drawn in the current time-step"""
+        return np.exp(self.logprobdens)
+    def get_auto_updates(self):
+        """Gets the names of the random states defined to auto-update (i.e., with
+        a <state>_update attribute), which are cached for each State class"""
+        s_class = self.s.__class__
+        if s_class not in auto_updates:
+            auto_updates[s_class] = tuple(state for state in s_class.__fields__ if hasattr(s_class, state+"_update"))
+        return auto_updates[s_class]
     def update_stochastic_states(self):
         """Updates the defined stochastic states defined to auto-update."""
         if hasattr(self,'s'):
-            if self.run_stochastic == 'track_pdf': self.probs.clear()
-            for state in self.s.__fields__:
-                if hasattr(self.s, state+"_update"):
-                    self.set_rand(state, getattr(self.s, state+'_update')[0],
-                                  *getattr(self.s, state+'_update')[1])
+            if self.run_stochastic == 'track_pdf': self.logprobdens = 0.0
+            if self.buffer_size and getattr(self, 'run_stochastic', True):
+                for state in self.get_auto_updates():
+                    methodname, args = getattr(self.s, state+'_update')
+                    buffer = self.buffers.get(state)
+                    if buffer is None:
+                        key = (*get_stream_key(*self.stream), self.s.__fields__.index(state))
+                        buffer = self.buffers[state] = RandBuffer(self.seed, key, self.buffer_size)
+                    self.set_rand_value(state, methodname, args, buffer.draw(methodname, args))
+            else:
+                for state in self.get_auto_updates():
+                    methodname, args = getattr(self.s, state+'_update')
+                    self.set_rand(state, methodname, *args)
     def reset(self):
         """Resets Rand to the initial state."""
-        self.probs.clear()
+        self.logprobdens = 0.0
         if 's' in self.__fields__: self.s.reset()
-        self.rng = np.random.default_rng(self.seed)
-    def update_seed(self, seed):
-        """Updates the random seed to the given value"""
+        self.rng = self.new_rng()
+        self.buffers.clear()
+    def new_rng(self):
+        """Creates a new generator from the seed (and stream, if any)"""
+        if self.stream:     return get_stream_rng(self.seed, *self.stream)
+        else:               return np.random.default_rng(self.seed)
+    def sub_stream(self, name):
+        """Gets the stream for a block contained in the block of this Rand (the 
+        stream of this Rand followed by the block name, or () if it has no stream)"""
+        if self.stream:     return (*self.stream, name)
+        else:               return ()
+    def update_seed(self, seed, stream=None):
+        """Updates the random seed (and stream, if given) to the given value"""
         self.seed=seed
-        BitGen = type(self.rng.bit_generator)
-        self.rng.bit_generator.state = BitGen(seed).state
+        if stream is not None:
+            self.stream = tuple(stream)
+        self.rng.bit_generator.state = self.new_rng().bit_generator.state
+        self.buffers.clear()
     def assign(self, other_rand):
         if hasattr(self,'s'):
             self.s.assign(other_rand.s)
         self.seed = other_rand.seed
+        self.stream = other_rand.stream
         self.rng.__setstate__(other_rand.rng.__getstate__())
-        self.probs = copy.copy(other_rand.probs)
+        self.logprobdens = other_rand.logprobdens
+        self.restore_buffers(other_rand.snapshot_buffers())
+    def snapshot_buffers(self):
+        """Returns a dict of snapshots of the RandBuffers {state: snapshot}"""
+        return {state: buffer.snapshot() for state, buffer in self.buffers.items()}
+    def restore_buffers(self, buffer_snaps):
+        """Sets the RandBuffers to those in snapshots from Rand.snapshot_buffers()"""
+        self.buffers.clear()
+        for state, buffer_snap in buffer_snaps.items():
+            self.buffers[state] = RandBuffer.from_snapshot(buffer_snap)
+    def snapshot(self):
+        """Returns a tuple of the current random states and generator state, which
+        can be restored using Rand.restore()"""
+        if 's' in self.__fields__:  s_snap = self.s.snapshot()
+        else:                       s_snap = ()
+        return (s_snap, self.rng.bit_generator.state, self.seed, 
+                self.logprobdens, self.probdens, self.run_stochastic,
+                self.snapshot_buffers(), self.stream)
+    def restore(self, snap):
+        """Sets the random states and generator state to those in a snapshot
+        given by Rand.snapshot()"""
+        if 's' in self.__fields__: self.s.restore(snap[0])
+        self.rng.bit_generator.state = snap[1]
+        self.seed = snap[2]
+        self.logprobdens = snap[3]
+        self.probdens = snap[4]
+        self.run_stochastic = snap[5]
+        self.restore_buffers(snap[6])
+        self.stream = snap[7]
     def get_true_field(self, fieldname, *args, **kwargs):
         return get_true_field(self, fieldname, *args, **kwargs)
     def get_true_fields(self, *args, **kwargs):
@@ -139,12 +240,180 @@ class Rand(dataobject, mapping=True):
         """
         h = History()
         track = get_dataobj_track(self, track)
-        if self.run_stochastic=='track_pdf' and 'track_pdf' in track: 
-            h.init_att('probdens', self.return_probdens(), timerange=timerange, track='all')
+        if self.run_stochastic=='track_pdf':
+            if 'probdens' in track:
+                h.init_att('probdens', self.return_probdens(), timerange=timerange, track='all')
+            if 'logprobdens' in track:
+                h.init_att('logprobdens', self.return_logprobdens(), timerange=timerange, track='all')
         if 's' in track and hasattr(self,'s'):
             h['s'] = init_hist_iter('s', self.s, timerange=timerange, track=track)
         return h
 
+auto_updates = {}
+"""Names of the auto-updating random states of each State class {State: (statenames)}
+(see :meth:`Rand.get_auto_updates`)"""
+
+class RandBuffer(object):
+    """
+    Buffer of values pre-drawn in bulk for an auto-updating random state of a Rand 
+    (used when Rand.buffer_size>0), which are served in order and refilled when 
+    exhausted.
+
+    Each state is drawn from its own generator, seeded by the seed of the Rand 
+    and spawned from its stream and the index of the state, so that the values drawn for a state do not depend
+    on the other states or the buffer size (for numpy distributions where drawing
+    an array gives the same values as drawing each value in turn, e.g., normal, 
+    uniform, integers, choice, etc). If the distribution or arguments of the state
+    change, the generator is rewound to just after the last value served, so the
+    remaining values are drawn from the new distribution.
+
+    Attributes
+    ----------
+    rng : np.random.Generator
+        Generator for the state
+    size : int
+        Number of values to draw when refilling the buffer
+    method : str
+        Name of the numpy method the buffered values were drawn from
+    args : tuple
+        Arguments the buffered values were drawn with
+    vals : list
+        Buffered values
+    pos : int
+        Index of the next value to serve
+    refill_state : dict
+        State of rng before the buffer was last refilled
+    """
+    __slots__ = ('rng', 'size', 'method', 'args', 'vals', 'pos', 'refill_state')
+    def __init__(self, seed, key, size):
+        """
+        Parameters
+        ----------
+        seed : int
+            Seed of the Rand
+        key : tuple
+            Stream key of the Rand (see :func:`get_stream_key`) followed by the 
+            index of the state in the Rand's State (used to spawn its generator)
+        size : int
+            Number of values to draw when refilling the buffer
+        """
+        self.rng = np.random.default_rng(np.random.SeedSequence(seed, spawn_key=key))
+        self.size = size
+        self.method = None
+        self.args = None
+        self.vals = []
+        self.pos = 0
+        self.refill_state = None
+    def draw(self, methodname, args):
+        """
+        Serves the next value for the state from the buffer.
+
+        Parameters
+        ----------
+        methodname : str
+            Name of the numpy method to draw from
+        args : tuple
+            Arguments for the numpy method
+
+        Returns
+        -------
+        value : float/int
+            Next value drawn
+        """
+        if methodname != self.method or not same_args(self.args, args):
+            self.rewind()
+            self.method, self.args = methodname, args
+        if self.pos >= len(self.vals):
+            self.refill()
+        value = self.vals[self.pos]
+        self.pos += 1
+        return value
+    def refill(self):
+        """Draws the next self.size values into the buffer"""
+        self.refill_state = self.rng.bit_generator.state
+        self.vals = getattr(self.rng, self.method)(*self.args, size=self.size).tolist()
+        self.pos = 0
+    def rewind(self):
+        """Rewinds the generator to just after the last value served and empties the buffer"""
+        if self.pos < len(self.vals):
+            self.rng.bit_generator.state = self.refill_state
+            if self.pos:
+                getattr(self.rng, self.method)(*self.args, size=self.pos)
+        self.vals = []
+        self.pos = 0
+    def snapshot(self):
+        """Returns a tuple of the generator state and buffer, which can be restored 
+        using RandBuffer.from_snapshot()"""
+        return (self.rng.bit_generator.state, self.size, self.method, self.args, 
+                self.vals, self.pos, self.refill_state)
+    @staticmethod
+    def from_snapshot(snap):
+        """Creates a RandBuffer from a snapshot given by RandBuffer.snapshot()"""
+        buffer = RandBuffer.__new__(RandBuffer)
+        buffer.rng = np.random.default_rng(0)
+        buffer.rng.bit_generator.state = snap[0]
+        buffer.size, buffer.method, buffer.args, buffer.vals, buffer.pos, buffer.refill_state = snap[1:]
+        return buffer
+
+def get_stream_key(*keys):
+    """
+    Gets the spawn key for a random stream identified by keys.
+
+    Parameters
+    ----------
+    *keys : str/int
+        Keys identifying the stream, e.g., (scenario_id, replicate, block_name).
+        Non-negative ints are used as-is, while other keys (e.g., names) are hashed
+        (with a hash which is the same across processes and sessions).
+
+    Returns
+    -------
+    spawn_key : tuple
+        Tuple of non-negative ints to use as the spawn_key of a np.random.SeedSequence
+    """
+    spawn_key = []
+    for key in keys:
+        if isinstance(key, (int, np.integer)) and not isinstance(key, bool) and key>=0:
+            spawn_key.append(int(key))
+        else:
+            digest = hashlib.blake2b(str(key).encode(), digest_size=8).digest()
+            spawn_key.append(int.from_bytes(digest, 'little'))
+    return tuple(spawn_key)
+
+def get_stream_rng(seed, *keys):
+    """
+    Creates the generator for the random stream identified by keys (see 
+    :func:`get_stream_key`) spawned from the given seed. 
+    
+    Because the stream is spawned directly from (seed, *keys) with 
+    np.random.SeedSequence, the generator of any stream may be reconstructed in
+    any process without seeding any of the other streams first, and different
+    keys give independent streams.
+
+    Parameters
+    ----------
+    seed : int
+        Root seed
+    *keys : str/int
+        Keys identifying the stream, e.g., (scenario_id, replicate, block_name).
+
+    Returns
+    -------
+    rng : np.random.Generator
+        Generator for the stream
+    """
+    return np.random.default_rng(np.random.SeedSequence(seed, spawn_key=get_stream_key(*keys)))
+
+def same_args(args1, args2):
+    """Checks whether two tuples of arguments to a numpy method are the same 
+    (including arguments which are arrays)"""
+    if args1 is args2:
+        return True
+    try:
+        return bool(args1 == args2)
+    except ValueError:
+        return len(args1)==len(args2) and all([np.array_equal(a1, a2) for a1, a2 in zip(args1, args2)])
+
 def get_pdf_for_rand(x, randname, args):
     """
     Gets the corresponding probability mass/density for  
@@ -273,4 +542,134 @@ def get_pdf_for_dist(x, randname, args): # note: when python 3.10 releases, this
         return stats.triang.pdf(x,c,loc,scale)
     elif randname=='vonmises':
         return stats.vonmises.pdf(x,args[1], args[0])
-    else: raise Exception("Invalid randname distribution: "+randname+". Ensure that it is a part of numpy.random/scipy.stats")
\ No newline at end of file
+    else: raise Exception("Invalid randname distribution: "+randname+". Ensure that it is a part of numpy.random/scipy.stats")
+
+def dist_args(args, *defaults):
+    """Gets the leading arguments of a distribution, filling in the numpy defaults
+    for the arguments not given"""
+    return (*args[:len(defaults)], *defaults[len(args):])
+
+def freeze_logpdf(randname, args):
+    """
+    Gets a function which evaluates the log probability mass/density of outcomes x
+    of the 'randname' distribution in numpy with arguments args. 
+    
+    For common distributions (normal, standard_normal, uniform, exponential, 
+    lognormal, gamma, standard_gamma, pareto, triangular, poisson, binomial,
+    integers, random, and choice), this is a closed-form numpy expression with the
+    constants computed once. Otherwise, it falls back to the log of 
+    :func:`get_pdf_for_rand`.
+
+    Parameters
+    ----------
+    randname : str
+        Name of numpy.random distribution
+    args : tuple
+        Arguments sent to numpy.random distribution
+
+    Returns
+    -------
+    logpdf : callable
+        Function logpdf(x) giving the log probability mass/density of each sample 
+        in x (float/array, -inf for impossible samples)
+    """
+    if randname in ['normal', 'standard_normal']:
+        if randname=='normal':  loc, scale = dist_args(args, 0.0, 1.0)
+        else:                   loc, scale = 0.0, 1.0
+        c = -np.log(scale) - 0.5*np.log(2*np.pi)
+        return lambda x: c - 0.5*np.square((x-loc)/scale)
+    elif randname=='uniform':
+        low, high = dist_args(args, 0.0, 1.0)
+        c = -np.log(high-low)
+        return lambda x: np.where((low<=x)&(x<high), c, -np.inf)
+    elif randname=='exponential':
+        scale, = dist_args(args, 1.0)
+        c = -np.log(scale)
+        return lambda x: np.where(x>=0, c - x/scale, -np.inf)
+    elif randname=='lognormal':
+        mean, sigma = dist_args(args, 0.0, 1.0)
+        c = -np.log(sigma) - 0.5*np.log(2*np.pi)
+        def logpdf(x):
+            with np.errstate(divide='ignore', invalid='ignore'):
+                logx = np.log(x)
+                return np.where(x>0, c - logx - 0.5*np.square((logx-mean)/sigma), -np.inf)
+        return logpdf
+    elif randname in ['gamma', 'standard_gamma']:
+        if randname=='gamma':   shape, scale = dist_args(args, None, 1.0)
+        else:                   shape, scale = args[0], 1.0
+        c = -special.gammaln(shape) - shape*np.log(scale)
+        def logpdf(x):
+            with np.errstate(divide='ignore', invalid='ignore'):
+                return np.where(x>0, c + special.xlogy(shape-1, x) - x/scale, -np.inf)
+        return logpdf
+    elif randname=='pareto':
+        a = args[0]
+        c = np.log(a)
+        def logpdf(x):
+            with np.errstate(invalid='ignore'):
+                return np.where(x>=0, c - (a+1)*np.log1p(x), -np.inf)
+        return logpdf
+    elif randname=='triangular':
+        left, mode, right = args[:3]
+        c = np.log(2/(right-left))
+        def logpdf(x):
+            with np.errstate(divide='ignore', invalid='ignore'):
+                lower = np.log((x-left)/(mode-left))
+                upper = np.log((right-x)/(right-mode))
+                return np.where((left<=x)&(x<=right), c + np.where(x<mode, lower, upper), -np.inf)
+        return logpdf
+    elif randname=='poisson':
+        lam, = dist_args(args, 1.0)
+        return lambda x: special.xlogy(x, lam) - lam - special.gammaln(np.add(x, 1))
+    elif randname=='binomial':
+        n, p = args[:2]
+        c = special.gammaln(n+1)
+        return lambda x: (c - special.gammaln(np.add(x, 1)) - special.gammaln(np.subtract(n, x)+1)
+                          + special.xlogy(x, p) + special.xlog1py(np.subtract(n, x), -p))
+    elif randname=='integers':
+        low, high = dist_args(args, None, None)
+        if high is None:                        low, high = 0, low
+        if len(args)>=5 and args[4]:            high = high+1
+        c = -np.log(high-low)
+        return lambda x: np.where((low<=x)&(x<high), c, -np.inf)
+    elif randname=='random':
+        return lambda x: np.where((0.0<=x)&(x<1.0), 0.0, -np.inf)
+    elif randname=='choice':
+        if type(args[0])==int:  options = [*np.arange(args[0])]
+        else:                   options = args[0]
+        if len(args)==4 and args[3] is not None:    
+            logps = np.log(args[3])
+        else:
+            logps = np.full(len(options), -np.log(len(options)))
+        table = {opt: logp for opt, logp in zip(options, logps)}
+        def logpdf(x):
+            if isinstance(x, (np.ndarray, list)):   
+                return np.array([table.get(i, -np.inf) for i in np.ravel(x)])
+            else:
+                return table.get(x, -np.inf)
+        return logpdf
+    else:
+        def logpdf(x):
+            with np.errstate(divide='ignore'):
+                return np.log(get_pdf_for_rand(x, randname, args))
+        return logpdf
+
+def get_logpdf_for_rand(x, randname, args):
+    """
+    Gets the log probability mass/density for random sample x from 'randname' 
+    function in numpy (see :func:`freeze_logpdf`).
+
+    Parameters
+    ----------
+    x : int/float/array
+        samples to get log probability mass/density of
+    randname : str
+        Name of numpy.random distribution
+    args : tuple
+        Arguments sent to numpy.random distribution
+
+    Returns
+    -------
+    logprob: float/array of log probability densities
+    """
+    return freeze_logpdf(randname, args)(x)
@@ -4,13 +4,26 @@ Description: A module for defining States, which are (generic) containers for sy
     
 - :class:`State`: Superclass for Model States.
 """
-from recordclass import dataobject, asdict
+from recordclass import dataobject, asdict, astuple
 import numpy as np
 from .common import get_true_fields, is_iter, get_dataobj_track
 import copy
 import warnings
 from fmdtools.analyze.result import History
 
+scalar_types = frozenset({float, int, bool, str, complex, type(None),
+                          np.float64, np.float32, np.int64, np.int32, np.bool_, np.str_})
+"""Types of (immutable) scalar state values, which State.get returns as-is"""
+immutable_types = scalar_types.union({tuple, frozenset})
+"""Types of immutable state values, which State methods do not copy"""
+
+def get_operand(state, name):
+    """Gets the value of a state for use in arithmetic (as in State.get), so that
+    the state is not modified in place"""
+    value = getattr(state, name)
+    if type(value) in scalar_types:     return value
+    else:                               return state.get(name)
+
 class State(dataobject, mapping=True):
     """
     Class for working with model states, which are variables in the model which 
@@ -38,6 +51,12 @@ class State(dataobject, mapping=True):
     > 10.0
     """
     default_track='all'
+    _field_set = frozenset()
+    _assigners = {}
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._field_set = frozenset(cls.__fields__)
+        cls._assigners = {}
     def set_atts(self, **kwargs):
         """Sets the given arguments to a given value. Mainly useful for 
         reducing length/adding clarity to assignment statements in __init__ methods
@@ -55,9 +74,10 @@ class State(dataobject, mapping=True):
         
         as_copy: bool, set to True for dicts/sets to be copied rather than referenced
         """
+        fields = self._field_set
         for name, value in kwargs.items():
-            if name not in self.__fields__: raise Exception(name+" not a property of "+str(self.__class__))
-            if as_copy: value=copy.copy(value)
+            if name not in fields: raise Exception(name+" not a property of "+str(self.__class__))
+            if as_copy and type(value) not in immutable_types: value=copy.copy(value)
             setattr(self, name, value)
     def assign(self,obj,*states, as_copy=True, **statedict):
         """ Sets the same-named values of the current flow/function object to those of a given flow. 
@@ -72,19 +92,62 @@ class State(dataobject, mapping=True):
         """
         if type(obj) in [list, tuple] or isinstance(obj, np.ndarray):
             for i, state in enumerate(states):  
-                if as_copy: val=copy.copy(obj[i])
-                else:       val=obj[i]
+                val=obj[i]
+                if as_copy and type(val) not in immutable_types: val=copy.copy(val)
                 setattr(self, state, val)
         else:
-            if not statedict:
-                if len(states)==0:    statedict = {s:s for s in obj.__fields__}
-                else:                 statedict = {s:s for s in states}
-            elif len(states)>0: raise Exception("Can only provide positional states or keyword states, not both")
-            for set_state, get_state in statedict.items():
-                if set_state not in self.__fields__: raise Exception(set_state+" not a property of "+self.name)
-                val = getattr(obj,get_state)
-                if as_copy: val=copy.copy(val)
-                setattr(self, set_state, val)
+            if statedict and states: raise Exception("Can only provide positional states or keyword states, not both")
+            if statedict:   key = (type(obj), tuple(statedict.items()))
+            elif states:    key = (type(obj), states)
+            else:           key = type(obj)
+            assigner = self._assigners.get(key)
+            if assigner is None:
+                assigner = self._assigners[key] = self.compile_assigner(obj, *states, **statedict)
+            assigner(self, obj, as_copy)
+    def compile_assigner(self, obj, *states, **statedict):
+        """
+        Compiles a function which assigns the values of obj to the State for the
+        given states (used in :meth:`State.assign`, which caches it for each 
+        State class, type of obj, and states).
+
+        Parameters
+        ----------
+        obj : State/object
+            Object to assign the values of
+        *states : str
+            Names of the states to assign (if not given, all fields of obj)
+        **statedict : str
+            Names of the states to assign to/from {set_state: get_state}
+
+        Returns
+        -------
+        assigner : callable
+            Function assigner(state, obj, as_copy) which assigns the values
+        """
+        if not statedict:
+            if len(states)==0:    statedict = {s:s for s in obj.__fields__}
+            else:                 statedict = {s:s for s in states}
+        copy_lines, ref_lines = [], []
+        for set_state, get_state in statedict.items():
+            if set_state not in self._field_set: raise Exception(set_state+" not a property of "+str(self.__class__))
+            if get_state.isidentifier():    get_str = "obj."+get_state
+            else:                           get_str = "getattr(obj, "+repr(get_state)+")"
+            copy_lines.append("        val = "+get_str+"\n        self."+set_state
+                              +" = val if type(val) in immutable_types else copy(val)")
+            ref_lines.append("        self."+set_state+" = "+get_str)
+        code = ("def assigner(self, obj, as_copy):\n    if as_copy:\n"+"\n".join(copy_lines or ["        pass"])
+                +"\n    else:\n"+"\n".join(ref_lines or ["        pass"]))
+        namespace = {'immutable_types': immutable_types, 'copy': copy.copy}
+        exec(code, namespace)
+        return namespace['assigner']
+    def snapshot(self):
+        """Returns a tuple of (copies of) the current state values, which can be
+        restored using State.restore()"""
+        return tuple([val if type(val) in immutable_types else copy.copy(val) for val in astuple(self)])
+    def restore(self, snap):
+        """Sets the state values to those in a snapshot given by State.snapshot()"""
+        for f, val in zip(self.__fields__, snap):
+            setattr(self, f, val if type(val) in immutable_types else copy.copy(val))
     def get(self, *attnames, **kwargs):
         """Returns the given attribute names (strings). Mainly useful for reducing length
         of lines/adding clarity to assignment statements.
@@ -93,7 +156,9 @@ class State(dataobject, mapping=True):
               z = self.Pos.get('x','y') is the same as
               z = np.array([self.Pos.x, self.Pos.y])
         """
-        if len(attnames)==1:    states = getattr(self,attnames[0])
+        if len(attnames)==1:    
+            states = getattr(self,attnames[0])
+            if type(states) in scalar_types:    return states
         else:                   states = [getattr(self,name) for name in attnames]
         if not is_iter(states):                 return states
         elif len(states)==1:                    return states[0]
@@ -120,9 +185,10 @@ class State(dataobject, mapping=True):
         Can additionally be provided with a second value denoting a limit on the increments
         e.g. self.Pos.inc(x=(1,10)) will increment x by 1 until it reaches 10
         """
+        fields = self._field_set
         for name, value in kwargs.items():
-            if name not in self.__fields__: raise Exception(name+" not a property of "+str(self.__class__))
-            if type(value)==tuple:  
+            if name not in fields: raise Exception(name+" not a property of "+str(self.__class__))
+            if type(value) is tuple:  
                 current = getattr(self,name)
                 sign = np.sign(value[0])
                 newval = current + value[0]
@@ -144,8 +210,9 @@ class State(dataobject, mapping=True):
             self.EE.a = min(100, max(0,self.EE.a));
             self.EE.v = min(12, max(0,self.EE.v))
         """
+        fields = self._field_set
         for name, value in kwargs.items():
-            if name not in self.__fields__: raise Exception(name+" not a property of "+str(self.__class__))
+            if name not in fields: raise Exception(name+" not a property of "+str(self.__class__))
             try:
                 setattr(self, name, min(value[1], max(value[0], getattr(self,name))))
             except ValueError as e:
@@ -155,36 +222,36 @@ class State(dataobject, mapping=True):
         e.g.,   a = self.mul('x','y','z') is the same as
                 a = self.x*self.y*self.z
         """
-        a= self.get(states[0])
+        a= get_operand(self, states[0])
         for state in states[1:]:
-            a = a * self.get(state)
+            a = a * get_operand(self, state)
         return a
     def div(self,*states):
         """Returns the division of given attributes of the model construct
         e.g.,   a = self.div('x','y','z') is the same as
                 a = (self.x/self.y)/self.z
         """
-        a= self.get(states[0])
+        a= get_operand(self, states[0])
         for state in states[1:]:
-            a = a / self.get(state)
+            a = a / get_operand(self, state)
         return a
     def add(self,*states):
         """Returns the addition of given attributes of the model construct
         e.g.,   a = self.add('x','y','z') is the same as
                 a = self.x+self.y+self.z
         """
-        a= self.get(states[0])
+        a= get_operand(self, states[0])
         for state in states[1:]:
-            a += self.get(state)
+            a += get_operand(self, state)
         return a
     def sub(self,*states):
         """Returns the subtraction of given attributes of the model construct
         e.g.,   a = self.div('x','y','z') is the same as
                 a = (self.x-self.y)-self.z
         """
-        a= self.get(states[0])
+        a= get_operand(self, states[0])
         for state in states[1:]:
-            a -= self.get(state)
+            a -= get_operand(self, state)
         return a
     def same(self,values, *states):
         """Tests whether a given iterable values has the same value as each
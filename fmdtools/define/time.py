@@ -4,8 +4,16 @@ Description: A module for defining time-based properties for use in blocks. Has
     
 - :class:`Timer`: Class defining timers
 - :class:`Time`: Class containing all time-related Block constructs (e.g., timers).
+
+And functions:
+
+- :func:`get_tick_unit`: Gets the largest time unit (tick) which a set of times are integer multiples of.
+- :func:`to_tick`: Converts a time to an integer number of ticks.
 """
-from decimal import Decimal
+from fractions import Fraction
+from functools import reduce
+from math import gcd
+import numpy as np
 from recordclass import dataobject
 from fmdtools.analyze.result import History, init_hist_iter, get_sub_include
 from .common import  get_dataobj_track, get_obj_track
@@ -89,6 +97,12 @@ class Timer():
     def is_set(self):
         """Whether the timer is set (before time increments)"""
         return self.mode=='set'
+    def next_event(self, time, dt):
+        """Gets the next time the timer may change (the next time-step time+dt if
+        it is set or ticking, np.inf otherwise)"""
+        if self.mode in ('set', 'ticking'):
+            return time+dt
+        return np.inf
     def copy(self):
         cop = self.__class__(self.name)
         cop.time=self.time
@@ -102,6 +116,52 @@ class Timer():
         h.init_att('mode', self.mode, timerange=timerange, track=track, str_size='<U8')
         return h
 
+def get_tick_unit(*times):
+    """
+    Gets the largest time unit (tick) which all of the given times (e.g., the
+    start time, global timestep, and local timesteps of a model) are integer
+    multiples of, so that times in the simulation can be represented exactly as
+    integer numbers of ticks.
+
+    Parameters
+    ----------
+    *times : float
+        Times/timesteps to represent.
+
+    Returns
+    -------
+    unit : Fraction
+        Duration of one tick. Is 1 if no nonzero times are given.
+    """
+    fracs = [abs(Fraction(str(t))) for t in times if t]
+    if not fracs:
+        return Fraction(1)
+    num = reduce(gcd, [f.numerator for f in fracs])
+    den = reduce(lambda a, b: a*b//gcd(a, b), [f.denominator for f in fracs])
+    return Fraction(num, den)
+
+def to_tick(time, unit):
+    """
+    Converts a time to an integer number of ticks.
+
+    Parameters
+    ----------
+    time : float
+        Time to convert.
+    unit : float
+        Duration of one tick (e.g., from :func:`get_tick_unit`).
+
+    Returns
+    -------
+    tick : int or None
+        Number of ticks in the time. None if the time is not a multiple of the
+        tick (to within floating-point error).
+    """
+    tick = round(time/unit)
+    if abs(time-tick*unit) > 1e-9*unit:
+        return None
+    return int(tick)
+
 class Time(dataobject):
     """
     Class for defining all time-based aspects of a Block (e.g., time, timestep, timers). 
@@ -145,11 +205,24 @@ class Time(dataobject):
         else:                   return super().__getattribute__(item)
     def return_mutables(self):
         return (t.time for t in self.timers.values())
+    def snapshot(self):
+        """Returns a tuple of the current times and timer states, which can be
+        restored using Time.restore()"""
+        return (self.time, self.t_ind, self.t_loc, self.dt, self.run_times,
+                {name: (timer.time, timer.tstep, timer.mode) for name, timer in self.timers.items()})
+    def restore(self, snap):
+        """Sets the times and timer states to those in a snapshot given by Time.snapshot()"""
+        self.time, self.t_ind, self.t_loc, self.dt, self.run_times = snap[:5]
+        for name, (time, tstep, mode) in snap[5].items():
+            timer = self.timers[name]
+            timer.time = time
+            timer.tstep = tstep
+            timer.mode = mode
     def set_timestep(self):
         """Sets the timestep of the function given the option use_local 
         (which selects whether it uses local_timestep or global_timestep)"""
-        global_tstep = Decimal(str(self.dt))
-        local_tstep = Decimal(str(self.__defaults__[self.__fields__.index('dt')]))
+        global_tstep = Fraction(str(self.dt))
+        local_tstep = Fraction(str(self.__defaults__[self.__fields__.index('dt')]))
         if self.use_local:
             dt=local_tstep
             if dt < global_tstep:
@@ -165,6 +238,9 @@ class Time(dataobject):
         self.dt = float(dt)
         for timer in self.timers.values():
             timer.dt=-self.dt
+    def next_event(self, time):
+        """Gets the next time any of the timers may change (np.inf if none are set/ticking)"""
+        return min([timer.next_event(time, self.dt) for timer in self.timers.values()], default=np.inf)
     def reset(self):
         """Resets time to the initial state"""
         self.time=0.0
@@ -48,7 +48,7 @@ class NominalApproach():
             all_range_str=all_range_str+rangestr+subrangestr
         #rangestr = "\n- "+"\n- ".join([k+": "+str(len(v['scenarios']))+' scenarios' for k,v in self.ranges.items()])
         return "NominalApproach ("+str(self.num_scenarios)+" scenarios) with ranges:"+all_range_str
-    def add_seed_replicates(self, rangeid, seeds):
+    def add_seed_replicates(self, rangeid, seeds, stream_seed=None):
         """
         Generates an approach with different seeds to use for the model's internal stochastic behaviors
 
@@ -58,13 +58,23 @@ class NominalApproach():
             Name for the set of replicates
         seeds : int/list
             Number of seeds (if an int) or a list of seeds to use.
+        stream_seed : int, optional
+            If given, every replicate uses this seed with the random stream keyed by
+            (rangeid, replicate) instead of a separate seed, so the stream of any 
+            block in any replicate may be reconstructed from (stream_seed, rangeid,
+            replicate, block name) without seeding the others (see 
+            :func:`fmdtools.define.rand.get_stream_rng`). The default is None.
         """
-        if type(seeds)==int: seeds = np.random.SeedSequence.generate_state(np.random.SeedSequence(),seeds)
+        if type(seeds)==int: 
+            if stream_seed is None: seeds = np.random.SeedSequence.generate_state(np.random.SeedSequence(),seeds)
+            else:                   seeds = [stream_seed for i in range(seeds)]
         self.ranges[rangeid] = {'seeds':seeds, 'scenarios':[]}
         for i in range(len(seeds)):
             self.num_scenarios+=1
             scenname = rangeid+'_'+str(self.num_scenarios)
-            self.scenarios[scenname]= NominalScenario(rangeid=rangeid, r={'seed':int(seeds[i])}, prob=1/len(seeds), name=scenname)
+            if stream_seed is None:     r = {'seed':int(seeds[i])}
+            else:                       r = {'seed':int(stream_seed), 'stream':(rangeid, i)}
+            self.scenarios[scenname]= NominalScenario(rangeid=rangeid, r=r, prob=1/len(seeds), name=scenname)
             self.ranges[rangeid]['scenarios'].append(scenname)
     def add_param_replicates(self,paramfunc, rangeid, replicates, *args, ind_seeds=True, **kwargs):
         """
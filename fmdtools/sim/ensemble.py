@@ -0,0 +1,482 @@
+# -*- coding: utf-8 -*-
+"""
+Description: A module for simulating replicates of a model in lockstep.
+
+- :class:`Ensemble`: Class for simulating replicates (e.g., the scenarios of a NominalApproach) of a model in lockstep.
+- :class:`EnsembleRNG`: Class for drawing random values from the generators of each member of an Ensemble.
+
+In an Ensemble, the states of each function and flow (and the random states of each
+function) hold an array with an entry for each replicate ("member"), so that
+functions with behaviors which support array-valued states (i.e., with
+FxnBlock.vectorized=True) can be simulated for every member at once. Other
+functions (and vectorized functions with faults present in a member) are simulated
+for each member individually, with the states of the member copied in and out of
+the arrays.
+
+Vectorized functions must have behaviors (and condfaults) which work with both
+float and array states in the nominal mode, e.g.:
+
+    class ExampleFxn(FxnBlock):
+        vectorized = True
+        def condfaults(self, time):
+            if np.any(self.flow.s.x > 10.0): self.m.add_fault('fault')
+        def behavior(self, time):
+            self.s.y = np.minimum(self.flow.s.x, 1.0)
+
+When condfaults adds a fault (or raises a ValueError, e.g., from checking the truth
+value of an array), the function is simulated for each member individually at the
+given time-step, which enables faults (and timers) to be tracked for each member.
+"""
+#File name: ensemble.py
+#Author: Daniel Hulse
+#Created: October 2023
+
+import numpy as np
+import tqdm
+from fmdtools.define.flow import MultiFlow
+from fmdtools.analyze.result import History, compile_getter
+
+
+class EnsembleRNG(object):
+    """
+    Random number generator which draws random values from the generators of
+    each member of an Ensemble (so that draws match those when the members are
+    simulated individually).
+
+    Calling a numpy.random.Generator method (e.g., rng.normal(1.0, 0.1)) returns
+    an array with a value drawn from each member's generator (or only from the
+    generators of the members in the boolean array EnsembleRNG.active, if given).
+    """
+    __slots__ = ('rngs', 'methods', 'active')
+    def __init__(self, rngs):
+        self.rngs = rngs
+        self.methods = {}
+        self.active = None
+    def __getattr__(self, methodname):
+        if methodname.startswith('__'):
+            raise AttributeError(methodname)
+        methods = self.methods.get(methodname)
+        if methods is None:
+            methods = [getattr(rng, methodname) for rng in self.rngs]
+            self.methods[methodname] = methods
+        return lambda *args: self.draw(methods, *args)
+    def draw(self, methods, *args):
+        """Draws a value from each (active) member's generator"""
+        if self.active is None:
+            return np.array([method(*args) for method in methods])
+        vals = [method(*args) if active else None for method, active in zip(methods, self.active)]
+        fill = next(val for val in vals if val is not None)
+        return np.array([fill if val is None else val for val in vals])
+
+
+def get_block_states(fxn):
+    """Gets the State objects (states, random states, and flow states) of a function"""
+    states = [fxn.s]
+    if hasattr(fxn.r, 's'):
+        states.append(fxn.r.s)
+    states.extend([flow.s for flow in fxn.flows.values()])
+    return [s for s in states if s.__fields__]
+
+
+def rows_differ(val, old_val):
+    """Gets a boolean array of the entries which differ between two arrays (with nan==nan)"""
+    if val.dtype.kind in 'fc' and old_val.dtype.kind in 'fc':
+        return (val != old_val) & ~(np.isnan(val) & np.isnan(old_val))
+    return val != old_val
+
+
+class Ensemble(object):
+    """
+    Simulates replicates of a model in lockstep.
+
+    Attributes
+    ----------
+    members : list
+        Models for each replicate, which hold the modes, timers, random number
+        generators, and actions/components of each member.
+    mdl : Model
+        Model whose states (and random states) are arrays over the members.
+    vectorized : set
+        Names of the functions which are simulated for all members at once.
+    faulty : dict
+        Indices of the members with faults in each function {fxnname: set}
+    touched : set
+        Names of the functions which have been simulated for each member individually
+        (and thus may have modes/timers which differ between members).
+    """
+    def __init__(self, mdl, scens, run_stochastic=False):
+        """
+        Instantiates the Ensemble.
+
+        Parameters
+        ----------
+        mdl : Model
+            Model to simulate.
+        scens : list
+            NominalScenarios (with p, sp, and r) defining each member.
+        run_stochastic : bool
+            Whether to run stochastic behaviors or use default values. Default is False.
+        """
+        if run_stochastic == 'track_pdf':
+            raise Exception("run_stochastic='track_pdf' not supported in Ensemble")
+        if any(scen['sequence'] for scen in scens):
+            raise Exception("Ensemble only supports scenarios without faults/disturbances")
+        self.scens = scens
+        self.run_stochastic = run_stochastic
+        self.members = [mdl.new_with_params(p=scen.p, sp=scen.sp, r=scen.r) for scen in scens]
+        self.mdl = mdl.new_with_params(p=scens[0].p, sp=scens[0].sp, r=scens[0].r)
+        self.n = len(scens)
+        first = self.members[0]
+        for member in self.members[1:]:
+            if member.sp.times != first.sp.times or member.sp.dt != first.sp.dt:
+                raise Exception("Ensemble members must have the same simulation times")
+        self.same_p = all(member.p == first.p for member in self.members)
+        self.vectorized = {fxnname for fxnname, fxn in first.fxns.items() if self.is_vectorizable(fxnname)}
+        self.faulty = {fxnname: set() for fxnname in first.fxns}
+        self.touched = set()
+        # initialize states as arrays
+        self.states = {}
+        self.own_states = {}
+        self.shared = {}
+        init_states = set()
+        for fxnname, fxn in self.mdl.fxns.items():
+            if hasattr(fxn, 'r') and hasattr(fxn.r, 's'):
+                if fxn.r.buffer_size:
+                    raise Exception("Ensemble does not support buffered random states (buffer_size>0) in "+fxnname)
+                self.shared[id(fxn.r.s)] = (fxn.r.s, fxn.r.s.snapshot())
+                fxn.r.rng = EnsembleRNG([member.fxns[fxnname].r.rng for member in self.members])
+            for flow in fxn.flows.values():
+                if isinstance(flow, MultiFlow):
+                    raise Exception("Ensemble does not support flow type: "+str(type(flow)))
+            states = []
+            member_states = [get_block_states(member.fxns[fxnname]) for member in self.members]
+            for i, state in enumerate(get_block_states(fxn)):
+                fields = state.__fields__
+                mstates = [ms[i] for ms in member_states]
+                if id(state) not in init_states:
+                    for field in fields:
+                        vals = [getattr(ms, field) for ms in mstates]
+                        if any(np.ndim(val) for val in vals):
+                            raise Exception("Ensemble only supports scalar states: "+fxnname+" "+field)
+                        setattr(state, field, np.array(vals))
+                    init_states.add(id(state))
+                states.append((state, mstates, fields))
+            self.states[fxnname] = states
+            # states compared to determine whether the function changed (see Block.return_mutables)
+            self.own_states[fxnname] = {id(fxn.s)}
+            if 's' in fxn.r.__fields__:
+                self.own_states[fxnname].add(id(fxn.r.s))
+        self.flowstates = None
+        self.mdl.compile_static()
+        fxns, fxn_flows, flows, flow_fxns, _ = self.mdl._static_schedule
+        self.schedule = ([fxn.name for fxn in fxns], fxn_flows, flows, flow_fxns)
+
+    def is_vectorizable(self, fxnname):
+        """Checks whether the function may be simulated for all members at once"""
+        fxn = self.members[0].fxns[fxnname]
+        return (getattr(fxn, 'vectorized', False) and not hasattr(fxn, 'c') and not hasattr(fxn, 'a')
+                and all(member.fxns[fxnname].p == fxn.p for member in self.members))
+
+    def get_arrays(self, fxnname):
+        """Gets (copies of) the state arrays of a given function"""
+        return [[np.array(getattr(state, field)) for field in fields]
+                for state, mstates, fields in self.states[fxnname]]
+
+    def set_arrays(self, fxnname, arrays):
+        """Sets the state arrays of a given function to those given by get_arrays()"""
+        for (state, mstates, fields), vals in zip(self.states[fxnname], arrays):
+            for field, val in zip(fields, vals):
+                setattr(state, field, val)
+
+    def get_lists(self, *fxnnames):
+        """Gets the states of the given functions as lists over the members"""
+        return {fxnname: [[getattr(state, field).tolist() for field in fields]
+                          for state, mstates, fields in self.states[fxnname]]
+                for fxnname in fxnnames}
+
+    def set_lists(self, lists):
+        """Sets the state arrays to the lists given by get_lists()"""
+        for fxnname, fxnlists in lists.items():
+            for (state, mstates, fields), vals in zip(self.states[fxnname], fxnlists):
+                for field, val in zip(fields, vals):
+                    setattr(state, field, np.array(val))
+
+    def to_member(self, i, lists):
+        """Copies the states in lists (from get_lists()) to member i"""
+        for fxnname, fxnlists in lists.items():
+            for (state, mstates, fields), vals in zip(self.states[fxnname], fxnlists):
+                mstate = mstates[i]
+                for field, val in zip(fields, vals):
+                    setattr(mstate, field, val[i])
+
+    def from_member(self, i, lists):
+        """Copies the states of member i to lists (from get_lists())"""
+        for fxnname, fxnlists in lists.items():
+            for (state, mstates, fields), vals in zip(self.states[fxnname], fxnlists):
+                mstate = mstates[i]
+                for field, val in zip(fields, vals):
+                    val[i] = getattr(mstate, field)
+
+    def propagate(self, time):
+        """
+        Propagates behaviors through the model at one time-step (for all members).
+
+        As in :meth:`fmdtools.define.model.Model.prop_static`, static functions are
+        re-run until their states and connected flows stop changing, which is
+        tracked for each member, so functions are only re-run for the members
+        in which they (or their flows) changed.
+
+        Parameters
+        ----------
+        time : float
+            The current time-step.
+        """
+        allmembers = np.ones(self.n, dtype=bool)
+        fxnnames, fxn_flows, flows, flow_fxns = self.schedule
+        if self.flowstates is None:
+            self.flowstates = [[np.array(getattr(flow.s, field)) for field in flow.s.__fields__] for flow in flows]
+        for fxnname in self.mdl.dynamicfxns:
+            self.call(fxnname, 'dynamic', time, allmembers)
+        activefxns = {i: allmembers for i in range(len(fxnnames))}
+        n = 0
+        while activefxns:
+            nextfxns = {}
+            for i, active in sorted(activefxns.items()):
+                changed = self.call(fxnnames[i], 'static', time, active)
+                if changed.any():
+                    nextfxns[i] = changed
+            for j, flow in enumerate(flows):
+                changed = np.zeros(self.n, dtype=bool)
+                for field, old_val in zip(flow.s.__fields__, self.flowstates[j]):
+                    changed |= rows_differ(getattr(flow.s, field), old_val)
+                if changed.any():
+                    self.flowstates[j] = [np.array(getattr(flow.s, field)) for field in flow.s.__fields__]
+                    for k in flow_fxns[j]:
+                        nextfxns[k] = nextfxns.get(k, changed) | changed
+            activefxns = nextfxns
+            n += 1
+            if n > 1000:
+                activefxns = [fxnnames[i] for i in activefxns]
+                raise Exception("Undesired looping between functions in static propagation step",
+                                "at t="+str(time)+", these functions remain active:"+str(activefxns))
+
+    def call(self, fxnname, proptype, time, active):
+        """
+        Simulates a function at the given time-step, for all active members at once
+        if the function is vectorized and has no faults, and for each member
+        individually otherwise.
+
+        Parameters
+        ----------
+        fxnname : str
+            Name of the function.
+        proptype : str
+            Type of propagation step ('static' or 'dynamic')
+        time : float
+            The current time-step.
+        active : array
+            Boolean array of the members to simulate the function in.
+
+        Returns
+        -------
+        changed : array
+            Boolean array of the members where the function's mutables changed.
+        """
+        if fxnname in self.vectorized and not self.faulty[fxnname]:
+            return self.call_vectorized(fxnname, proptype, time, active)
+        else:
+            return self.call_members(fxnname, proptype, time, active)
+
+    def call_vectorized(self, fxnname, proptype, time, active):
+        """Simulates a (vectorized) function for all active members at once"""
+        fxn = self.mdl.fxns[fxnname]
+        old_arrays = self.get_arrays(fxnname)
+        modesnap = fxn.m.snapshot()
+        if hasattr(fxn, 'condfaults'):
+            try:
+                fxn.condfaults(time)
+                vectorizable = fxn.m.snapshot() == modesnap
+            except ValueError:
+                vectorizable = False
+            if not vectorizable:
+                fxn.m.restore(modesnap)
+                self.set_arrays(fxnname, old_arrays)
+                return self.call_members(fxnname, proptype, time, active)
+        all_active = active.all()
+        if type(fxn.r.rng) == EnsembleRNG:
+            fxn.r.rng.active = None if all_active else active
+        fxn(proptype, time=time, run_stochastic=self.run_stochastic)
+        if fxn.m.snapshot() != modesnap:
+            raise Exception("Faults added outside of condfaults in vectorized function "+fxnname)
+        changed = np.zeros(self.n, dtype=bool)
+        for (state, mstates, fields), old_vals in zip(self.states[fxnname], old_arrays):
+            for field, old_val in zip(fields, old_vals):
+                val = getattr(state, field)
+                if type(val) != np.ndarray or val.shape != (self.n,):
+                    val = np.full(self.n, val)
+                if not all_active:
+                    val = np.where(active, val, old_val)
+                setattr(state, field, val)
+                if id(state) in self.own_states[fxnname]:
+                    changed |= rows_differ(val, old_val)
+        return changed
+
+    def call_members(self, fxnname, proptype, time, active):
+        """Simulates a function for each active member individually"""
+        fxn = self.mdl.fxns[fxnname]
+        lists = self.get_lists(fxnname)
+        changed = np.zeros(self.n, dtype=bool)
+        for i in np.flatnonzero(active):
+            mfxn = self.members[i].fxns[fxnname]
+            self.to_member(i, lists)
+            mfxn.t.time = fxn.t.time
+            oldmutables = mfxn.return_mutables()
+            mfxn(proptype, time=time, run_stochastic=self.run_stochastic)
+            changed[i] = oldmutables != mfxn.return_mutables()
+            self.from_member(i, lists)
+            if mfxn.m.faults:
+                self.faulty[fxnname].add(i)
+            else:
+                self.faulty[fxnname].discard(i)
+        self.set_lists(lists)
+        fxn.t.time = time
+        self.touched.add(fxnname)
+        return changed
+
+    def init_hist(self, track='default', track_times='all'):
+        """
+        Initializes the histories of each member, which are views of (2d) arrays
+        in Ensemble.hist with a row for each member.
+
+        Parameters
+        ----------
+        track : str/dict
+            Model states to track (see :data:`fmdtools.sim.propagate.sim_kwargs`)
+        track_times : str/tuple
+            Times to track (see :data:`fmdtools.sim.propagate.sim_kwargs`)
+
+        Returns
+        -------
+        timerange : array
+            Times to simulate the members over.
+        """
+        from fmdtools.sim.propagate import init_histrange
+        for member in self.members:
+            mdlhist, histrange, timerange, shift = init_histrange(member, self.members[0].sp.times[0],
+                                                                  False, track, track_times)
+        self.hist = History()
+        self.accessors = []
+        state_ids = {id(state) for states in self.states.values() for state, mstates, fields in states}
+        for att, val in self.members[0].h.items():
+            if not isinstance(val, np.ndarray):
+                raise Exception("Ensemble only supports array histories: "+att)
+            self.hist[att] = np.empty((self.n, *val.shape), dtype=val.dtype)
+            for i, member in enumerate(self.members):
+                member.h[att] = self.hist[att][i]
+            split_att = att.split('.')
+            owner = split_att[1] if split_att[0] == 'fxns' else ''
+            if att == 'time':
+                self.accessors.append((att, 'time', None, owner))
+            elif att.startswith('i.') or '.i.' in att:
+                i_ind = split_att.index('i')
+                getter = compile_getter(self.mdl, split_att[:i_ind]+['indicate_'+split_att[-1]])
+                self.accessors.append((att, 'indicator', getter, owner))
+            elif id(compile_getter(self.mdl, split_att[:-1])(self.mdl)) in state_ids:
+                self.accessors.append((att, 'state', compile_getter(self.mdl, split_att), owner))
+            else:
+                if 'faults' in split_att:
+                    faultind = split_att.index('faults')
+                    fault = split_att[faultind+1]
+                    fault_getter = compile_getter(self.mdl, split_att[:faultind])
+                    getter = lambda obj, fault=fault, fault_getter=fault_getter: fault in fault_getter(obj).faults
+                else:
+                    getter = compile_getter(self.mdl, split_att)
+                self.accessors.append((att, 'member', getter, owner))
+                for i, member in enumerate(self.members):
+                    self.hist[att][i] = getter(member)
+        return timerange
+
+    def log(self, t_ind, time):
+        """Logs the states of the members to the history at the time-index t_ind"""
+        for att, kind, getter, owner in self.accessors:
+            hist = self.hist[att]
+            if kind == 'state':
+                hist[:, t_ind] = getter(self.mdl)
+            elif kind == 'time':
+                hist[:, t_ind] = time
+            elif kind == 'member':
+                if owner in self.touched or not owner:
+                    hist[:, t_ind] = [getter(member) for member in self.members]
+            else:
+                # indicators are evaluated for all members at once unless modes/timers
+                # may differ between members (or they raise a ValueError)
+                if owner:   batch_ok = owner in self.vectorized and owner not in self.touched
+                else:       batch_ok = self.same_p and not self.touched
+                val = None
+                if batch_ok:
+                    try:
+                        val = getter(self.mdl)(time)
+                    except ValueError:
+                        val = None
+                if val is None or np.shape(val) not in [(), (self.n,)]:
+                    val = self.member_indicators(getter, owner, time)
+                hist[:, t_ind] = val
+
+    def member_indicators(self, getter, owner, time):
+        """Evaluates an indicator for each member individually"""
+        if owner:   lists = self.get_lists(owner)
+        else:       lists = self.get_lists(*self.states)
+        vals = []
+        for i, member in enumerate(self.members):
+            self.to_member(i, lists)
+            vals.append(getter(member)(time))
+        self.set_lists(lists)
+        return vals
+
+    def run(self, desired_result='endclass', track='default', track_times='all', showprogress=False):
+        """
+        Simulates the members of the Ensemble over time.
+
+        Parameters
+        ----------
+        desired_result : str/list/dict
+            Desired results to return (at the end of the simulation). The default is 'endclass'.
+        track : str/dict
+            Model states to track (see :data:`fmdtools.sim.propagate.sim_kwargs`). The default is 'default'.
+        track_times : str/tuple
+            Times to track (see :data:`fmdtools.sim.propagate.sim_kwargs`). The default is 'all'.
+        showprogress : bool
+            Whether to show a progress bar over the simulation times. The default is False.
+
+        Returns
+        -------
+        results : list
+            Results for each member.
+        mdlhists : list
+            Histories of each member.
+        """
+        from fmdtools.sim.propagate import get_t_ind_rec, get_result
+        if type(desired_result) == dict:
+            if any(k != 'end' for k in desired_result):
+                raise Exception("Ensemble only supports results at the end of the simulation")
+            desired_result = desired_result.get('end', {})
+        try:
+            timerange = self.init_hist(track, track_times)
+            for t_ind, t in enumerate(tqdm.tqdm(timerange, disable=not(showprogress), desc="TIMESTEPS COMPLETE")):
+                try:
+                    self.propagate(t)
+                except Exception as e:
+                    raise Exception("Error in ensemble at t="+str(t)) from e
+                if track_times:
+                    self.log(get_t_ind_rec(t, t_ind, 0, track_times), t)
+            results = []
+            lists = self.get_lists(*self.states)
+            for i, (scen, member) in enumerate(zip(self.scens, self.members)):
+                self.to_member(i, lists)
+                member.h.cut(t_ind)
+                results.append(get_result(scen, member, desired_result, member.h))
+        finally:
+            # random states (r.s) are shared between Rand instances of the same class
+            for state, snap in self.shared.values():
+                state.restore(snap)
+        return results, [member.h for member in self.members]
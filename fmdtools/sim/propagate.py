@@ -9,7 +9,11 @@ Main Methods:
     - :func:`single_faults()`:       Creates and propagates a list of failure scenarios in a model over given model times
     - :func:`approach`:             Injects and propagates faults in the model defined by a given sample approach.
     - :func:`nominal_approach`:     Simulates a model over a range of parameters defined by a nominal approach.
+    - :func:`nominal_ensemble`:     Simulates the scenarios of a nominal approach in lockstep (see :mod:`fmdtools.sim.ensemble`).
     - :func:`nested_approach`:      Injects and propagates faults in the model defined by a given sample approach over a range of parameters defined by a nominal approach. 
+    - :func:`approach_iter`, :func:`single_faults_iter`, :func:`nested_approach_iter`: 
+                                    Streaming versions of the above, which yield the results of each scenario as it is completed.
+    - :func:`init_resident`:        Pool initializer which keeps models resident in the workers (for use with resident=True).
     
 Shared Method Parameters:
     - :data:`sim_kwargs`:           Simulation keyword arguments.
@@ -29,13 +33,19 @@ Private Methods:
 
 import numpy as np
 import copy
+import math
+import bisect
 import tqdm
 import dill
 import os
+import threading
+import hashlib
+from multiprocessing import shared_memory, resource_tracker
 from fmdtools.define.common import get_var, t_key
 from .approach import SampleApproach
 from .scenario import Sequence, Scenario, SingleFaultScenario
-from fmdtools.analyze.result import Result, History,  create_indiv_filename, file_check
+from .scheduler import ScenarioScheduler
+from fmdtools.analyze.result import Result, History, Profile, timed_call, create_indiv_filename, file_check, is_numeric
 from fmdtools.analyze.graph import graph_factory
 
 ##DEFAULT ARGUMENTS
@@ -44,7 +54,14 @@ sim_kwargs= {'desired_result':'endclass',
              'track_times':'all',
              'staged':False,
              'run_stochastic':False,
-             'use_end_condition':True}
+             'use_end_condition':True,
+             'converge_steps':0,
+             'splice_nominal':False,
+             'profile':False,
+             'event_driven':False,
+             'sparse_hist':False,
+             'compact_hist':False,
+             'delta_hist':False}
 """
 Simulation keyword arguments.
 
@@ -76,9 +93,67 @@ Parameters
     run_stochastic : bool
         Whether to run stochastic behaviors or use default values. Default is False.
         Can set as 'track_pdf' to calculate/track the probability densities of random states over time.
-    staged : bool, optional
+    staged : bool/str, optional
         Whether to inject the faults in a copy of the nominal model at the fault time (True) or 
         instantiate a new model for the fault (False). Setting to True roughly halves execution time. The default is False.
+        When running scenarios serially, staged=True restores a single model in place
+        from snapshots of the nominal model (see :meth:`Model.snapshot`), while
+        staged='copy' copies the nominal model for each scenario.
+    converge_steps : int, optional
+        Number of consecutive time-steps the model mutables (see 
+        :meth:`Model.return_mutables`) must be unchanged for the simulation to stop
+        early, after which the rest of the history is filled with the last
+        recorded values (see :meth:`History.fill`). Convergence is only checked
+        after the last pending event (fault/disturbance injection, phase start,
+        copy time, or time-based desired result) and the last wake-up time declared
+        by the functions (see :meth:`Model.next_event`), since the model may change at
+        these times. For multi-rate models, the model must also be unchanged for at
+        least the largest local timestep (see :meth:`Model.compile_calendar`), so
+        that each function has run in this time. Not used when run_stochastic is set
+        (since the mutables do not include the generator states). The default is 0, 
+        which simulates to the final time.
+    splice_nominal : bool, optional
+        Whether to stop simulating a fault scenario once it rejoins the nominal
+        trajectory (i.e., the model mutables equal the nominal mutables at the same 
+        time after the last fault/disturbance injection), copying the rest of the 
+        nominal history into the scenario history and restoring the model to its 
+        nominal end state. Requires recording the nominal mutables at each time-step
+        (see :func:`init_nomtraj`). Not used when run_stochastic=True. The default is False.
+    profile : bool, optional
+        Whether to record the execution time of each function, behavior, and action,
+        the number of static propagation iterations, and the time spent logging the 
+        history, which is returned in the result of each scenario as result['profile']
+        (a :class:`fmdtools.analyze.result.Profile`, which may be totalled over 
+        multiple scenarios using Profile.aggregate). The default is False.
+    event_driven : bool, optional
+        Whether to skip time-steps where the model is quiescent. If the model mutables 
+        are unchanged over a time-step, the simulation jumps directly to the next 
+        event (fault/disturbance injection, phase start, copy time, time-based desired
+        result, or wake-up time declared by the model's blocks and timers, see
+        :meth:`Model.next_event`), and the history over the skipped time-steps is 
+        filled with the current values (see :meth:`History.fill`). Not used when
+        desired_result includes 'all' or when run_stochastic is set (since the 
+        mutables do not include the generator states, equal draws over a time-step
+        would otherwise be mistaken for quiescence). The default is False.
+    sparse_hist : bool, optional
+        Whether to return the history of each scenario as a sparse history, which
+        stores the values of each attribute only at the time-steps where it changes
+        (see :meth:`History.to_sparse`). The default is False.
+    compact_hist : bool/dict, optional
+        Whether to return the history of each scenario as a compact history, which
+        stores the attributes in compact data types (e.g., float32 floats, strings
+        as codes into shared lookup tables, and bit-packed fault flags, see 
+        :meth:`History.to_compact`). May be True (to use the 
+        :data:`fmdtools.analyze.result.default_dtype_policy`) or a dict giving 
+        the policy. If used with sparse_hist, the remaining arrays are made sparse.
+        The default is False.
+    delta_hist : bool, optional
+        Whether to return the history of each fault scenario as the differences from
+        the (shared) nominal history, which are reconstructed when accessed (see 
+        :meth:`History.to_delta`). The differences are taken in the main process
+        (after the history is returned from the pool, if used), and compact_hist 
+        and sparse_hist are then applied to the arrays which are not stored as 
+        differences. The default is False.
 """
 def unpack_sim_kwargs(**kwargs):
     """Unpacks :data:`sim_kwargs` parameters for :func:`prop_one_scen`"""
@@ -118,7 +193,10 @@ def pack_run_kwargs(**kwargs):
     return {k:copy.deepcopy(kwargs.get(k,v)) for k,v in run_kwargs.items()}
 mult_kwargs = {'max_mem':2e9,
                'showprogress': True,
-               'pool': False}
+               'pool': False,
+               'shared_mem': False,
+               'resident': False,
+               'schedule': False}
 """
 Multi-scenario keyword arguments.
 
@@ -133,6 +211,20 @@ Parameters
         whether to show a progress bar during execution. default is true
     max_mem : int
         Max memory (warns the user when memory is above threshold)
+    shared_mem : bool, optional
+        Whether to place the nominal history and (staged) model(s) in shared memory
+        once for the pool to attach to, rather than pickling them with each scenario.
+        Only used when a pool is given. The default is False.
+    resident : bool, optional
+        Whether to use the models kept resident in the workers of the pool (see
+        :func:`init_resident`), so that only the scenario and the (small) spec of the
+        model from :func:`get_mdl_spec` are sent to the workers for each task, rather
+        than the pickled model. The default is False.
+    schedule : bool/ScenarioScheduler, optional
+        Whether to schedule the scenarios in the pool longest-first by their estimated
+        cost (see :class:`fmdtools.sim.scheduler.ScenarioScheduler`). A ScenarioScheduler
+        may be given to use (and update) the execution times of prior runs and get the
+        utilization of each worker after the run. The default is False.
 """
 def unpack_mult_kwargs(kwargs):
     """Unpacks the mult kwarg parameters for the :func:`approach`"""
@@ -161,6 +253,7 @@ def nominal(mdl, **kwargs):
         A dictionary with a history of modelstates
     """
     result, mdlhist, _, mdl, t_end = nom_helper(mdl, None, cut_hist=True, **kwargs)
+    mdlhist = compress_hist(mdlhist, **kwargs)
     if kwargs.get('protect', False): mdl.reset()
     save_helper(kwargs.get('save_args',{}), result, mdlhist)
     return result, mdlhist
@@ -227,19 +320,66 @@ def nominal_approach(mdl,nomapp, **kwargs):
     """
     kwargs.update(pack_run_kwargs(**kwargs))
     check_overwrite(kwargs['save_args'] )
-    kwargs['max_mem'], showprogress, pool = unpack_mult_kwargs(kwargs)
+    kwargs['max_mem'], showprogress, pool, _, resident, _ = unpack_mult_kwargs(kwargs)
     kwargs['num_scens']=nomapp.num_scenarios
     n_mdlhists, n_results = History.fromkeys(nomapp.scenarios), Result.fromkeys(nomapp.scenarios)
     if pool:
         check_mdl_memory(mdl, nomapp.num_scenarios, max_mem=kwargs['max_mem'])
-        inputs = [(mdl, scen, name, kwargs) for name, scen in nomapp.scenarios.items()]
-        res_list = list(tqdm.tqdm(pool.imap(exec_nom_par, inputs), total=len(inputs), disable=not(showprogress), desc="SCENARIOS COMPLETE"))
+        if resident:
+            spec = get_mdl_spec(mdl)
+            inputs = [(spec, scen, name, kwargs) for name, scen in nomapp.scenarios.items()]
+            res_list = list(tqdm.tqdm(pool.imap(exec_nom_resident, inputs), total=len(inputs), disable=not(showprogress), desc="SCENARIOS COMPLETE"))
+        else:
+            inputs = [(mdl, scen, name, kwargs) for name, scen in nomapp.scenarios.items()]
+            res_list = list(tqdm.tqdm(pool.imap(exec_nom_par, inputs), total=len(inputs), disable=not(showprogress), desc="SCENARIOS COMPLETE"))
         n_results, n_mdlhists = unpack_res_list([*nomapp.scenarios.values()], res_list)
     else:
         for scenname, scen in tqdm.tqdm(nomapp.scenarios.items(), disable=not(showprogress), desc="SCENARIOS COMPLETE"):
             n_results[scenname], n_mdlhists[scenname]= exec_nom_helper(mdl, scen, scenname, **{**kwargs, 'use_end_condition':False})
     save_helper(kwargs['save_args'] , n_results, n_mdlhists)
     return n_results.flatten(), n_mdlhists.flatten()
+def nominal_ensemble(mdl, nomapp, **kwargs):
+    """
+    Simulates the set of nominal scenarios of a NominalApproach in lockstep using
+    an :class:`fmdtools.sim.ensemble.Ensemble`, where the states of each scenario
+    are held in arrays, so that functions with vectorized behaviors are simulated
+    for every scenario at once. Gives the same results as :func:`nominal_approach`
+    (with less overhead per scenario).
+
+    Parameters
+    ----------
+    mdl : Model
+        Model to simulate
+    nomapp : NominalApproach
+        Nominal Approach defining the nominal scenarios to run the system over.
+    **kwargs : kwargs
+        Additional keyword arguments, may include:
+            - :data:`sim_kwargs` : kwargs
+                Simulation options (desired_result, track, track_times, and run_stochastic)
+            - :data:`run_kwargs` : kwargs
+                Run options (save_args)
+            - showprogress : bool
+                Whether to show a progress bar over the simulation times. Default is False.
+    Returns
+    -------
+    nomresults:
+        dict of result corresponding to desired result {'scenname':return}
+    nomhists : Dict
+        Dictionary of model histories, with structure {'scenname':mdlhist}
+    """
+    from .ensemble import Ensemble
+    desired_result, track, track_times, _, run_stochastic, *_ = unpack_sim_kwargs(**kwargs)
+    save_args = pack_run_kwargs(**kwargs)['save_args']
+    check_overwrite(save_args)
+    scens = [*nomapp.scenarios.values()]
+    ens = Ensemble(mdl, scens, run_stochastic=run_stochastic)
+    res_list, hist_list = ens.run(desired_result=desired_result, track=track, track_times=track_times,
+                                  showprogress=kwargs.get('showprogress', False))
+    n_results, n_mdlhists = unpack_res_list(scens, [*zip(res_list, hist_list)])
+    for scen in scens:
+        save_helper(save_args, n_results[scen.name], n_mdlhists[scen.name], scen.name, scen.name)
+    save_helper(save_args, n_results, n_mdlhists)
+    return n_results.flatten(), n_mdlhists.flatten()
 def unpack_res_list(scenlist, res_list):
     results= Result()
     mdlhists = History()
@@ -250,6 +390,10 @@ def unpack_res_list(scenlist, res_list):
 def exec_nom_par(arg):
     endclass, mdlhist = exec_nom_helper(arg[0], arg[1], arg[2], **{**arg[3], 'use_end_condition':False})
     return endclass, mdlhist
+def exec_nom_resident(arg):
+    """Helper function for executing nominal scenarios in parallel from the model resident in the worker"""
+    mdl, _ = get_resident(arg[0])
+    return exec_nom_par((mdl, *arg[1:]))
 def exec_nom_helper(mdl, scen, name, **kwargs):
     """Helper function for executing nominal scenarios"""
     mdl = mdl.new_with_params(p=scen.p, sp=scen.sp, r=scen.r)
@@ -336,11 +480,14 @@ def sequence(mdl, seq={}, faultseq={}, disturbances={}, scen={}, rate=np.NaN, **
         if not seq: seq = Sequence(faultseq=faultseq, disturbances=disturbances)
         scen = Scenario(sequence=seq, rate=rate, name='faulty', times=tuple([*seq.keys()]))
     
-    nomresult , nomhist, nomscen, mdls, t_end_nom = nom_helper(mdl, [min(scen.sequence)], **{**sim_kwarg, 'use_end_condition':False}, **run_kwarg)
+    nomtraj = init_nomtraj(**sim_kwarg)
+    nomresult , nomhist, nomscen, mdls, t_end_nom = nom_helper(mdl, [min(scen.sequence)], **{**sim_kwarg, 'use_end_condition':False}, **run_kwarg, nomtraj=nomtraj)
     mdl = [*mdls.values()][0]
         
-    result, faulthist, _, t_end = prop_one_scen(mdl, scen, **sim_kwarg, nomhist=nomhist, nomresult=nomresult)
-    nomhist.cut(t_end_nom)
+    result, faulthist, _, t_end = prop_one_scen(mdl, scen, **sim_kwarg, nomhist=nomhist, nomresult=nomresult, nomtraj=nomtraj)
+    if sim_kwarg['delta_hist']:
+        faulthist = compress_hist(faulthist, **sim_kwarg, nomhist=nomhist)
+    nomhist = compress_hist(nomhist.cut(t_end_nom), **sim_kwarg)
     mdlhists = History(nominal=nomhist, faulty=faulthist)
     if kwargs.get('protect', False): mdl.reset()
     save_helper(kwargs.get('save_args',{}), result, mdlhists)
@@ -383,7 +530,8 @@ def nom_helper(mdl, ctimes, protect=True, save_args={}, mdl_kwargs={}, scen={},
         if type(ctimes) in [float, int]:ctimes=[ctimes]
         else:                           ctimes=ctimes
     else:                               ctimes=[]
-    result, nommdlhist, mdls, t_end_nom = prop_one_scen(mdl, nomscen, ctimes = ctimes, **kwargs)
+    # nominal history is compressed by the caller, since it is used to classify the fault scenarios
+    result, nommdlhist, mdls, t_end_nom = prop_one_scen(mdl, nomscen, ctimes = ctimes, **{**kwargs, 'compact_hist':False, 'sparse_hist':False})
     
     endfaults, endfaultprops = mdl.return_faultmodes()
     if any(endfaults): print("Faults found during the nominal run "+str(endfaults))
@@ -418,11 +566,11 @@ def approach(mdl, app,  **kwargs):
         A dictionary with the history of all model states for each scenario (including the nominal)
     """
     kwargs.update(pack_run_kwargs(**kwargs))
-    nomresult, nomhist, nomscen, c_mdl, t_end_nom = nom_helper(mdl, copy.copy(app.times), **{**kwargs, 'use_end_condition':False})
+    nomtraj = init_nomtraj(**kwargs)
+    nomresult, nomhist, nomscen, c_mdl, t_end_nom = nom_helper(mdl, copy.copy(app.times), **{**kwargs, 'use_end_condition':False}, nomtraj=nomtraj)
     scenlist = app.scenlist
-    results, mdlhists = scenlist_helper(mdl, scenlist, c_mdl, **kwargs, nomhist=nomhist, nomresult=nomresult)
-    nomhist.cut(t_end_nom)
-    mdlhists['nominal'] = nomhist 
+    results, mdlhists = scenlist_helper(mdl, scenlist, c_mdl, **kwargs, nomhist=nomhist, nomresult=nomresult, nomtraj=nomtraj)
+    mdlhists['nominal'] = compress_hist(nomhist.cut(t_end_nom), **kwargs) 
     results['nominal'] = nomresult
     save_helper(kwargs.get('save_args',{}), nomresult, mdlhists['nominal'], indiv_id=str(len(results)-1),result_id='nominal')
     save_helper(kwargs['save_args'], results, mdlhists)
@@ -457,45 +605,447 @@ def single_faults(mdl, **kwargs):
         A dictionary with the history of all model states for each scenario (including the nominal)
     """
     kwargs.update(pack_run_kwargs(**kwargs))
-    nomresult, nomhist, nomscen, c_mdl, t_end_nom = nom_helper(mdl, mdl.sp.times, **{**kwargs, 'use_end_condition':False})
+    nomtraj = init_nomtraj(**kwargs)
+    nomresult, nomhist, nomscen, c_mdl, t_end_nom = nom_helper(mdl, mdl.sp.times, **{**kwargs, 'use_end_condition':False}, nomtraj=nomtraj)
     
     scenlist = list_init_faults(mdl)
-    results, mdlhists = scenlist_helper(mdl, scenlist, c_mdl, **kwargs, nomhist=nomhist, nomresult=nomresult)
-    nomhist.cut(t_end_nom)
-    mdlhists['nominal'] = nomhist
+    results, mdlhists = scenlist_helper(mdl, scenlist, c_mdl, **kwargs, nomhist=nomhist, nomresult=nomresult, nomtraj=nomtraj)
+    mdlhists['nominal'] = compress_hist(nomhist.cut(t_end_nom), **kwargs)
     results['nominal'] = nomresult
     save_helper(kwargs.get('save_args',{}), nomresult, mdlhists['nominal'], indiv_id=str(len(results)-1),result_id='nominal')
     save_helper(kwargs['save_args'], results, mdlhists)
     return results.flatten(), mdlhists.flatten()
 
+def approach_iter(mdl, app, **kwargs):
+    """
+    Streaming version of :func:`approach`, which yields the results of each scenario
+    as it is completed instead of accumulating them in memory (and thus does not check
+    max_mem). The nominal scenario is yielded last.
+
+    Parameters
+    ----------
+    mdl : model
+        The model to inject faults in.
+    app : sampleapproach
+        SampleApproach used to define the list of faults and sample time for the model.
+    **kwargs : kwargs
+        Additional keyword arguments, may include:
+            - :data:`sim_kwargs` : kwargs
+                Simulation options for :func:`prop_one_scen
+            - :data:`run_kwargs` : kwargs
+                Run options for :func:`nom_helper` and others. Histories can be saved
+                as they are completed using save_args={'mdlhist':{...}, 'indiv':True}
+            - :data:`mult_kwargs` : kwargs
+                Multi-scenario options for :func:`approach` and others
+            - ordered : bool
+                Whether to yield the scenarios in order (otherwise as they are completed
+                in the pool). Default is True.
+            - chunksize : int
+                Number of scenarios to send to each worker at a time. Default is 1.
+            - return_mdlhist : bool
+                Whether to return the history of each scenario (otherwise an empty
+                History is yielded). Default is True.
+    Yields
+    ------
+    scenname : str
+        Name of the scenario
+    result : Result
+        Result of the scenario
+    mdlhist : History
+        History of the scenario
+    """
+    kwargs.update(pack_run_kwargs(**kwargs))
+    check_stream_save_args(kwargs['save_args'])
+    nomtraj = init_nomtraj(**kwargs)
+    nomresult, nomhist, nomscen, c_mdl, t_end_nom = nom_helper(mdl, copy.copy(app.times), **{**kwargs, 'use_end_condition':False}, nomtraj=nomtraj)
+    yield from scenlist_stream(mdl, app.scenlist, c_mdl, nomresult, nomhist, t_end_nom, **kwargs, nomtraj=nomtraj)
+
+def single_faults_iter(mdl, **kwargs):
+    """
+    Streaming version of :func:`single_faults`, which yields the results of each
+    scenario as it is completed (see :func:`approach_iter` for arguments).
+
+    Yields
+    ------
+    scenname : str
+        Name of the scenario
+    result : Result
+        Result of the scenario
+    mdlhist : History
+        History of the scenario
+    """
+    kwargs.update(pack_run_kwargs(**kwargs))
+    check_stream_save_args(kwargs['save_args'])
+    nomtraj = init_nomtraj(**kwargs)
+    nomresult, nomhist, nomscen, c_mdl, t_end_nom = nom_helper(mdl, mdl.sp.times, **{**kwargs, 'use_end_condition':False}, nomtraj=nomtraj)
+    yield from scenlist_stream(mdl, list_init_faults(mdl), c_mdl, nomresult, nomhist, t_end_nom, **kwargs, nomtraj=nomtraj)
+
+def check_stream_save_args(save_args):
+    """Checks that save_args can be used in streaming execution (where only individual scenarios are saved)"""
+    if save_args and not save_args.get('indiv', False):
+        raise Exception("Streaming execution only saves individual scenarios. Use save_args={..., 'indiv':True}")
+
+def scenlist_stream(mdl, scenlist, c_mdl, nomresult, nomhist, t_end_nom, **kwargs):
+    """Helper function for streaming the scenarios in scenlist (see :func:`scenlist_iter`)
+    followed by the nominal scenario."""
+    for i, result, mdlhist in scenlist_iter(mdl, scenlist, c_mdl, **kwargs, nomhist=nomhist, nomresult=nomresult):
+        yield scenlist[i].name, result, mdlhist
+    nomhist = compress_hist(nomhist.cut(t_end_nom), **kwargs)
+    save_helper(kwargs['save_args'], nomresult, nomhist, indiv_id=str(len(scenlist)), result_id='nominal')
+    if not kwargs.get('return_mdlhist', True):
+        nomhist = History()
+    yield 'nominal', nomresult, nomhist
+
 def scenlist_helper(mdl, scenlist, c_mdl, **kwargs):
     #nomhist, track, track_times, desired_result, run_stochastic, save_args
-    max_mem, showprogress, pool = unpack_mult_kwargs(kwargs)
-    staged = kwargs.get('staged',False)
+    max_mem = kwargs.get('max_mem', mult_kwargs['max_mem'])
     mem, mem_profile = kwargs['nomhist'].get_memory()
     if mem*len(scenlist)>max_mem: raise Exception("Model history will be too large: "+str(mem)+" > "+str(max_mem))
+    if kwargs.get('pool', False) and not kwargs.get('shared_mem', False) and not kwargs.get('resident', False):
+        check_mdl_memory(mdl, len(scenlist), max_mem=max_mem)
     results = Result()
     mdlhists = History()
-    if pool:
-        check_mdl_memory(mdl, len(scenlist), max_mem=max_mem)
+    for i, result, mdlhist in scenlist_iter(mdl, scenlist, c_mdl, **kwargs):
+        results[scenlist[i].name], mdlhists[scenlist[i].name] = result, mdlhist
+    return results, mdlhists
+
+def scenlist_iter(mdl, scenlist, c_mdl, ordered=True, chunksize=1, **kwargs):
+    """
+    Generator which executes the scenarios in scenlist (serially or in a pool) and
+    yields the results of each scenario as it is completed.
+
+    Parameters
+    ----------
+    mdl : Model
+        Model to simulate
+    scenlist : list
+        List of scenarios to run
+    c_mdl : dict
+        Copies of the nominal model at each staged time (if staged)
+    ordered : bool, optional
+        Whether to yield the scenarios in the order of scenlist. If False, scenarios
+        are yielded as they are completed by the pool (using imap_unordered).
+        The default is True.
+    chunksize : int, optional
+        Number of scenarios to send to each worker at a time (for multiprocessing
+        pools). The default is 1.
+    **kwargs : kwargs
+        Simulation arguments (including nomhist) to pass to :func:`exec_scen` and
+        :data:`mult_kwargs`
+
+    Yields
+    ------
+    i : int
+        Index of the scenario in scenlist
+    result : Result
+        Result of the scenario
+    mdlhist : History
+        History of the scenario
+    """
+    max_mem, showprogress, pool, shared_mem, resident, schedule = unpack_mult_kwargs(kwargs)
+    staged = kwargs.get('staged',False)
+    scheduler = None
+    if pool and schedule:
+        scheduler = schedule if isinstance(schedule, ScenarioScheduler) else ScenarioScheduler()
+        scheduler.prepare(mdl, scenlist, staged=staged)
+    if pool and shared_mem:
+        res_iter = iter_scens_shared(mdl, scenlist, c_mdl, pool, ordered=ordered, chunksize=chunksize, resident=resident, scheduler=scheduler, **kwargs)
+    elif pool and resident:
+        spec = get_mdl_spec(mdl)
+        if staged:
+            snapshots = {t: c_mdl_t.snapshot() for t, c_mdl_t in c_mdl.items()}
+            inputs = ((spec, scen, kwargs, snapshots[scen.time], str(i)) for i, scen in enumerate(scenlist))
+        else:
+            inputs = ((spec, scen, kwargs, {}, str(i)) for i, scen in enumerate(scenlist))
+        res_iter = pool_imap(pool, exec_scen_resident, inputs, ordered=ordered, chunksize=chunksize, scheduler=scheduler)
+    elif pool:
         if staged:  
-            inputs = [(c_mdl[scen.time], scen, kwargs,  str(i)) for i, scen in enumerate(scenlist)]
+            inputs = ((c_mdl[scen.time], scen, kwargs,  str(i)) for i, scen in enumerate(scenlist))
         else:       
-            inputs = [(mdl, scen,  kwargs, str(i)) for i, scen in enumerate(scenlist)]
-        res_list = list(tqdm.tqdm(pool.imap(exec_scen_par, inputs), total=len(inputs), disable=not(showprogress), desc="SCENARIOS COMPLETE"))
-        results, mdlhists = unpack_res_list(scenlist, res_list)
+            inputs = ((mdl, scen,  kwargs, str(i)) for i, scen in enumerate(scenlist))
+        res_iter = pool_imap(pool, exec_scen_par, inputs, ordered=ordered, chunksize=chunksize, scheduler=scheduler)
     else:
-        for i, scen in enumerate(tqdm.tqdm(scenlist, disable=not(showprogress), desc="SCENARIOS COMPLETE")):
-            name = scen.name
-            if staged:  mdl_i = c_mdl[scen.time]
-            else:       mdl_i = mdl
-            ec, mh, t_end = exec_scen(mdl_i, scen, indiv_id=str(i), **kwargs)
-            results[name],mdlhists[name] = ec, mh
-    return results, mdlhists
+        res_iter = iter_scens_serial(mdl, scenlist, c_mdl, **kwargs)
+    for i, (result, mdlhist, t_end) in tqdm.tqdm(res_iter, total=len(scenlist), disable=not(showprogress), desc="SCENARIOS COMPLETE"):
+        if kwargs.get('delta_hist', False) and mdlhist:
+            mdlhist = compress_hist(mdlhist, **kwargs)
+        yield i, result, mdlhist
+
+def iter_scens_serial(mdl, scenlist, c_mdl, **kwargs):
+    """Generator which executes the scenarios in scenlist serially (see :func:`scenlist_iter`)"""
+    staged = kwargs.get('staged',False)
+    if staged and staged!='copy' and scenlist:
+        snapshots = {t: c_mdl_t.snapshot() for t, c_mdl_t in c_mdl.items()}
+        mdl_s = [*c_mdl.values()][0].copy()
+    for i, scen in enumerate(scenlist):
+        if staged=='copy':  
+            yield i, exec_scen(c_mdl[scen.time], scen, indiv_id=str(i), **kwargs)
+        elif staged:
+            yield i, exec_scen(mdl_s, scen, indiv_id=str(i), snapshot=snapshots[scen.time], **kwargs)
+        else:
+            yield i, exec_scen(mdl, scen, indiv_id=str(i), **kwargs)
+
+def pool_imap(pool, func, inputs, ordered=True, chunksize=1, scheduler=None):
+    """
+    Maps func over inputs (tuples with the indiv_id str(i) last) in the pool.
+
+    Parameters
+    ----------
+    pool : process pool
+        Pool to map in (multiprocessing or pathos, see :data:`mult_kwargs`)
+    func : callable
+        Helper function to map (e.g., :func:`exec_scen_par`)
+    inputs : iterable
+        Inputs to func
+    ordered : bool, optional
+        Whether to return the outputs in the order of inputs. The default is True.
+    chunksize : int, optional
+        Number of inputs to send to each worker at a time (multiprocessing only).
+        The default is 1.
+    scheduler : ScenarioScheduler, optional
+        Prepared scheduler to order and chunk the inputs with (in place of chunksize).
+        The default is None.
+
+    Returns
+    -------
+    res_iter : iterable
+        Iterable of (i, output of func)
+    """
+    if scheduler:
+        return scheduler.imap(pool, func, inputs, ordered=ordered)
+    inputs = ((func, inp) for inp in inputs)
+    if ordered and chunksize==1:
+        res_iter = pool.imap(exec_indexed, inputs)
+    elif ordered:
+        res_iter = pool.imap(exec_indexed, inputs, chunksize)
+    elif hasattr(pool, 'imap_unordered'):
+        res_iter = pool.imap_unordered(exec_indexed, inputs, chunksize)
+    else:
+        res_iter = pool.uimap(exec_indexed, inputs)
+    return res_iter
+
+def exec_indexed(arg):
+    """Helper function for executing arg[0] on arg[1] in a pool, returning the
+    index (from the indiv_id in arg[1]) so the output can be identified when unordered"""
+    return int(arg[1][-1]), arg[0](arg[1])
+
 def exec_scen_par(args):
     """Helper function for executing the scenario in parallel"""
     return exec_scen(args[0], args[1], **args[2], indiv_id=args[3])
-def exec_scen(mdl, scen, save_args={}, indiv_id='', **kwargs):
+
+def iter_scens_shared(mdl, scenlist, c_mdl, pool, ordered=True, chunksize=1, resident=False, scheduler=None, **kwargs):
+    """
+    Generator which executes a list of scenarios in a pool with the nominal history
+    and model(s) placed once in shared memory, so that only the scenario (and the
+    name of the shared memory block) is sent to the workers for each task. The
+    shared memory is released once the generator is exhausted (or closed).
+
+    Parameters
+    ----------
+    mdl : Model
+        Model to simulate
+    scenlist : list
+        List of scenarios to run
+    c_mdl : dict
+        Copies of the nominal model at each staged time (if staged)
+    pool : process pool
+        Pool to run the scenarios in (see :data:`mult_kwargs`)
+    ordered : bool, optional
+        Whether to yield the scenarios in the order of scenlist. The default is True.
+    chunksize : int, optional
+        Number of scenarios to send to each worker at a time. The default is 1.
+    resident : bool, optional
+        Whether to simulate in the models resident in the workers (see
+        :func:`init_resident`), in which case only the spec of the model (and the
+        snapshots of the staged models) are placed in shared memory. The default is False.
+    scheduler : ScenarioScheduler, optional
+        Prepared scheduler to order the scenarios with (see :func:`pool_imap`). The default is None.
+    **kwargs : kwargs
+        Simulation arguments (including nomhist) to pass to :func:`exec_scen`
+
+    Yields
+    ------
+    i : int
+        Index of the scenario in scenlist
+    res : tuple
+        (result, mdlhist, t_end) of the scenario
+    """
+    kwargs = {**kwargs}
+    nomhist = kwargs.pop('nomhist')
+    staged = kwargs.get('staged', False)
+    if resident:
+        payload = {'spec': get_mdl_spec(mdl)}
+        if staged:
+            payload['snapshots'] = {t: c_mdl_t.snapshot() for t, c_mdl_t in c_mdl.items()}
+    elif staged and staged!='copy' and scenlist:
+        payload = {'mdl': [*c_mdl.values()][0].copy(),
+                   'snapshots': {t: c_mdl_t.snapshot() for t, c_mdl_t in c_mdl.items()}}
+    elif staged:
+        payload = {'c_mdl': c_mdl}
+    else:
+        payload = {'mdl': mdl}
+    hist_shm, payload['hist_desc'] = nomhist.to_shared_memory()
+    payload['kwargs'] = kwargs
+    payload = dill.dumps(payload)
+    mdl_shm = shared_memory.SharedMemory(create=True, size=len(payload))
+    try:
+        mdl_shm.buf[:len(payload)] = payload
+        shared = (mdl_shm.name, len(payload), os.getpid())
+        inputs = ((shared, scen, str(i)) for i, scen in enumerate(scenlist))
+        yield from pool_imap(pool, exec_scen_shared, inputs, ordered=ordered, chunksize=chunksize, scheduler=scheduler)
+    finally:
+        release_shared()
+        for shm in (mdl_shm, hist_shm):
+            close_shared(shm)
+            shm.unlink()
+
+_shared_cache = threading.local()
+def attach_shared(shared):
+    """
+    Attaches to the model(s) and nominal history placed in shared memory by
+    :func:`iter_scens_shared`. The attached objects are cached in the process (or
+    thread), so they are only loaded once per worker (rather than once per scenario).
+
+    Parameters
+    ----------
+    shared : tuple
+        (payload shm name, payload size, pid of the creating process)
+
+    Returns
+    -------
+    payload : dict
+        Dict with the model(s), snapshots, and kwargs to simulate with
+    nomhist : History
+        Nominal history (with arrays backed by shared memory)
+    """
+    if getattr(_shared_cache, 'name', None) != shared[0]:
+        attach_new_shared(shared)
+    return _shared_cache.payload, _shared_cache.nomhist
+
+def attach_new_shared(shared):
+    """Attaches to the given shared memory blocks in place of the current ones
+    (see :func:`attach_shared`)"""
+    release_shared()
+    mdl_shm = shared_memory.SharedMemory(name=shared[0])
+    payload = dill.loads(bytes(mdl_shm.buf[:shared[1]]))
+    mdl_shm.close()
+    nomhist, hist_shm = History.from_shared_memory(payload.pop('hist_desc'))
+    if shared[2] != os.getpid():
+        # the blocks are unlinked by the creating process, not the worker
+        for shm in (mdl_shm, hist_shm):
+            resource_tracker.unregister(shm._name, 'shared_memory')
+    _shared_cache.__dict__.update(name=shared[0], payload=payload, nomhist=nomhist, shm=hist_shm)
+
+def release_shared():
+    """Releases the shared memory (if any) attached to by :func:`attach_shared`"""
+    hist_shm = getattr(_shared_cache, 'shm', False)
+    _shared_cache.__dict__.clear()
+    if hist_shm:
+        close_shared(hist_shm)
+
+def close_shared(shm):
+    """Closes the shared memory block shm (unless arrays from it are still in use,
+    e.g. when results are returned within the same process by a thread pool)"""
+    try:
+        shm.close()
+    except BufferError:
+        pass
+
+def exec_scen_shared(args):
+    """Helper function for executing the scenario in parallel from shared memory"""
+    shared, scen, indiv_id = args
+    payload, nomhist = attach_shared(shared)
+    if 'spec' in payload:
+        mdl, init_snap = get_resident(payload['spec'])
+        snapshot = payload['snapshots'][scen.time] if 'snapshots' in payload else init_snap
+        return exec_scen(mdl, scen, indiv_id=indiv_id, snapshot=snapshot, nomhist=nomhist, **payload['kwargs'])
+    elif 'snapshots' in payload:
+        return exec_scen(payload['mdl'], scen, indiv_id=indiv_id, snapshot=payload['snapshots'][scen.time],
+                         nomhist=nomhist, **payload['kwargs'])
+    elif 'c_mdl' in payload:
+        return exec_scen(payload['c_mdl'][scen.time], scen, indiv_id=indiv_id, nomhist=nomhist, **payload['kwargs'])
+    else:
+        return exec_scen(payload['mdl'], scen, indiv_id=indiv_id, nomhist=nomhist, **payload['kwargs'])
+
+def get_mdl_spec(mdl):
+    """
+    Gets a (small, picklable) specification of a model, from which the model can be
+    constructed and kept resident in the workers of a pool (see :func:`init_resident`).
+
+    Parameters
+    ----------
+    mdl : Model
+        Model to get the spec of
+
+    Returns
+    -------
+    spec : tuple
+        (key, mdlclass, mdlkwargs), where mdlkwargs are the p, sp, r, and track
+        arguments to instantiate mdlclass with and key identifies the model by its
+        class and arguments.
+    """
+    mdlkwargs = {'p': getattr(mdl, 'p', {}), 'sp': getattr(mdl, 'sp', {}),
+                 'r': {'seed': mdl.r.seed, 'stream': mdl.r.stream}, 'track': getattr(mdl, 'track', {})}
+    mdlclass = mdl.__class__
+    key = hashlib.sha1((mdlclass.__module__+'.'+mdlclass.__qualname__+repr(mdlkwargs)).encode()).hexdigest()
+    return key, mdlclass, mdlkwargs
+
+_resident_cache = threading.local()
+max_resident = 16
+"""Maximum number of models kept resident in each worker by :func:`get_resident`."""
+def init_resident(*mdls):
+    """
+    Initializer for a process (or thread) pool which constructs the given models once
+    in each worker and keeps them resident, so that scenarios may be run in the pool
+    with resident=True (see :data:`mult_kwargs`), e.g.:
+
+        pool = mp.Pool(4, initializer=init_resident, initargs=(get_mdl_spec(mdl),))
+
+    Parameters
+    ----------
+    *mdls : tuple/Model
+        Specs of the models (from :func:`get_mdl_spec`) or the models themselves.
+    """
+    for mdl in mdls:
+        if type(mdl)!=tuple:
+            mdl = get_mdl_spec(mdl)
+        get_resident(mdl)
+
+def get_resident(spec):
+    """
+    Gets the model with the given spec resident in the current worker, constructing
+    it from its class and parameters (and keeping it resident) if it is not already.
+
+    Parameters
+    ----------
+    spec : tuple
+        Spec of the model from :func:`get_mdl_spec`
+
+    Returns
+    -------
+    mdl : Model
+        Resident model (at its last simulated state)
+    init_snap : dict
+        Snapshot of the model in its initial state (from :meth:`Model.snapshot`),
+        which the model is restored to in place of re-instantiating it.
+    """
+    key, mdlclass, mdlkwargs = spec
+    mdls = _resident_cache.__dict__
+    if key not in mdls:
+        if len(mdls) >= max_resident:
+            mdls.pop(next(iter(mdls)))
+        mdl = mdlclass(**mdlkwargs)
+        mdls[key] = mdl, mdl.snapshot(with_hist=False)
+    return mdls[key]
+
+def exec_scen_resident(args):
+    """Helper function for executing the scenario in parallel in the model resident in
+    the worker, restored to the given snapshot (or its initial state if none is given)"""
+    spec, scen, kwargs, snapshot, indiv_id = args
+    mdl, init_snap = get_resident(spec)
+    return exec_scen(mdl, scen, indiv_id=indiv_id, snapshot=snapshot or init_snap, **kwargs)
+
+def exec_scen(mdl, scen, save_args={}, indiv_id='', snapshot={}, return_mdlhist=True, **kwargs):
     """ 
     Executes a scenario and generates results and classifications given a model and nominal model history
     
@@ -511,12 +1061,20 @@ def exec_scen(mdl, scen, save_args={}, indiv_id='', **kwargs):
         Save dictionary to use in save_helper defining when/how to save the dictionary
     indiv_id : str
         ID str to insert into the file name (if saving individually)
+    snapshot : dict
+        Snapshot of the nominal model (from :meth:`Model.snapshot`) to restore mdl
+        to in place (instead of copying mdl) in staged execution. Default is {}.
+    return_mdlhist : bool
+        Whether to return the model history (otherwise an empty History is returned,
+        e.g., when the history is saved to disk). Default is True.
     **kwargs : kwargs
         Additional keyword arguments, may include:
             - :data:`sim_kwargs` : kwargs
                 Simulation options for :func:`prop_one_scen
     """
-    if kwargs.get('staged',False): 
+    if snapshot:
+        mdl.restore(snapshot)
+    elif kwargs.get('staged',False): 
         if 'time' in mdl.h: 
             ctime= np.copy(mdl.h.time)
             mdl = mdl.copy()
@@ -527,6 +1085,8 @@ def exec_scen(mdl, scen, save_args={}, indiv_id='', **kwargs):
         mdl = mdl.new_with_params()
     result, mdlhist, _, t_end,  =prop_one_scen(mdl, scen, **kwargs)
     save_helper(save_args, result, mdlhist, indiv_id=indiv_id, result_id=str(scen.name))
+    if not return_mdlhist:
+        mdlhist = History()
     return result, mdlhist, t_end
 
 def check_hist_memory(mdlhist, nscens, max_mem=2e9):
@@ -592,10 +1152,10 @@ def nested_approach(mdl, nomapp, get_phases = False, **kwargs):
     save_args = kwargs.get('save_args', {})
     check_overwrite(save_args)
     save_app = save_args.pop("apps", False)
-    max_mem, showprogress, pool = unpack_mult_kwargs(kwargs)
+    max_mem, showprogress, pool, shared_mem, resident, schedule = unpack_mult_kwargs(kwargs)
     sim_kwarg = pack_sim_kwargs(**kwargs)
     run_kwargs_nest = pack_run_kwargs(**kwargs)
-    app_args = {k:v for k,v in kwargs.items() if k not in [*sim_kwarg,*run_kwargs_nest, 'max_mem', 'showprogress', 'pool']}
+    app_args = {k:v for k,v in kwargs.items() if k not in [*sim_kwarg,*run_kwargs_nest, *mult_kwargs]}
     
     nest_mdlhists = History.fromkeys(nomapp.scenarios)
     nest_results = Result.fromkeys(nomapp.scenarios)
@@ -609,7 +1169,7 @@ def nested_approach(mdl, nomapp, get_phases = False, **kwargs):
         apps[scenname]=app
         check_hist_memory(nomhist,len(app.scenlist)*nomapp.num_scenarios, max_mem=max_mem)
         
-        nest_results[scenname], nest_mdlhists[scenname] = approach(mdl, app, pool=pool, showprogress=False, **{**sim_kwarg, 'p':scen.p, 'r':scen.r})
+        nest_results[scenname], nest_mdlhists[scenname] = approach(mdl, app, pool=pool, shared_mem=shared_mem, resident=resident, schedule=schedule, showprogress=False, **{**sim_kwarg, 'p':scen.p, 'r':scen.r})
         save_helper(save_args, nest_results[scenname], nest_mdlhists[scenname], indiv_id=scenname, result_id=scenname)
     save_helper(save_args, nest_results, nest_mdlhists)
     if save_app:
@@ -617,6 +1177,51 @@ def nested_approach(mdl, nomapp, get_phases = False, **kwargs):
             dill.dump(apps, file_handle)
     return nest_results.flatten(), nest_mdlhists.flatten(), apps
 
+def nested_approach_iter(mdl, nomapp, get_phases = False, **kwargs):
+    """
+    Streaming version of :func:`nested_approach`, which yields the results of each
+    scenario as it is completed (see :func:`approach_iter` for additional arguments).
+
+    Parameters
+    ----------
+    mdl : Model
+        Model Object to use in the simulation.
+    nomapp : NominalApproach
+        NominalApproach defining the nominal situations the model will be run over
+    get_phases : Bool/List/Dict, optional
+        Whether and how to use nominal simulation phases to set up the SampleApproach.
+        The default is False. See :func:`nested_approach`.
+    **kwargs : kwargs
+        Additional keyword arguments (see :func:`nested_approach` and :func:`approach_iter`)
+
+    Yields
+    ------
+    scenname : str
+        Name of the scenario, with structure 'nomscen.scen'
+    result : Result
+        Result of the scenario
+    mdlhist : History
+        History of the scenario
+    """
+    save_args = kwargs.get('save_args', {})
+    check_stream_save_args(save_args)
+    check_overwrite(save_args)
+    stream_kwargs = {k:kwargs.pop(k) for k in ['ordered', 'chunksize', 'return_mdlhist'] if k in kwargs}
+    max_mem, showprogress, pool, shared_mem, resident, schedule = unpack_mult_kwargs(kwargs)
+    sim_kwarg = pack_sim_kwargs(**kwargs)
+    run_kwargs_nest = pack_run_kwargs(**kwargs)
+    app_args = {k:v for k,v in kwargs.items() if k not in [*sim_kwarg,*run_kwargs_nest, *mult_kwargs]}
+    for nomscenname, scen in tqdm.tqdm(nomapp.scenarios.items(), disable=not(showprogress), desc="NESTED SCENARIOS COMPLETE"):
+        mdl = mdl.new_with_params(p=scen.p, sp=scen.sp, r=scen.r)
+        _, nomhist, _, t_end,  = prop_one_scen(mdl, scen, **{**sim_kwarg, 'staged':False})
+        if get_phases:
+            app_args.update({'phases':phases_from_hist(get_phases, t_end, nomhist)})
+        app = SampleApproach(mdl,**app_args)
+        nest_save_args = {k: ({**v, 'filename':create_indiv_filename(v['filename'], nomscenname, splitchar="/")} if k!='indiv' else v) for k,v in save_args.items()}
+        for scenname, result, mdlhist in approach_iter(mdl, app, pool=pool, shared_mem=shared_mem, resident=resident, schedule=schedule, showprogress=False, save_args=nest_save_args,
+                                                       **{**sim_kwarg, 'p':scen.p, 'r':scen.r}, **stream_kwargs):
+            yield nomscenname+'.'+scenname, result, mdlhist
+
 def phases_from_hist(get_phases, t_end, nomhist):
     if get_phases=='global':      phases={'global':[0,t_end]}
     else:
@@ -712,7 +1317,250 @@ def check_end_condition(mdl, use_end_condition, t):
     else:                    return False
     
 
-def prop_one_scen(mdl, scen, ctimes=[], nomhist={}, nomresult={}, cut_hist=True, **kwargs):
+def get_t_ind_rec(t, t_ind, shift, track_times):
+    """Gets the index of the history to record the simulation time t (at index t_ind) in"""
+    if track_times=='all':           return t_ind+shift
+    elif track_times[0]=='interval': return t_ind//track_times[1]+shift
+    elif track_times[0]=='times':    return track_times[1].index(t)
+    else: raise Exception("Invalid argument, track_times="+str(track_times))
+def get_last_event(mdl, scen, ctimes=[], desired_result={}, phases=True):
+    """
+    Gets the last time in a scenario where the model may change independently of
+    its current state (fault/disturbance injections, phase starts, copy times, and 
+    time-based desired results), after which the simulation may stop if converged.
+
+    Parameters
+    ----------
+    mdl : Model
+        Model being simulated
+    scen : Scenario
+        Scenario being simulated
+    ctimes : list, optional
+        Times to copy the model at. The default is [].
+    desired_result : dict/str/list, optional
+        Desired result (see :data:`sim_kwargs`). The default is {}.
+    phases : bool, optional
+        Whether to include the phase start times as events. The default is True.
+
+    Returns
+    -------
+    last_event : float
+        Time of the last event (np.inf if the simulation should not stop early)
+    """
+    events = [*scen['sequence'], *ctimes]
+    if phases:
+        events.extend([phase[1] for phase in mdl.sp.phases])
+    if type(desired_result)==dict:
+        if 'all' in desired_result: return np.inf
+        events.extend([t for t in desired_result if is_numeric(t)])
+    return max(events, default=-np.inf)
+immutable_types = (float, int, str, bool, np.generic, type(None), frozenset)
+def copy_mutables(mutables):
+    """Copies (nested tuples/lists/dicts of) mutables, so they can be compared with later mutables"""
+    if isinstance(mutables, immutable_types):
+        return mutables
+    elif type(mutables) in (tuple, list):
+        if all(isinstance(m, immutable_types) for m in mutables):
+            return tuple(mutables)
+        return tuple(copy_mutables(m) for m in mutables)
+    elif isinstance(mutables, np.ndarray):
+        return mutables.copy()
+    elif isinstance(mutables, set):
+        return frozenset(mutables)
+    elif isinstance(mutables, dict):
+        return {k: copy_mutables(m) for k, m in mutables.items()}
+    else:
+        return copy.deepcopy(mutables)
+def same_mutables(mutables, prev_mutables):
+    """Checks whether (nested tuples/lists/dicts of) mutables are the same, comparing arrays by value"""
+    if isinstance(mutables, np.ndarray) or isinstance(prev_mutables, np.ndarray):
+        return np.array_equal(mutables, prev_mutables)
+    elif isinstance(mutables, (tuple, list)) and isinstance(prev_mutables, (tuple, list)):
+        return len(mutables)==len(prev_mutables) and all(same_mutables(m, p) for m, p in zip(mutables, prev_mutables))
+    elif isinstance(mutables, dict) and isinstance(prev_mutables, dict):
+        return mutables.keys()==prev_mutables.keys() and all(same_mutables(m, prev_mutables[k]) for k, m in mutables.items())
+    else: 
+        return mutables==prev_mutables
+def fill_converged(mdl, mdlhist, t, t_ind, timerange, shift, track_times, use_end_condition, end_ind=None):
+    """
+    Fills the history of a converged model over the rest of the simulation times
+    (up to the time the end condition is met, if any) without simulating them.
+
+    Parameters
+    ----------
+    mdl : Model
+        Model that has converged
+    mdlhist : History
+        History of the model
+    t : float
+        Time the model converged at
+    t_ind : int
+        Index of t in timerange
+    timerange : array
+        Times the model is simulated over
+    shift : int
+        Time index to shift the history by (from :func:`init_histrange`)
+    track_times : str/tuple
+        Times to track (see :data:`sim_kwargs`)
+    use_end_condition : bool
+        Whether to use the end condition of the model
+    end_ind : int, optional
+        Index in timerange to fill the history up to (not including), e.g., the next
+        event when skipping quiescent time-steps. The default is None, which fills
+        to the final time of the simulation.
+
+    Returns
+    -------
+    t_ind : int
+        Index in timerange of the last filled time
+    ended : bool
+        Whether the end condition was met at this time
+    """
+    rest = timerange[t_ind+1:end_ind]
+    ended = False
+    for i, t_rest in enumerate(rest):
+        if check_end_condition(mdl, use_end_condition, t_rest): 
+            rest = rest[:i+1]
+            ended = True
+            break
+    if track_times and len(rest):
+        start_ind = get_t_ind_rec(t, t_ind, shift, track_times)
+        rec_times = {start_ind: t}
+        for i, t_rest in enumerate(rest):
+            if track_times[0]!='times' or t_rest in track_times[1]:
+                rec_times[get_t_ind_rec(t_rest, t_ind+1+i, shift, track_times)] = t_rest
+        mdlhist.fill(start_ind, [*rec_times.values()], obj=mdl)
+    return t_ind+len(rest), ended
+def get_event_ticks(mdl, scen, ctimes=[], desired_result={}):
+    """
+    Gets the (sorted) integer ticks of the times in a scenario where the model may
+    change independently of its current state (fault/disturbance injections, phase
+    starts, copy times, and time-based desired results), which are simulated in
+    event-driven simulation (see event_driven in :data:`sim_kwargs`).
+
+    Parameters
+    ----------
+    mdl : Model
+        Model being simulated
+    scen : Scenario
+        Scenario being simulated
+    ctimes : list, optional
+        Times to copy the model at. The default is [].
+    desired_result : dict/str/list, optional
+        Desired result (see :data:`sim_kwargs`). The default is {}.
+
+    Returns
+    -------
+    event_ticks : list
+        Sorted ticks of the events
+    """
+    events = [*scen['sequence'], *ctimes, *[phase[1] for phase in mdl.sp.phases]]
+    if type(desired_result)==dict:
+        events.extend([t for t in desired_result if is_numeric(t)])
+    return sorted(get_tick_map(mdl, events))
+def get_next_event_ind(mdl, t, t_ind, ticks, event_ticks):
+    """
+    Gets the index of the next time-step to simulate after a quiescent time-step
+    at time t (the next event in event_ticks or wake-up time declared by the model,
+    see :meth:`Model.next_event`).
+
+    Parameters
+    ----------
+    mdl : Model
+        Model being simulated
+    t : float
+        Current time
+    t_ind : int
+        Index of t in the timerange
+    ticks : list
+        Ticks of each time in the timerange
+    event_ticks : list
+        Sorted ticks of the events in the scenario (from :func:`get_event_ticks`)
+
+    Returns
+    -------
+    next_ind : int
+        Index in the timerange of the next time-step to simulate (len(ticks) if none)
+    """
+    i = bisect.bisect_right(event_ticks, ticks[t_ind])
+    next_tick = event_ticks[i] if i<len(event_ticks) else np.inf
+    wake_time = mdl.next_event(t)
+    if wake_time < np.inf:
+        next_tick = min(next_tick, math.ceil(wake_time/mdl.tick_unit-1e-9))
+    return bisect.bisect_left(ticks, next_tick, lo=t_ind+1)
+def init_nomtraj(splice_nominal=False, run_stochastic=False, **kwargs):
+    """
+    Initializes the nominal trajectory to record in the nominal scenario if 
+    splice_nominal=True (see :data:`sim_kwargs`).
+
+    Returns
+    -------
+    nomtraj : dict
+        Empty nominal trajectory with structure {'mutables':{t:mutables}, 'snapshots':{t:snapshot}}
+        (or {} if not splicing), where the snapshots are taken at the end of the 
+        simulation and whenever the end condition of the model becomes true.
+    """
+    if splice_nominal and not run_stochastic:
+        return {'mutables':{}, 'snapshots':{}}
+    else:
+        return {}
+def record_nomtraj(mdl, nomtraj, t, prev_end):
+    """Records the mutables of the nominal model at time t (and a snapshot if the 
+    end condition has become true) in the nominal trajectory. Returns whether the
+    end condition is true."""
+    nomtraj['mutables'][t] = copy_mutables(mdl.return_mutables())
+    end = check_end_condition(mdl, True, t)
+    if end and not prev_end:
+        nomtraj['snapshots'][t] = mdl.snapshot(with_hist=False)
+    return end
+def splice_nomtraj(mdl, mdlhist, nomhist, nomtraj, t, t_ind, timerange, shift, track_times, use_end_condition):
+    """
+    Splices the rest of the nominal history into the history of a fault scenario 
+    which has rejoined the nominal trajectory at time t and restores the model to
+    the nominal state at the end of the simulation (or when the end condition first
+    becomes true, if used).
+
+    Parameters
+    ----------
+    mdl : Model
+        Model that has rejoined the nominal trajectory
+    mdlhist : History
+        History of the model
+    nomhist : History
+        Nominal history of the model (over the full simulation)
+    nomtraj : dict
+        Nominal trajectory (see :func:`init_nomtraj`)
+    t : float
+        Time the model rejoined the nominal trajectory at
+    t_ind : int
+        Index of t in timerange
+    timerange : array
+        Times the model is simulated over
+    shift : int
+        Time index to shift the history by (from :func:`init_histrange`)
+    track_times : str/tuple
+        Times to track (see :data:`sim_kwargs`)
+    use_end_condition : bool
+        Whether to use the end condition of the model
+
+    Returns
+    -------
+    t_ind : int
+        Index in timerange of the final time of the simulation
+    """
+    if use_end_condition:   t_stop = min([t_snap for t_snap in nomtraj['snapshots'] if t_snap>t])
+    else:                   t_stop = nomtraj['t_end']
+    rest = timerange[t_ind+1:]
+    rest = rest[rest<=t_stop]
+    if track_times:
+        start_ind = get_t_ind_rec(t, t_ind, shift, track_times)
+        end_ind = max([start_ind, *[get_t_ind_rec(t_rest, t_ind+1+i, shift, track_times) for i, t_rest in enumerate(rest)
+                                    if track_times[0]!='times' or t_rest in track_times[1]]])
+        mdlhist.splice(nomhist, start_ind, end_ind)
+    mdl.restore(nomtraj['snapshots'][t_stop])
+    mdl.h = mdlhist
+    return t_ind+len(rest)
+def prop_one_scen(mdl, scen, ctimes=[], nomhist={}, nomresult={}, cut_hist=True, nomtraj={}, **kwargs):
     """
     Runs a fault scenario in the model over time
 
@@ -733,6 +1581,11 @@ def prop_one_scen(mdl, scen, ctimes=[], nomhist={}, nomresult={}, cut_hist=True,
         Nominal result dictionary (to compare with current if desired)
     cut_hist : bool
         Whether to cut the model history to a given size. The default is True
+    nomtraj : dict
+        Nominal trajectory from :func:`init_nomtraj` (if splice_nominal=True), which
+        is recorded in the nominal scenario (when no nomhist is given) and used to 
+        splice the nominal history into fault scenarios which rejoin it.
+        The default is {}.
     **kwargs : kwargs
         simulation options, see :data:`sim_kwargs` 
     Returns
@@ -746,51 +1599,162 @@ def prop_one_scen(mdl, scen, ctimes=[], nomhist={}, nomresult={}, cut_hist=True,
     t_end: float
         Last sim time 
     """
-    desired_result, track, track_times, staged, run_stochastic, use_end_condition = unpack_sim_kwargs(**kwargs)
+    desired_result, track, track_times, staged, run_stochastic, use_end_condition, converge_steps, splice_nominal, profile, event_driven, sparse_hist, compact_hist, delta_hist = unpack_sim_kwargs(**kwargs)
     #if staged, we want it to start a new run from the starting time of the scenario,
     # using a copy of the input model (which is the nominal run) at this time
     mdlhist, histrange, timerange, shift = init_histrange(mdl, scen.time, staged, track, track_times)
+    record_traj = bool(splice_nominal and nomtraj and not nomhist)
+    splice = bool(splice_nominal and nomtraj and nomhist)
+    if record_traj or run_stochastic:
+        converge_steps = 0
+    if record_traj:
+        prev_end = False
+    if splice:
+        splice_after = get_last_event(mdl, scen, ctimes, desired_result, phases=False)
+    if converge_steps: 
+        last_event = get_last_event(mdl, scen, ctimes, desired_result)
+        prev_mutables, steps_unchanged = None, 0
+        converge_steps = max([converge_steps, *mdl.tick_calendar.values()])
+    profile = Profile() if profile else None
+    # map the copy/injection/result times to integer ticks so they can be compared exactly
+    ticks = np.rint(timerange/mdl.tick_unit).astype(int).tolist()
+    c_ticks = get_tick_map(mdl, ctimes)
+    seq_ticks = get_tick_map(mdl, scen['sequence'])
+    if type(desired_result)==dict:
+        res_ticks = get_tick_map(mdl, [k for k in desired_result if type(k)!=str])
+        if 'all' in desired_result: event_driven = False
+    if run_stochastic: event_driven = False
+    if event_driven:
+        event_ticks = get_event_ticks(mdl, scen, ctimes, desired_result)
+        prev_mutables_ev, skip_to = None, 0
     # run model through the time range defined in the object
     c_mdl=dict.fromkeys(ctimes); result=Result()
     for t_ind, t in enumerate(timerange):
+       if event_driven and t_ind < skip_to: continue
        # inject fault when it occurs, track defined flow states and graph
        try:
-           if t in ctimes: 
-               c_mdl[t]=mdl.copy()
-               if 'time' in mdl.h: c_mdl[t].h['time'] = np.copy(mdl.h.time)
-           if t in scen['sequence']: 
-               fxnfaults = scen['sequence'][t].get('faults',{})
-               disturbances = scen['sequence'][t].get('disturbances', {})
+           tick = ticks[t_ind]
+           if tick in c_ticks: 
+               ctime = c_ticks[tick]
+               c_mdl[ctime]=mdl.copy()
+               if 'time' in mdl.h: c_mdl[ctime].h['time'] = np.copy(mdl.h.time)
+           if tick in seq_ticks: 
+               injection = scen['sequence'][seq_ticks[tick]]
+               fxnfaults = injection.get('faults',{})
+               disturbances = injection.get('disturbances', {})
            else: fxnfaults, disturbances = {}, {}
            try:
-               mdl.propagate(t, fxnfaults, disturbances, run_stochastic=run_stochastic)
+               mdl.propagate(t, fxnfaults, disturbances, run_stochastic=run_stochastic, profile=profile, tick=tick)
            except Exception as e:
                raise Exception("Error in scenario "+str(scen)) from e
            if track_times:
-               if track_times=='all':           t_ind_rec = t_ind+shift
-               elif track_times[0]=='interval': t_ind_rec = t_ind//track_times[1]+shift
-               elif track_times[0]=='times':    t_ind_rec = track_times[1].index(t)
-               else: raise Exception("Invalid argument, track_times="+str(track_times))
-               mdlhist.log(mdl, t_ind_rec, time=t)
+               t_ind_rec = get_t_ind_rec(t, t_ind, shift, track_times)
+               timed_call(profile, 'time.log', mdlhist.log, mdl, t_ind_rec, time=t)
            if type(desired_result)==dict: 
                if "all" in desired_result: 
                    result[t] = get_result(scen,mdl,desired_result['all'], mdlhist,nomhist, nomresult)
-               if t in desired_result:
-                   result[t] = get_result(scen,mdl,desired_result[t], mdlhist,nomhist, nomresult.get(t))
+               if tick in res_ticks:
+                   t_res = res_ticks[tick]
+                   result[t_res] = get_result(scen,mdl,desired_result[t_res], mdlhist,nomhist, nomresult.get(t_res))
                    #desired_result.pop(t)
            if check_end_condition(mdl, use_end_condition, t): break
+           if record_traj:
+               prev_end = record_nomtraj(mdl, nomtraj, t, prev_end)
+           elif splice and t>=splice_after and t<nomtraj['t_end'] and same_mutables(mdl.return_mutables(), nomtraj['mutables'].get(t)):
+               t_ind = splice_nomtraj(mdl, mdlhist, nomhist, nomtraj, t, t_ind, timerange, shift, track_times, use_end_condition)
+               break
+           if converge_steps:
+               mutables = copy_mutables(mdl.return_mutables())
+               if prev_mutables is not None and same_mutables(mutables, prev_mutables):
+                   steps_unchanged+=1
+               else: steps_unchanged = 0
+               prev_mutables = mutables
+               if (steps_unchanged>=converge_steps and t>=last_event 
+                   and mdl.next_event(t, calendar=False)>timerange[-1]):
+                   t_ind, _ = fill_converged(mdl, mdlhist, t, t_ind, timerange, shift, track_times, use_end_condition)
+                   break
+           if event_driven:
+               mutables = copy_mutables(mdl.return_mutables())
+               if prev_mutables_ev is not None and same_mutables(mutables, prev_mutables_ev):
+                   skip_to = get_next_event_ind(mdl, t, t_ind, ticks, event_ticks)
+                   if skip_to > t_ind+1:
+                       t_ind, ended = fill_converged(mdl, mdlhist, t, t_ind, timerange, shift, track_times, use_end_condition, end_ind=skip_to)
+                       t = timerange[t_ind]
+                       if ended: break
+               prev_mutables_ev = mutables
        except:
             print("Error at t="+str(t)+' in scenario '+str(scen))
             raise
             break
+    if record_traj:
+        nomtraj['snapshots'][t] = mdl.snapshot(with_hist=False)
+        nomtraj['t_end'] = t
     if cut_hist: mdlhist.cut(t_ind+shift)
     if type(desired_result)==dict and 'end' in desired_result: 
         result['end'] = get_result(scen,mdl,desired_result['end'],mdlhist,nomhist, nomresult)
     else:                       
         result.update(get_result(scen,mdl,desired_result,mdlhist,nomhist, nomresult))
+    if profile is not None:
+        result['profile'] = profile
+    if not (delta_hist and nomhist):
+        # otherwise compressed by the caller after taking the differences from the nominal
+        mdlhist = compress_hist(mdlhist, compact_hist=compact_hist, sparse_hist=sparse_hist)
     #if len(result)==1: result = [*result.values()][0]
     if None in c_mdl.values(): raise Exception("Approach times"+str(ctimes)+" go beyond simulation time "+str(t))
     return  result, mdlhist, c_mdl, t_ind+shift
+def compress_hist(mdlhist, compact_hist=False, sparse_hist=False, delta_hist=False, nomhist={}, **kwargs):
+    """
+    Converts a scenario history to the delta, compact and/or sparse forms given by
+    the delta_hist, compact_hist and sparse_hist :data:`sim_kwargs`.
+
+    Parameters
+    ----------
+    mdlhist : History
+        History of the scenario
+    delta_hist : bool, optional
+        Whether to use :meth:`History.to_delta` (if nomhist is given). The default is False.
+    nomhist : History, optional
+        Nominal history to take the differences from. The default is {}.
+    compact_hist : bool/dict, optional
+        Whether to use :meth:`History.to_compact` (with a given policy, if a dict). 
+        The default is False.
+    sparse_hist : bool, optional
+        Whether to use :meth:`History.to_sparse`. The default is False.
+
+    Returns
+    -------
+    mdlhist : History
+        Compressed history (or mdlhist, if neither option is used)
+    """
+    if delta_hist and nomhist:
+        mdlhist = mdlhist.to_delta(nomhist)
+    if type(compact_hist)==dict:
+        mdlhist = mdlhist.to_compact(policy=compact_hist)
+    elif compact_hist:
+        mdlhist = mdlhist.to_compact()
+    if sparse_hist:
+        mdlhist = mdlhist.to_sparse()
+    return mdlhist
+def get_tick_map(mdl, times):
+    """
+    Maps the integer tick of each of the given times to the time (for times which 
+    are multiples of the model's tick unit, see :meth:`fmdtools.define.model.Model.compile_calendar`).
+
+    Parameters
+    ----------
+    mdl : Model
+        Model being simulated
+    times : iterable
+        Times (e.g., copy times or the keys of a scenario sequence)
+
+    Returns
+    -------
+    tick_map : dict
+        Map of ticks to times {tick: time}
+    """
+    tick_map = {mdl.get_tick(t):t for t in times}
+    tick_map.pop(None, None)
+    return tick_map
 def get_result(scen, mdl, desired_result, mdlhist={}, nomhist={}, nomresult={}):
     desired_result = copy.deepcopy(desired_result)
     if type(desired_result)==str:               desired_result = {desired_result:None}
@@ -801,7 +1765,9 @@ def get_result(scen, mdl, desired_result, mdlhist={}, nomhist={}, nomresult={}):
     result=Result()
     if not nomhist: nomhist=mdlhist
     elif len(nomhist['time'])!=len(mdlhist['time']):
-        nomhist = nomhist.cut(start_ind=len(nomhist['time'])-len(mdlhist['time']), newcopy=True)
+        # aligned views of the nominal history (rather than a copy for each scenario)
+        start_ind = len(nomhist['time'])-len(mdlhist['time'])
+        nomhist = History({k: v[start_ind:] for k, v in nomhist.flatten().items()})
     if 'endclass' in desired_result:   
         mdlhists = History()
         mdlhists['faulty'] =mdlhist
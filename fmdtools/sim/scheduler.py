@@ -0,0 +1,215 @@
+# -*- coding: utf-8 -*-
+"""
+Description: A module for scheduling the scenarios simulated in a parallel pool.
+
+- :class:`ScenarioScheduler`: Class for scheduling scenarios in a pool longest-first by their estimated cost.
+- :func:`exec_chunk`: Helper function for executing a chunk of scenarios in a pool worker.
+
+When scenarios are simulated in a pool in list order, scenarios which take much
+longer than others (e.g., scenarios injected early in the timeline in staged
+execution, or scenarios which do not hit the end condition) may be handed out
+last, leaving the other workers idle. The ScenarioScheduler instead sends the
+longest scenarios first, in chunks of decreasing cost, which the workers pull
+as they finish (so that the load is balanced dynamically).
+"""
+#File name: scheduler.py
+#Author: Daniel Hulse
+#Created: October 2023
+
+import os
+import time
+import threading
+import multiprocessing as mp
+import numpy as np
+
+
+class ScenarioScheduler(object):
+    """
+    Schedules the scenarios simulated in a pool longest-first by their estimated
+    cost and records the measured cost of each scenario and the utilization of
+    each worker.
+
+    The cost of a scenario is its execution time when it was previously run with
+    the scheduler (or given in cost_hist). Otherwise, it is estimated from the
+    number of time-steps it simulates (from the injection time to the end of the
+    simulation in staged execution), scaled by the execution time per time-step
+    of the previously-run scenarios.
+
+    Scenarios are sent to the pool in chunks, where each chunk has a cost of at
+    least the remaining cost divided by (chunk_div x the number of workers), so
+    that long scenarios are sent individually and short scenarios are grouped
+    together at the end of the run.
+
+    Attributes
+    ----------
+    cost_hist : dict
+        Measured execution time (s) of each scenario with structure {scenname: time}.
+        Updated after each run, so the scheduler can be reused to schedule future runs.
+    chunk_div : int
+        Number of chunks to divide the remaining cost into per worker.
+    names : list
+        Names of the scenarios in the current run
+    costs : array
+        Estimated cost of each scenario in the current run
+    busy : dict
+        Time spent executing scenarios by each worker in the last run {worker: time}
+    makespan : float
+        Wall-clock time (s) of the last run
+    """
+    def __init__(self, cost_hist={}, chunk_div=2):
+        """
+        Instantiates the ScenarioScheduler.
+
+        Parameters
+        ----------
+        cost_hist : dict, optional
+            Execution time (s) of scenarios from prior runs {scenname: time}. The default is {}.
+        chunk_div : int, optional
+            Number of chunks to divide the remaining cost into per worker. The default is 2.
+        """
+        self.cost_hist = {**cost_hist}
+        self.chunk_div = chunk_div
+        self.names = []
+        self.costs = np.array([])
+        self.busy = {}
+        self.makespan = 0.0
+    def prepare(self, mdl, scenlist, staged=False):
+        """
+        Estimates the cost of each scenario in scenlist for the next run.
+
+        Parameters
+        ----------
+        mdl : Model
+            Model to simulate
+        scenlist : list
+            List of scenarios to simulate
+        staged : bool, optional
+            Whether the scenarios are simulated from the injection time (staged
+            execution) or the start of the simulation. The default is False.
+        """
+        self.names = [scen.name for scen in scenlist]
+        steps = np.array([self.estimate_steps(mdl, scen, staged) for scen in scenlist])
+        measured = np.array([name in self.cost_hist for name in self.names], dtype=bool)
+        if measured.any():
+            rate = sum([self.cost_hist[name] for name in self.names if name in self.cost_hist])/np.sum(steps[measured])
+        else:
+            rate = 1.0
+        self.costs = np.array([self.cost_hist.get(name, step*rate) for name, step in zip(self.names, steps)])
+    def estimate_steps(self, mdl, scen, staged=False):
+        """Estimates the number of time-steps simulated in a given scenario"""
+        start = getattr(scen, 'time', mdl.sp.times[0]) if staged else mdl.sp.times[0]
+        return (mdl.sp.times[-1] - start)/mdl.sp.dt + 1
+    def get_chunks(self, n_workers):
+        """
+        Divides the scenarios into chunks, in order of decreasing cost.
+
+        Parameters
+        ----------
+        n_workers : int
+            Number of workers in the pool
+
+        Returns
+        -------
+        chunks : list
+            List of lists of the indices of the scenarios in each chunk.
+        """
+        chunks = []
+        chunk, chunk_cost = [], 0.0
+        remaining = np.sum(self.costs)
+        for i in np.argsort(-self.costs, kind='stable'):
+            chunk.append(int(i))
+            chunk_cost += self.costs[i]
+            if chunk_cost >= remaining/(self.chunk_div*n_workers):
+                chunks.append(chunk)
+                remaining -= chunk_cost
+                chunk, chunk_cost = [], 0.0
+        if chunk:
+            chunks.append(chunk)
+        return chunks
+    def imap(self, pool, func, inputs, ordered=True):
+        """
+        Maps func over inputs (tuples with the indiv_id str(i) last, as in
+        :func:`fmdtools.sim.propagate.pool_imap`) in the pool in the order given
+        by the estimated costs, recording the execution time of each scenario.
+
+        Parameters
+        ----------
+        pool : process pool
+            Pool to map in (multiprocessing or pathos)
+        func : callable
+            Helper function to map (e.g., :func:`fmdtools.sim.propagate.exec_scen_par`)
+        inputs : iterable
+            Inputs to func (one for each scenario given to :meth:`ScenarioScheduler.prepare`)
+        ordered : bool, optional
+            Whether to yield the outputs in the order of inputs. The default is True.
+
+        Yields
+        ------
+        i : int
+            Index of the scenario
+        output : Any
+            Output of func
+        """
+        inputs = [*inputs]
+        if len(inputs) != len(self.names):
+            raise Exception("Scheduler prepared for "+str(len(self.names))+" scenarios, given "+str(len(inputs)))
+        args = ((func, [inputs[i] for i in chunk]) for chunk in self.get_chunks(get_pool_size(pool)))
+        if hasattr(pool, 'imap_unordered'):
+            res_iter = pool.imap_unordered(exec_chunk, args)
+        else:
+            res_iter = pool.uimap(exec_chunk, args)
+        self.busy = {}
+        starttime = time.time()
+        buffer = {}
+        next_i = 0
+        for worker, outputs in res_iter:
+            for i, output, exec_time in outputs:
+                self.cost_hist[self.names[i]] = exec_time
+                self.busy[worker] = self.busy.get(worker, 0.0) + exec_time
+                if ordered:
+                    buffer[i] = output
+                else:
+                    yield i, output
+            while next_i in buffer:
+                yield next_i, buffer.pop(next_i)
+                next_i += 1
+        self.makespan = time.time() - starttime
+    def get_utilization(self):
+        """
+        Gets the utilization of each worker in the last run.
+
+        Returns
+        -------
+        utilization : dict
+            Fraction of the makespan each worker spent executing scenarios {worker: fraction}
+        """
+        if not self.makespan:
+            return {}
+        return {worker: busy/self.makespan for worker, busy in self.busy.items()}
+
+def get_pool_size(pool):
+    """Gets the number of workers in a (multiprocessing or pathos) pool"""
+    return getattr(pool, '_processes', False) or getattr(pool, 'ncpus', False) or os.cpu_count()
+
+def exec_chunk(arg):
+    """
+    Helper function for executing arg[0] on each input in the chunk arg[1] in a pool
+    worker.
+
+    Returns
+    -------
+    worker : str
+        Name of the worker process (or thread, in a thread pool)
+    outputs : list
+        List of (index, output, execution time) for each input in the chunk
+    """
+    func, chunk = arg
+    outputs = []
+    for inp in chunk:
+        starttime = time.perf_counter()
+        output = func(inp)
+        outputs.append((int(inp[-1]), output, time.perf_counter()-starttime))
+    worker = mp.current_process().name
+    if worker == 'MainProcess':
+        worker = threading.current_thread().name
+    return worker, outputs
@@ -417,7 +417,20 @@ class ProblemInterface:
                                    time=var_time)
             new_scenlist.append(newscen)
         scenlist = new_scenlist
-        if pool: 
+        if pool and kwargs.get('resident', False):
+            # send the specs of the models (kept resident in each worker) rather than the models
+            if staged:
+                inputs = []
+                for i, scen in enumerate(scenlist):
+                    mdl_i = self._check_new_mdl(simname, var_time, c_mdls[scen.name][var_time], x, obj_time)
+                    inputs.append((prop.get_mdl_spec(mdl_i), scen, {**kwargs, 'nomhist':prevhists[scen.name]},
+                                   mdl_i.snapshot(), str(i)))
+            else:
+                spec = prop.get_mdl_spec(mdl)
+                inputs = [(spec, scen, kwargs, {}, str(i)) for i, scen in enumerate(scenlist)]
+            res_list = list(pool.imap(prop.exec_scen_resident, inputs))
+            results, mh = prop.unpack_res_list(scenlist, res_list)
+        elif pool: 
             if staged:  
                 inputs = [(self._check_new_mdl(simname, var_time, c_mdls[scen.name][var_time], x, obj_time), scen, 
                            {**kwargs, 'nomhist':prevhists[scen.name]},  str(i)) 
@@ -910,7 +923,9 @@ class DynamicInterface():
         
         returns = {}
         for result in self.desired_result:      returns[result] = self.mdl.get_vars(result)
-        if self.run_stochastic=="track_pdf":    returns['pdf'] = self.mdl.return_probdens()
+        if self.run_stochastic=="track_pdf":    
+            returns['logpdf'] = self.mdl.return_logprobdens()
+            returns['pdf'] = np.exp(returns['logpdf'])
 
         self.t += self.mdl.sp.dt
         self.t_ind +=1
@@ -53,10 +53,24 @@ class CommonTests():
         self.assertEqual([*endclasses.values()], [*endclasses_staged_par.values()])
         staged_par_flat = mdlhists_staged_par.flatten()
         
+        endclasses_shared_par, mdlhists_shared_par = sim.propagate.approach(mdl, app, showprogress=False,pool=Pool(4), staged=True, shared_mem=True)
+        self.assertEqual([*endclasses.values()], [*endclasses_shared_par.values()])
+        shared_par_flat = mdlhists_shared_par.flatten()
+        
+        resident_flats = []
+        with Pool(4, initializer=sim.propagate.init_resident, initargs=(sim.propagate.get_mdl_spec(mdl),)) as pool:
+            for kwargs in [{'staged':False}, {'staged':True}, {'staged':True, 'shared_mem':True}]:
+                endclasses_res, mdlhists_res = sim.propagate.approach(mdl, app, showprogress=False, pool=pool, resident=True, **kwargs)
+                self.assertEqual([*endclasses.values()], [*endclasses_res.values()])
+                resident_flats.append(mdlhists_res.flatten())
+        
         for k in mdlhists_flat:
             np.testing.assert_array_equal(mdlhists_flat[k],staged_flat[k])
             np.testing.assert_array_equal(mdlhists_flat[k],par_flat[k])
             np.testing.assert_array_equal(mdlhists_flat[k],staged_par_flat[k])
+            np.testing.assert_array_equal(mdlhists_flat[k],shared_par_flat[k])
+            for resident_flat in resident_flats:
+                np.testing.assert_array_equal(mdlhists_flat[k],resident_flat[k])
         
     def check_model_reset(self, mdl, mdl_reset, inj_times, max_time=55, run_stochastic=False):
         """ Tests to see if model attributes reset with the reset() method such that
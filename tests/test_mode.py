@@ -5,8 +5,10 @@ Created on Thu May 11 16:17:29 2023
 @author: dhulse
 """
 import unittest
+import copy
+import pickle
 
-from fmdtools.define.mode import Mode
+from fmdtools.define.mode import Mode, FaultMask
 
 class StoreEnergyMode(Mode):
     faultparams = {"no_charge":(1e-5, {'standby':1.0}, 100),
@@ -16,6 +18,9 @@ class StoreEnergyMode(Mode):
     key_phases_by = "self"
     mode: str = "standby"
 
+class StoreEnergyMaskMode(StoreEnergyMode):
+    fault_mask = True
+
 class ModeTests(unittest.TestCase):
     def setUp(self):
         self.mode = StoreEnergyMode()
@@ -23,6 +28,48 @@ class ModeTests(unittest.TestCase):
         self.assertTrue(self.mode.mode=='standby')
         self.assertFalse(self.mode.any_faults())
         self.assertTrue("no_charge" in self.mode.faultmodes)
+    def test_fault_mask(self):
+        """Test that the bitmask fault representation behaves the same as the set representation"""
+        self.assertEqual(StoreEnergyMaskMode.fault_index, {'no_charge': 1, 'short': 2})
+        mode = StoreEnergyMaskMode()
+        self.assertIsInstance(mode.faults, FaultMask)
+        self.assertIsNot(mode.faults, StoreEnergyMaskMode().faults)
+        self.assertFalse(mode.any_faults())
+        prev = mode.return_mutables()
+        for m in [self.mode, mode]:
+            m.add_fault('short')
+            self.assertTrue(m.has_fault('no_charge', 'short'))
+            self.assertFalse(m.no_fault('short'))
+            self.assertTrue(m.no_fault('no_charge'))
+            self.assertEqual(m.mode, 'short')
+        self.assertEqual(mode.faults, {'short'})
+        self.assertEqual(mode.fault_bits, 2)
+        self.assertEqual(self.mode.fault_bits, 2)
+        self.assertEqual(mode.get_faults_from_bits(3), {'no_charge', 'short'})
+        self.assertNotEqual(prev, mode.return_mutables())
+        self.assertEqual(self.mode.return_mutables(), mode.return_mutables())
+        snap = mode.snapshot()
+        mode.replace_fault('short', 'no_charge')
+        self.assertEqual([*mode.faults], ['no_charge'])
+        mode.restore(snap)
+        self.assertEqual(mode.faults, self.mode.faults)
+        mode.faults.update({'other_fault'})
+        self.assertEqual(StoreEnergyMaskMode.fault_index['other_fault'], 4)
+        self.assertEqual(mode.faults.intersection({'other_fault', 'no_charge'}), {'other_fault'})
+        mode.faults.difference_update(['other_fault'])
+        for cop in [copy.copy(mode.faults), copy.deepcopy(mode.faults), pickle.loads(pickle.dumps(mode.faults))]:
+            self.assertEqual(cop, mode.faults)
+            cop.clear()
+            self.assertTrue(mode.has_fault('short'))
+        mode.remove_any_faults(opermode='standby')
+        self.assertEqual(mode.faults, set())
+        self.assertEqual(len(mode.faults), 0)
+        hist = mode.create_hist([0, 1], ('mode', 'fault_bits'))
+        hist.log(mode, 0)
+        mode.add_fault('short')
+        hist.log(mode, 1)
+        self.assertEqual([*hist['fault_bits']], [0, 2])
+        self.assertEqual(mode.get_faults_from_bits(hist['fault_bits'][1]), {'short'})
             
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+import unittest
+
+from fmdtools.define.parameter import Parameter, SimParam, pickle_checked
+from fmdtools.define.common import get_interned
+from examples.pump.ex_pump import Pump
+
+class ExampleParam(Parameter, readonly=True):
+    """Example parameter for testing"""
+    x:      float = 1.0
+    y:      tuple = (1.0, 2.0)
+    x_lim = (0.0, 10.0)
+
+class ItemsParam(Parameter, readonly=True):
+    """Example parameter which may be given a dict, stored as a tuple of its items"""
+    items:  tuple = ()
+    def __init__(self, *args, items=(), **kwargs):
+        if type(items)==dict: items = tuple(items.items())
+        super().__init__(*args, items=items, **kwargs)
+
+class MutableParam(Parameter):
+    """Example parameter which is not readonly"""
+    x:      float = 1.0
+
+class ParameterTests(unittest.TestCase):
+    def test_interning(self):
+        """Tests that readonly Parameters with the same values are instantiated once and shared"""
+        p = ExampleParam()
+        p1 = p.copy_with_vals(x=2.0)
+        self.assertIs(p1, p.copy_with_vals(x=2.0))
+        self.assertIs(p1, get_interned(ExampleParam, x=2.0, y=(1.0, 2.0)))
+        self.assertIs(p, p.copy_with_vals())
+        self.assertIsNot(p1, p.copy_with_vals(x=3.0))
+        self.assertIsNot(p.copy_with_vals(y=(1.0, 2.0)), p.copy_with_vals(y=(1, 2)))
+        # validation is still performed for new values
+        with self.assertRaises(Exception):
+            p.copy_with_vals(x=20.0)
+        with self.assertRaises(Exception):
+            p.copy_with_vals(x=2)
+        # unhashable arguments are not interned
+        p2 = get_interned(ItemsParam, items={'a': 1.0})
+        self.assertEqual(p2.items, (('a', 1.0),))
+        self.assertIsNot(p2, get_interned(ItemsParam, items={'a': 1.0}))
+        m = MutableParam()
+        self.assertIsNot(m.copy_with_vals(x=2.0), m.copy_with_vals(x=2.0))
+        self.assertIn(ExampleParam, pickle_checked)
+    def test_model_params_shared(self):
+        """Tests that models created with the same parameters share them"""
+        mdl = Pump()
+        mdl2 = mdl.new_with_params(sp={'dt': 0.5})
+        mdl3 = mdl.new_with_params(sp={'dt': 0.5})
+        self.assertIs(mdl2.sp, mdl3.sp)
+        self.assertEqual(mdl2.sp.dt, 0.5)
+        self.assertIs(mdl2.p, mdl.p)
+        self.assertIs(mdl2.fxns['move_water'].p, mdl3.fxns['move_water'].p)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+import unittest
+import numpy as np
+
+from fmdtools.define.state import State
+
+class Position(State):
+    x:      float = 1.0
+    y:      float = 2.0
+    z:      float = 3.0
+    mode:   str = 'nominal'
+
+class Path(State):
+    x:      float = 0.0
+    y:      float = 0.0
+    pts:    np.ndarray = np.array([1.0, 2.0])
+    log:    list = []
+
+class StateTests(unittest.TestCase):
+    def setUp(self):
+        self.pos = Position()
+        self.path = Path(pts=np.array([1.0, 2.0]), log=[1])
+    def test_put(self):
+        self.pos.put(x=10.0, mode='faulty')
+        self.assertEqual(self.pos.gett('x', 'mode'), (10.0, 'faulty'))
+        log = [1, 2]
+        self.path.put(log=log)
+        self.assertEqual(self.path.log, log)
+        self.assertIsNot(self.path.log, log)
+        self.path.put(log=log, as_copy=False)
+        self.assertIs(self.path.log, log)
+        with self.assertRaises(Exception):
+            self.pos.put(w=1.0)
+    def test_assign(self):
+        """Tests the (compiled) assignment of all, positional, and keyword states"""
+        self.pos.assign(Position(x=5.0, y=6.0, z=7.0, mode='a'))
+        self.assertEqual(self.pos.gett('x', 'y', 'z', 'mode'), (5.0, 6.0, 7.0, 'a'))
+        self.pos.assign(Position(x=8.0, y=9.0), 'x')
+        self.assertEqual(self.pos.gett('x', 'y'), (8.0, 6.0))
+        self.pos.assign(self.path, x='y', y='x')
+        self.assertEqual(self.pos.gett('x', 'y'), (0.0, 0.0))
+        self.pos.assign([1.0, 2.0], 'y', 'z')
+        self.assertEqual(self.pos.gett('y', 'z'), (1.0, 2.0))
+        other = Path(pts=np.array([3.0, 4.0]), log=[2])
+        self.path.assign(other)
+        np.testing.assert_array_equal(self.path.pts, other.pts)
+        self.assertIsNot(self.path.pts, other.pts)
+        self.assertIsNot(self.path.log, other.log)
+        self.path.assign(other, as_copy=False)
+        self.assertIs(self.path.pts, other.pts)
+        with self.assertRaises(Exception):
+            self.pos.assign(self.path)
+        with self.assertRaises(Exception):
+            self.pos.assign(self.path, 'x', y='x')
+    def test_inc_limit(self):
+        self.pos.inc(x=1.0, y=(5.0, 4.0))
+        self.assertEqual(self.pos.gett('x', 'y'), (2.0, 4.0))
+        self.pos.limit(x=(0.0, 1.5), z=(4.0, 5.0))
+        self.assertEqual(self.pos.gett('x', 'z'), (1.5, 4.0))
+        with self.assertRaises(Exception):
+            self.pos.inc(w=1.0)
+    def test_arithmetic(self):
+        """Tests that arithmetic methods give the same results without modifying states"""
+        self.assertEqual(self.pos.mul('x', 'y', 'z'), 6.0)
+        self.assertEqual(self.pos.add('x', 'y', 'z'), 6.0)
+        self.assertEqual(self.pos.sub('z', 'y'), 1.0)
+        self.assertEqual(self.pos.div('y', 'x'), 2.0)
+        np.testing.assert_array_equal(self.path.add('pts', 'pts'), [2.0, 4.0])
+        np.testing.assert_array_equal(self.path.pts, [1.0, 2.0])
+    def test_snapshot_restore(self):
+        snap = self.path.snapshot()
+        self.path.pts[0] = 10.0
+        self.path.log.append(2)
+        self.path.x = 5.0
+        self.path.restore(snap)
+        np.testing.assert_array_equal(self.path.pts, [1.0, 2.0])
+        self.assertEqual(self.path.log, [1])
+        self.assertEqual(self.path.x, 0.0)
+
+if __name__ == '__main__':
+    unittest.main()